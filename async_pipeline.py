@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+非同步處理流程 - 在單一執行緒的事件迴圈中同時處理大量郵件
+Gemini 校對與 Telegram 傳送共用一個 httpx.AsyncClient 連線池，
+各階段以各自的 Semaphore 限制並行數，數百封郵件同時處理也不需要數百個執行緒。
+
+翻譯與同步流程走同一條路徑：文本塊交給共用的翻譯執行器，經由翻譯服務路由
+（全域並行上限、各服務的自適應並行上限、避險請求、翻譯記憶與範本記憶都相同）。
+Gmail API 用戶端沒有非同步版本，搜尋與批次讀取郵件仍是同步呼叫；
+這些呼叫與處理紀錄、Markdown 檔案等阻塞操作都在背景執行緒進行，不會卡住事件迴圈。
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# 各階段預設的並行上限
+DEFAULT_STAGE_LIMITS = {
+    'emails': 200,     # 同時處理的郵件數
+    'translate': 8,    # 同時送往翻譯執行器的文本塊
+    'proofread': 2,    # 同時進行的 Gemini 校對請求
+    'send': 4          # 同時進行的 Telegram 傳送
+}
+
+class AsyncEmailPipeline:
+    def __init__(self, translator, stage_limits: Optional[Dict[str, int]] = None,
+                 max_connections=20, timeout=30):
+        """
+        Args:
+            translator: EmailTranslator，提供Gmail存取、文本處理、處理紀錄與翻譯記憶
+            stage_limits: 各階段的並行上限 {階段名稱: 上限}
+            max_connections: HTTP連線池的連線數上限
+            timeout: HTTP請求逾時秒數
+        """
+        self.translator = translator
+        self.stage_limits = dict(DEFAULT_STAGE_LIMITS, **(stage_limits or {}))
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.client = None
+        self._semaphores = {}
+
+    async def __aenter__(self):
+        import httpx
+
+        # httpx 0.13（googletrans 相依的版本）使用 PoolLimits，新版改名為 Limits
+        if hasattr(httpx, 'Limits'):
+            limits = {'limits': httpx.Limits(max_connections=self.max_connections)}
+        else:
+            limits = {'pool_limits': httpx.PoolLimits(hard_limit=self.max_connections)}
+        self.client = httpx.AsyncClient(timeout=self.timeout, **limits)
+        self._semaphores = {
+            stage: asyncio.Semaphore(limit) for stage, limit in self.stage_limits.items()}
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.client.aclose()
+        self.client = None
+
+    # ---- 翻譯 ----
+
+    async def run_translation(self, fn, *args):
+        """在共用的翻譯執行器執行同步的翻譯函式並等待結果
+
+        執行器的佇列已滿時 submit 會等待，因此在背景執行緒送出，不佔住事件迴圈。
+        """
+        executor = self.translator.get_translation_executor()
+        async with self._semaphores['translate']:
+            future = await asyncio.to_thread(executor.submit, fn, *args)
+            return await asyncio.wrap_future(future)
+
+    async def translate_text(self, text: str) -> str:
+        """翻譯整封郵件內容（與 translate_long_text 相同的連結標記與分塊方式，各文本塊同時翻譯）"""
+        chunks, src_lang, finish = self.translator.plan_long_text(text)
+        if len(chunks) > 1:
+            print(f"🚀 非同步翻譯 {len(chunks)} 個文本塊...")
+        translated: List[str] = await asyncio.gather(*(
+            self.translate_chunk(chunk, src_lang) for chunk in chunks))
+        return finish(translated)
+
+    async def translate_chunk(self, text: str, src_lang: Optional[str] = None) -> str:
+        """翻譯單個文本塊（與同步流程相同的翻譯記憶、範本記憶與修正），失敗時回傳原文"""
+        return await self.run_translation(self.translator.translate_single_chunk, text, src_lang)
+
+    async def translate_subject(self, subject: str) -> str:
+        return await self.run_translation(self.translator.translate_subject, subject)
+
+    # ---- 校對與傳送 ----
+
+    async def proofread(self, email_data: dict, translated_content: str) -> str:
+        """校對與潤飾翻譯，失敗時回傳原翻譯"""
+        try:
+            proofreader = self.translator.get_proofreader()
+            async with self._semaphores['proofread']:
+                proofread_result = await proofreader.enhance_translation_quality_async(
+                    email_data['content'], translated_content, self.client)
+            return self.translator.report_proofreading(proofread_result)
+        except Exception as e:
+            print(f"⚠️ 校對過程出錯，使用原翻譯: {e}")
+        return translated_content
+
+    async def send_telegram_message(self, file_path: str) -> bool:
+        """透過Telegram傳送檔案"""
+        from resilience import get_policy, raise_for_retry
+
+        try:
+            message_url, message_data, document_url, file_type = \
+                self.translator.build_telegram_request(file_path)
+            content = await asyncio.to_thread(read_file, file_path)
+
+            async def post(url, **kwargs):
+                async with self._semaphores['send']:
+                    return raise_for_retry(await self.client.post(url, **kwargs))
+
+            # 限流（429）或伺服器錯誤時依 Retry-After 或退避時間重試
+            policy = get_policy('telegram', max_delay=30.0)
+            await policy.call_async(post, message_url, data=message_data)
+            response = await policy.call_async(
+                post, document_url,
+                data={'chat_id': self.translator.config['telegram_chat_id']},
+                files={'document': (os.path.basename(file_path), content)})
+
+            if response.status_code == 200:
+                print(f"✅ {file_type}已成功透過Telegram傳送")
+                return True
+            print(f"❌ Telegram傳送失敗: {response.text}")
+            return False
+
+        except Exception as e:
+            print(f"❌ Telegram傳送錯誤: {e}")
+            return False
+
+    # ---- 處理流程 ----
+
+    async def process_message(self, message_id: str, markdown_filename: str,
+                              email_data: Optional[dict] = None) -> Optional[dict]:
+        """處理單封郵件：翻譯 → 校對 → Markdown → Telegram（與 process_message 相同的處理紀錄階段）"""
+        from processing_ledger import MessageProgress
+
+        translator = self.translator
+        async with self._semaphores['emails']:
+            progress = await asyncio.to_thread(
+                MessageProgress, translator.get_processing_ledger(), message_id)
+
+            if email_data is None:
+                email_data = await asyncio.to_thread(translator.get_email_content, message_id)
+            if not email_data:
+                return None
+            translator.announce_message(email_data, progress)
+
+            # 翻譯主旨與內容
+            if not progress.reached('rendered'):
+                email_data['translated_subject'] = await self.translate_subject(email_data['subject'])
+
+            translated_content = progress.saved('translated', 'translated_content')
+            if translated_content is None:
+                translated_content = await self.translate_text(email_data['content'])
+                await asyncio.to_thread(
+                    progress.record, 'translated', translated_content=translated_content)
+
+            # 校對與潤飾翻譯
+            proofread_content = progress.saved('proofread', 'proofread_content')
+            if proofread_content is None:
+                proofread_content = await self.proofread(email_data, translated_content)
+                await asyncio.to_thread(
+                    progress.record, 'proofread', proofread_content=proofread_content)
+
+            # 建立Markdown檔案
+            markdown_filename = await asyncio.to_thread(
+                translator.render_message, progress, email_data, proofread_content, markdown_filename)
+            if not markdown_filename:
+                return None
+
+            # 透過Telegram傳送
+            if not await self.send_telegram_message(markdown_filename):
+                return None
+            await asyncio.to_thread(progress.record, 'delivered')
+            return email_data
+
+    async def process_emails(self, search_criteria: dict, search_name='default',
+                             incremental=False) -> dict:
+        """非同步批次處理流程，回傳與 process_emails_batch 相同格式的統計資料"""
+        translator = self.translator
+        stats = translator.new_batch_stats()
+        print("🚀 開始非同步處理郵件...")
+
+        if not await asyncio.to_thread(translator.ensure_gmail_service):
+            return stats
+
+        start_time = time.time()
+        messages = await asyncio.to_thread(
+            translator.find_messages_to_process, search_criteria, stats, search_name, incremental)
+
+        if messages:
+            from email_translator import PREFETCH_CHUNK_SIZE
+
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            # 與同步流程相同，郵件內文依處理進度分批取得，同時處理與等待的郵件不超過 'emails' 上限
+            window = self.stage_limits['emails']
+            capacity = asyncio.Semaphore(window)
+
+            async def run(message, email_data):
+                filename = f"email_translation_{timestamp}_{message['id']}.md"
+                try:
+                    return await self.process_message(message['id'], filename, email_data)
+                except Exception as e:
+                    print(f"❌ 郵件 {message['id']} 處理失敗: {e}")
+                    return None
+                finally:
+                    capacity.release()
+
+            tasks = []
+            seen = set()
+            position = 0
+            while position < len(messages):
+                # 等到至少一半的空位釋出，再依目前的空位數取得下一批郵件
+                limit = min(PREFETCH_CHUNK_SIZE, len(messages) - position)
+                size = min(max(1, window // 2), limit)
+                for _ in range(size):
+                    await capacity.acquire()
+                while size < limit and not capacity.locked():
+                    await capacity.acquire()
+                    size += 1
+                chunk = messages[position:position + size]
+                position += size
+
+                selected, prefetched = await asyncio.to_thread(
+                    translator.prefetch_messages, chunk, stats, seen)
+                for _ in range(len(chunk) - len(selected)):
+                    capacity.release()
+                tasks.extend(asyncio.create_task(run(message, prefetched.get(message['id'])))
+                             for message in selected)
+
+            for email_data in await asyncio.gather(*tasks):
+                if email_data:
+                    stats['succeeded'] += 1
+                    stats['characters'] += len(email_data['content'])
+                else:
+                    stats['failed'] += 1
+
+        # 搜尋成功且全部處理成功才推進檢查點，失敗的郵件下次會再處理
+        if incremental and not stats['search_failed'] and stats['failed'] == 0:
+            await asyncio.to_thread(translator.commit_sync_checkpoint, search_name)
+
+        stats['elapsed'] = time.time() - start_time
+        translator.print_batch_summary(stats)
+        return stats
+
+def read_file(file_path: str) -> bytes:
+    with open(file_path, 'rb') as file:
+        return file.read()
+
+async def run_async_pipeline(translator, search_criteria, search_name='default', incremental=False):
+    """建立非同步處理流程並處理所有符合的郵件"""
+    async with AsyncEmailPipeline(translator, translator.config.get('async_stage_limits')) as pipeline:
+        return await pipeline.process_emails(search_criteria, search_name, incremental)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+簡繁轉換效能測試 - 檢查本地轉換器的結果與速度（原本需要再呼叫一次翻譯服務）
+"""
+
+import time
+
+from chinese_converter import ChineseConverter
+
+# (簡體原文, 預期的台灣繁體)
+TEST_CASES = [
+    ("这是一个复杂的软件系统，请尽快回复我们的邮件。", "這是一個複雜的軟體系統，請儘快回覆我們的郵件。"),
+    ("头发已经剪短了，以后再去理发。", "頭髮已經剪短了，以後再去理髮。"),
+    ("皇后来了，她在这里等你。", "皇后來了，她在這裡等你。"),
+    ("本周的周报请发到邮箱。", "本週的週報請發到信箱。"),
+    ("合并后的文件夹已经上传到云端。", "合併後的資料夾已經上傳到雲端。"),
+    ("请检查数据库的用户账号设置。", "請檢查資料庫的使用者帳號設定。"),
+    ("我們的軟件與數據庫需要升級。", "我們的軟體與資料庫需要升級。"),
+    ("已經是繁體中文的句子，不會改變。", "已經是繁體中文的句子，不會改變。"),
+    # 詞組不可取走下一個詞的字
+    ("我们三天后再联系。", "我們三天後再聯繫。"),
+    ("请在两天后回复。", "請在兩天後回覆。"),
+    ("这是唯一只能用的方法。", "這是唯一只能用的方法。"),
+    ("请尽快处理发票，选手表现很好。", "請儘快處理發票，選手表現很好。"),
+    ("他太后悔了，四周一片安静。", "他太後悔了，四周一片安靜。"),
+    ("早餐吃面条和面包，家里有一只猫。", "早餐吃麵條和麵包，家裡有一隻貓。"),
+]
+
+# 一簡對多繁（面/麵、只/隻、发/發/髮、干/乾/幹）：(簡體原文, 預期的台灣繁體, 依序以詞組轉換的詞)
+# 由左至右最長詞優先，先比對到的詞（包含不需轉換的方面、下面）會取走下一個詞的第一個字
+ONE_TO_MANY_CASES = [
+    ("这方面包括面条和面包。", "這方面包括麵條和麵包。", ['面条', '面包']),
+    ("下面条件请确认。", "下面條件請確認。", []),
+    ("后面的面包店", "後面的麵包店", ['后面', '面包']),
+    ("唯一只猫", "唯一隻貓", ['只猫']),
+    ("两只狗和一只鸟", "兩隻狗和一隻鳥", ['只狗', '只鸟']),
+    ("处理发票后去理发，头发很短。", "處理發票後去理髮，頭髮很短。", ['处理', '理发', '头发']),
+    ("干部说饼干很干净，能干的人干活快。", "幹部說餅乾很乾淨，能幹的人幹活快。",
+     ['干部', '饼干', '干净', '能干', '干活']),
+]
+
+def test_accuracy(converter):
+    print("🧪 簡繁轉換結果")
+    print("=" * 60)
+    correct = 0
+    for simplified, expected in TEST_CASES:
+        converted = converter.convert(simplified)
+        ok = converted == expected
+        correct += ok
+        print(f"{'✅' if ok else '❌'} {simplified} → {converted}")
+        if not ok:
+            print(f"   預期: {expected}")
+    print("-" * 60)
+    print(f"🎯 正確: {correct}/{len(TEST_CASES)}")
+    return correct == len(TEST_CASES)
+
+def test_one_to_many(converter):
+    print("\n🧪 一簡對多繁（最長詞優先）")
+    print("=" * 60)
+    passed = True
+    for simplified, expected, phrases in ONE_TO_MANY_CASES:
+        converted, changes = converter.convert_with_changes(simplified)
+        matched = [source for source, _ in changes if len(source) > 1]
+        ok = converted == expected and matched == phrases
+        passed &= ok
+        print(f"{'✅' if ok else '❌'} {simplified} → {converted} {matched}")
+        if not ok:
+            print(f"   預期: {expected} {phrases}")
+    return passed
+
+def test_speed(converter, repeat=200):
+    text = "".join(simplified for simplified, _ in TEST_CASES) * 10
+    start = time.perf_counter()
+    for _ in range(repeat):
+        converter.convert(text)
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"⚡ 轉換 {len(text)} 字: {elapsed * 1e6:.0f} µs（每千字 {elapsed / len(text) * 1e9:.0f} µs）")
+
+if __name__ == "__main__":
+    print("🚀 簡繁轉換效能測試")
+    start = time.perf_counter()
+    converter = ChineseConverter()
+    print(f"📚 編譯詞典: {(time.perf_counter() - start) * 1000:.1f} ms")
+    passed = test_accuracy(converter)
+    passed &= test_one_to_many(converter)
+    test_speed(converter)
+    print("\n🎉 簡繁轉換測試通過！" if passed else "\n⚠️ 部分轉換結果不符合預期")
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+簡繁轉換 - 以內建詞典將簡體中文轉成台灣繁體中文，不需要網路
+詞典編譯成前綴樹（trie），由左至右以最長詞優先比對：
+先比對詞組（一簡對多繁的字與台灣慣用詞），沒有詞組時再逐字轉換。
+轉換一段文本只需要數十微秒，翻譯結果夾雜簡體字時不必再呼叫翻譯服務。
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# 逐字對照：只收錄簡體專用字（繁體文本中不會出現），已是繁體的文本轉換後不變
+_CHARACTER_PAIRS = (
+    '万萬与與专專业業丛叢东東丝絲丢丟两兩严嚴丧喪个個丰豐临臨为為丽麗举舉么麼'
+    '义義乌烏乐樂乔喬习習乡鄉书書买買乱亂争爭于於亏虧亚亞产產亩畝亲親亿億仅僅从從'
+    '仑侖仓倉仪儀们們价價众眾优優会會伞傘伟偉传傳伤傷伦倫伪偽体體侠俠侣侶侥僥侦偵'
+    '侧側侨僑俩倆俭儉债債倾傾偿償储儲儿兒兑兌党黨兰蘭关關兴興兹茲养養兽獸内內冈岡'
+    '册冊写寫军軍农農冯馮冻凍净淨凉涼减減凑湊凤鳳凭憑凯凱击擊凿鑿刘劉则則刚剛创創'
+    '删刪别別刹剎剂劑剑劍剧劇劝勸办辦务務动動励勵劲勁劳勞势勢勋勳匀勻华華协協单單'
+    '卖賣卢盧卫衛却卻厂廠厅廳压壓厌厭厕廁厢廂厦廈县縣参參双雙变變叙敘叠疊号號叹嘆'
+    '吓嚇吕呂吗嗎启啟吴吳员員呗唄听聽呛嗆呜嗚咏詠咙嚨咨諮哑啞响響哗嘩唤喚啸嘯喷噴'
+    '嘱囑团團园園围圍国國图圖圆圓圣聖场場坏壞块塊坚堅坛壇坝壩坟墳坠墜垄壟垒壘垫墊'
+    '堕墮墙牆壮壯声聲壳殼壶壺处處备備够夠头頭夸誇夹夾夺奪奋奮奖獎妆妝妇婦妈媽娄婁'
+    '娱娛婴嬰孙孫学學宁寧宝寶实實宠寵审審宪憲宫宮宽寬宾賓对對寻尋导導寿壽将將尔爾'
+    '尘塵尝嘗层層属屬岁歲岂豈岛島岭嶺峡峽币幣帅帥师師帐帳带帶帮幫并並广廣庆慶库庫'
+    '应應庙廟废廢开開异異弃棄张張弹彈强強归歸当當录錄彻徹径徑忆憶忧憂怀懷态態怜憐'
+    '总總恋戀恒恆恶惡恼惱悦悅悬懸惊驚惧懼惨慘惯慣愤憤愿願懒懶戏戲战戰户戶执執扩擴'
+    '扫掃扬揚扰擾抚撫抢搶护護报報担擔拟擬拥擁择擇挂掛挡擋挤擠挥揮捡撿换換据據掷擲'
+    '摄攝摆擺摇搖撑撐敌敵数數斋齋断斷无無旧舊时時旷曠昼晝显顯晋晉晒曬晓曉暂暫术術'
+    '机機杀殺杂雜权權条條来來杨楊极極构構枪槍柜櫃标標栏欄树樹样樣档檔桥橋梦夢检檢'
+    '楼樓横橫欢歡欧歐歼殲残殘毁毀毕畢毙斃气氣汇匯汉漢汤湯沟溝没沒沪滬泪淚泽澤洁潔'
+    '洒灑浅淺测測济濟浓濃涂塗涛濤润潤涨漲渐漸渔漁湾灣湿濕温溫满滿滚滾滞滯滤濾滥濫'
+    '潜潛灭滅灯燈灵靈灾災炉爐点點炼煉烂爛烟煙烦煩烧燒热熱焕煥爱愛爷爺牵牽犹猶狭狹'
+    '独獨猎獵猫貓献獻环環现現电電画畫畅暢疗療疯瘋皱皺盐鹽监監盖蓋盘盤睁睜着著矿礦'
+    '码碼砖磚础礎硕碩确確碍礙礼禮祸禍离離种種积積称稱稳穩穷窮窃竊竞競笔筆笼籠筑築'
+    '简簡签簽类類粮糧紧緊纠糾红紅纤纖约約级級纪紀纯純纲綱纳納纵縱纷紛纸紙纹紋纺紡'
+    '线線练練组組细細织織终終绍紹经經结結绕繞绘繪给給络絡绝絕统統继繼绩績绪緒续續'
+    '维維绵綿综綜绿綠缓緩编編缘緣缩縮网網罚罰罗羅职職联聯聪聰肃肅肠腸肤膚胁脅胜勝'
+    '胶膠脑腦脚腳脱脫腾騰舰艦舱艙艰艱艺藝节節苏蘇苹蘋荐薦药藥获獲莱萊营營萝蘿虑慮'
+    '虚虛虫蟲虽雖蚀蝕蛮蠻补補装裝见見观觀规規视視览覽觉覺触觸计計订訂认認讨討让讓'
+    '训訓议議讯訊记記讲講许許论論设設访訪证證评評识識诉訴词詞译譯试試诗詩诚誠话話'
+    '询詢该該详詳语語误誤说說请請诸諸读讀课課谁誰调調谈談谋謀谓謂谢謝谱譜贝貝负負'
+    '财財责責败敗货貨质質贩販贫貧购購贯貫贴貼贵貴费費贸貿资資赏賞赔賠赖賴赛賽赞贊'
+    '赠贈赢贏赵趙赶趕趋趨跃躍践踐踪蹤车車轨軌转轉轮輪软軟轻輕载載较較辅輔辆輛辈輩'
+    '辑輯输輸辞辭边邊辽遼达達迁遷过過迈邁运運还還这這进進远遠违違连連迟遲适適选選'
+    '递遞逻邏遗遺邮郵邻鄰郑鄭酱醬释釋针針钓釣钢鋼钥鑰钱錢铁鐵铃鈴银銀铺鋪链鏈销銷'
+    '锁鎖锅鍋错錯锦錦键鍵镇鎮镜鏡长長门門闪閃闭閉问問闯闖闲閒间間闹鬧闻聞阅閱阔闊'
+    '队隊阳陽阴陰阵陣阶階际際陆陸陈陳险險隐隱随隨难難雾霧韩韓页頁顶頂项項顺順须須'
+    '顾顧顿頓预預领領频頻题題颜顏额額风風飞飛饭飯饮飲饰飾饱飽饼餅馆館马馬驱驅驶駛'
+    '驻駐驾駕验驗骑騎骗騙鱼魚鲜鮮鸟鳥鸡雞鸣鳴麦麥黄黃齐齊龄齡龙龍龟龜后後叶葉发發'
+    '复復历歷钟鐘脏髒尽盡静靜'
+)
+
+# 詞組對照：一簡對多繁的字（后、发、复、干、里、面、只…）依詞決定，以及台灣慣用詞
+_PHRASES = {
+    # 后
+    '皇后': '皇后',
+    # 发
+    '头发': '頭髮', '理发': '理髮', '毛发': '毛髮', '洗发': '洗髮',
+    # 复
+    '复杂': '複雜', '复制': '複製', '重复': '重複', '复印': '影印', '复合': '複合',
+    '复数': '複數', '复习': '複習', '复选': '複選', '复本': '複本', '回复': '回覆',
+    '答复': '答覆', '反复': '反覆',
+    # 历
+    '日历': '日曆', '历法': '曆法', '农历': '農曆', '阳历': '陽曆', '阴历': '陰曆',
+    # 汇、获、签、钟、脏、尽
+    '词汇': '詞彙', '汇编': '彙編', '收获': '收穫', '标签': '標籤', '书签': '書籤',
+    '钟情': '鍾情', '心脏': '心臟', '肝脏': '肝臟', '内脏': '內臟', '脏器': '臟器',
+    '尽管': '儘管', '尽量': '儘量', '尽快': '儘快', '尽早': '儘早',
+    # 干（繁體文本中也會出現，因此不逐字轉換）
+    '干净': '乾淨', '干燥': '乾燥', '饼干': '餅乾', '干杯': '乾杯', '干脆': '乾脆',
+    '干部': '幹部', '能干': '能幹', '干活': '幹活', '骨干': '骨幹', '主干': '主幹',
+    '干嘛': '幹嘛', '干什么': '幹什麼',
+    # 里
+    '这里': '這裡', '那里': '那裡', '哪里': '哪裡', '里面': '裡面', '心里': '心裡',
+    '家里': '家裡', '城里': '城裡', '夜里': '夜裡', '手里': '手裡',
+    # 面、只、表、周
+    '面条': '麵條', '面包': '麵包', '面粉': '麵粉', '拉面': '拉麵', '泡面': '泡麵',
+    '只猫': '隻貓', '只狗': '隻狗', '只鸟': '隻鳥',
+    '钟表': '鐘錶',
+    '周末': '週末', '每周': '每週', '本周': '本週', '上周': '上週', '下周': '下週',
+    '周一': '週一', '周二': '週二', '周三': '週三', '周四': '週四', '周五': '週五',
+    '周六': '週六', '周日': '週日', '周年': '週年', '周报': '週報', '周期': '週期',
+    '一周': '一週', '两周': '兩週',
+    # 范、划、几、准、冲、系、制、余、松、征、云、斗、板、致、游、志、丑、并、据
+    '范围': '範圍', '规范': '規範', '模范': '模範', '示范': '示範', '范例': '範例',
+    '计划': '計畫', '规划': '規劃', '划分': '劃分', '策划': '策劃',
+    '几乎': '幾乎', '几个': '幾個', '几天': '幾天', '几次': '幾次', '几年': '幾年',
+    '几分': '幾分', '几何': '幾何', '好几': '好幾',
+    '准备': '準備', '标准': '標準', '准确': '準確', '精准': '精準', '水准': '水準',
+    '准时': '準時',
+    '冲突': '衝突', '冲击': '衝擊', '冲动': '衝動', '缓冲': '緩衝',
+    '联系': '聯繫', '关系': '關係', '维系': '維繫',
+    '制造': '製造', '制作': '製作', '印制': '印製', '绘制': '繪製', '录制': '錄製',
+    '其余': '其餘', '剩余': '剩餘', '余额': '餘額', '多余': '多餘', '业余': '業餘',
+    '放松': '放鬆', '轻松': '輕鬆', '松开': '鬆開',
+    '特征': '特徵', '征求': '徵求', '象征': '象徵',
+    '云端': '雲端', '云计算': '雲端運算',
+    '奋斗': '奮鬥', '战斗': '戰鬥', '斗争': '鬥爭',
+    '老板': '老闆', '精致': '精緻', '细致': '細緻',
+    '旅游': '旅遊', '游戏': '遊戲', '游客': '遊客',
+    '杂志': '雜誌', '标志': '標誌', '日志': '日誌',
+    '丑陋': '醜陋', '合并': '合併', '兼并': '兼併', '吞并': '吞併', '拮据': '拮据',
+    # 台灣慣用詞（資訊科技）
+    '信息': '資訊', '软件': '軟體', '硬件': '硬體', '网络': '網路', '互联网': '網際網路',
+    '计算机': '電腦', '程序': '程式', '数据': '資料', '数据库': '資料庫', '视频': '影片',
+    '音频': '音訊', '打印': '列印', '打印机': '印表機', '默认': '預設', '鼠标': '滑鼠',
+    '内存': '記憶體', '硬盘': '硬碟', '光盘': '光碟', '服务器': '伺服器', '用户': '使用者',
+    '账户': '帳戶', '账号': '帳號', '登录': '登入', '链接': '連結', '菜单': '選單',
+    '界面': '介面', '接口': '介面', '屏幕': '螢幕', '激活': '啟用', '设置': '設定',
+    '博客': '部落格', '短信': '簡訊', '邮箱': '信箱', '在线': '線上', '高清': '高畫質',
+    '模板': '範本', '字符': '字元', '变量': '變數', '函数': '函式', '源代码': '原始碼',
+    '代码': '程式碼', '人工智能': '人工智慧', '智能': '智慧', '操作系统': '作業系統',
+    '文件夹': '資料夾', '出租车': '計程車', '自行车': '腳踏車',
+    # 最長詞優先比對：以下的詞先取走前一個字，避免後面的字被誤認成上面的詞
+    # （處理發票≠處理髮票、三天後≠三天后、唯一只≠唯一隻）
+    '处理': '處理', '管理': '管理', '经理': '經理', '办理': '辦理', '整理': '整理',
+    '代理': '代理', '助理': '助理', '清理': '清理', '修理': '修理',
+    '带头': '帶頭', '码头': '碼頭', '开头': '開頭', '源头': '源頭', '街头': '街頭',
+    '唯一': '唯一', '统一': '統一', '四周': '四周', '简短': '簡短',
+    # （這方面包括≠這方麵包括、下面條件≠下麵條件）
+    '方面': '方面', '全面': '全面', '表面': '表面', '前面': '前面', '后面': '後面',
+    '上面': '上面', '下面': '下面', '外面': '外面', '对面': '對面', '正面': '正面',
+}
+
+class ChineseConverter:
+    def __init__(self, character_pairs: str = _CHARACTER_PAIRS,
+                 phrases: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            character_pairs: 逐字對照，簡體與繁體字交錯排列
+            phrases: 詞組對照 {簡體詞: 繁體詞}，預設使用內建的台灣繁體詞典
+        """
+        self._characters = dict(zip(character_pairs[0::2], character_pairs[1::2]))
+        self._trie = {}
+        for simplified, traditional in (phrases if phrases is not None else _PHRASES).items():
+            self._add(simplified, traditional)
+            # 已逐字轉成繁體、但仍是大陸用語的詞（例如「軟件」）也轉成台灣用語
+            partially_converted = self._convert_characters(simplified)
+            if partially_converted != simplified:
+                self._add(partially_converted, traditional)
+
+    def _add(self, phrase: str, replacement: str):
+        """把詞組加入前綴樹，詞尾節點以空字串鍵保存轉換結果"""
+        node = self._trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = replacement
+
+    def _convert_characters(self, text: str) -> str:
+        return ''.join(self._characters.get(char, char) for char in text)
+
+    def convert_with_changes(self, text: str) -> Tuple[str, List[Tuple[str, str]]]:
+        """轉換文本，並回傳實際轉換的詞與字 [(原文, 轉換結果)]"""
+        return self._convert(text, [])
+
+    def convert(self, text: str) -> str:
+        """轉換文本為台灣繁體中文"""
+        return self._convert(text, None)[0]
+
+    def _convert(self, text: str, changes: Optional[list]):
+        trie = self._trie
+        characters = self._characters
+        output = []
+        i = 0
+        length = len(text)
+        while i < length:
+            char = text[i]
+            node = trie.get(char)
+            match_end = 0
+            replacement = None
+            if node is not None:
+                # 最長詞優先
+                j = i + 1
+                while True:
+                    if '' in node:
+                        match_end, replacement = j, node['']
+                    if j >= length:
+                        break
+                    node = node.get(text[j])
+                    if node is None:
+                        break
+                    j += 1
+
+            if replacement is not None:
+                source = text[i:match_end]
+                i = match_end
+            else:
+                source = char
+                replacement = characters.get(char, char)
+                i += 1
+            output.append(replacement)
+            if changes is not None and replacement != source:
+                changes.append((source, replacement))
+        return ''.join(output), changes
+
+_default_converter = None
+_default_converter_lock = threading.Lock()
+
+def get_chinese_converter() -> ChineseConverter:
+    """取得全程式共用的簡繁轉換器（詞典只編譯一次）"""
+    global _default_converter
+    with _default_converter_lock:
+        if _default_converter is None:
+            _default_converter = ChineseConverter()
+        return _default_converter
+
+def to_traditional(text: str) -> str:
+    """使用共用的轉換器把簡體中文轉成台灣繁體中文"""
+    return get_chinese_converter().convert(text)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自適應並行上限 - 依翻譯服務的延遲與錯誤/限流（429）比例自動調整同時請求數
+成功且延遲正常時每輪加一（加法增加），被限流、出錯或延遲明顯變長時按比例降低（乘法減少），
+免費翻譯端點與 Gemini 當天的狀況不同時，不需要手動調整並行數
+
+延遲依請求的字元數換算成每單位（預設1000字元）的延遲再與基準比較：
+短主旨的延遲不會壓低基準，長文本塊也不會因為字多就被誤判為壅塞
+"""
+
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
+
+def is_throttling_error(error: Exception) -> bool:
+    """判斷例外是否代表翻譯服務限流"""
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status == 429:
+        return True
+    message = str(error).lower()
+    return '429' in message or 'too many requests' in message
+
+class _Permit:
+    """一次請求的並行名額，請求端可回報非例外形式的限流（例如HTTP 429回應）"""
+    __slots__ = ('throttled',)
+
+    def __init__(self):
+        self.throttled = False
+
+    def mark_throttled(self):
+        self.throttled = True
+
+class AdaptiveLimiter:
+    def __init__(self, name: str, max_limit=8, min_limit=1, initial_limit=None,
+                 latency_tolerance=2.0, backoff=0.5, smoothing=0.2, size_unit=1000):
+        """
+        Args:
+            name: 翻譯服務名稱（顯示於統計）
+            max_limit: 並行上限的最大值
+            min_limit: 並行上限的最小值
+            initial_limit: 起始並行上限，預設為最大值的一半
+            latency_tolerance: 延遲超過基準延遲幾倍時視為服務壅塞
+            backoff: 限流或出錯時並行上限乘上的比例
+            smoothing: 延遲指數移動平均的權重
+            size_unit: 換算延遲的請求大小單位（字元）；小於一個單位的請求以一個單位計算，
+                       因為短請求的延遲主要是固定的連線與處理時間
+        """
+        self.name = name
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+        self.smoothing = smoothing
+        self.size_unit = size_unit
+        self.limit = float(initial_limit or max(min_limit, max_limit // 2))
+        self.in_flight = 0
+        self.successes = 0
+        self.throttled = 0
+        self.errors = 0
+        self._baseline_latency = None
+        self._average_latency = None
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def _acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def _abandon(self):
+        """歸還沒有完成請求（例如被取消）的名額，不影響並行上限與統計"""
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, size: Optional[int] = None):
+        """取得一個並行名額，名額用完時等待；離開時依結果調整並行上限
+
+        Args:
+            size: 請求的字元數，用來換算每單位的延遲；None時視為一個單位
+        """
+        units = max(1.0, size / self.size_unit) if size else 1.0
+        self._acquire()
+
+        permit = _Permit()
+        start = time.monotonic()
+        try:
+            yield permit
+        except Exception as e:
+            self._release(time.monotonic() - start, units,
+                          'throttled' if is_throttling_error(e) else 'error')
+            raise
+        else:
+            self._release(time.monotonic() - start, units, 'throttled' if permit.throttled else 'success')
+
+    @asynccontextmanager
+    async def async_slot(self, size: Optional[int] = None):
+        """slot 的非同步版本：在背景執行緒等待名額，不佔住事件迴圈"""
+        import asyncio
+
+        units = max(1.0, size / self.size_unit) if size else 1.0
+        acquiring = asyncio.ensure_future(asyncio.to_thread(self._acquire))
+        try:
+            await asyncio.shield(acquiring)
+        except asyncio.CancelledError:
+            # 等待時被取消：背景執行緒仍會取得名額，取得後立即歸還
+            acquiring.add_done_callback(lambda _: self._abandon())
+            raise
+
+        permit = _Permit()
+        start = time.monotonic()
+        try:
+            yield permit
+        except asyncio.CancelledError:
+            self._abandon()
+            raise
+        except Exception as e:
+            self._release(time.monotonic() - start, units,
+                          'throttled' if is_throttling_error(e) else 'error')
+            raise
+        else:
+            self._release(time.monotonic() - start, units, 'throttled' if permit.throttled else 'success')
+
+    def _release(self, latency: float, units: float, outcome: str):
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+
+            if outcome == 'success':
+                self.successes += 1
+                unit_latency = latency / units
+                self._observe_latency(latency, unit_latency)
+                if unit_latency > self._baseline_latency * self.latency_tolerance:
+                    self._decrease(now, 0.9)
+                else:
+                    # 每完成約一輪（limit 個請求）上限加一
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            else:
+                if outcome == 'throttled':
+                    self.throttled += 1
+                else:
+                    self.errors += 1
+                self._decrease(now, self.backoff)
+
+            self._cond.notify_all()
+
+    def _observe_latency(self, latency: float, unit_latency: float):
+        """更新延遲平均與每單位的基準延遲（基準緩慢上升，服務整體變慢時不會一直判定為壅塞）
+
+        延遲平均保留實際秒數，作為同一輪失敗只降低一次的時間窗。
+        """
+        if self._average_latency is None:
+            self._average_latency = latency
+            self._baseline_latency = unit_latency
+            return
+        self._average_latency += self.smoothing * (latency - self._average_latency)
+        self._baseline_latency = min(unit_latency, self._baseline_latency * 1.02)
+
+    def _decrease(self, now: float, factor: float):
+        """降低並行上限；同一輪中同時失敗的多個請求只降低一次"""
+        window = self._average_latency or 1.0
+        if now - self._last_decrease < window:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * factor)
+
+    def stats(self) -> Dict[str, float]:
+        """取得目前的並行上限與請求統計"""
+        with self._cond:
+            return {
+                'limit': self.limit,
+                'in_flight': self.in_flight,
+                'successes': self.successes,
+                'throttled': self.throttled,
+                'errors': self.errors,
+                'average_latency': self._average_latency or 0.0
+            }
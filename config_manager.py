@@ -40,7 +40,23 @@ class ConfigManager:
             },
             "translation": {
                 "deepl_api_key": "",
-                "target_language": "zh-TW"
+                "target_language": "zh-TW",
+                "micro_batching": True,
+                "micro_batch_linger": 0.05,
+                "workers": 8,
+                "queue_size": 64,
+                "chunk_size": 2000,
+                "max_retries": 2,
+                "retry_delay": 0.5,
+                "backend_limits": {
+                    "google": 8,
+                    "gemini": 2
+                }
+            },
+            "daemon": {
+                "poll_interval": 300,
+                "token_refresh_margin": 300,
+                "max_workers": 4
             },
             "email_search": {
                 "default_criteria": {
@@ -73,6 +89,10 @@ class ConfigManager:
         """取得翻譯設定"""
         return self.config.get('translation', {})
     
+    def get_daemon_config(self) -> Dict[str, Any]:
+        """取得常駐模式設定"""
+        return self.config.get('daemon', {})
+    
     def get_default_search_criteria(self) -> Dict[str, str]:
         """取得預設搜尋條件"""
         return self.config.get('email_search', {}).get('default_criteria', {})
@@ -8,34 +8,63 @@
 import os
 import pickle
 import base64
-import email
-from email.mime.text import MIMEText
-import requests
 import json
 from datetime import datetime
 import time
 import re
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import sys
 import threading
 
-# Google API imports
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+# Google API、requests等較重的套件改在實際使用的方法內匯入，
+# 只用到翻譯或文字處理功能時（例如測試腳本）不需要付出載入成本
+
+# Gmail部分回應（fields遮罩）設定
+# extract_message_content 只讀取各層的 mimeType 與 body.data，
+# 不需要附件資訊、part標頭與檔名等欄位
+_BODY_PART_FIELDS = 'mimeType,body/data'
+MESSAGE_BODY_FIELDS = (
+    f'id,payload({_BODY_PART_FIELDS},parts({_BODY_PART_FIELDS},'
+    f'parts({_BODY_PART_FIELDS},parts({_BODY_PART_FIELDS}))))'
+)
+MESSAGE_FULL_FIELDS = MESSAGE_BODY_FIELDS.replace(
+    'id,payload(', 'id,payload(headers(name,value),', 1)
+METADATA_HEADERS = ['Subject', 'From', 'Date']
+# 沒有主旨標頭時使用的主旨（不需翻譯）
+NO_SUBJECT = 'No Subject'
+MESSAGE_METADATA_FIELDS = 'id,threadId,sizeEstimate,payload/headers(name,value)'
+# 批次處理時每批預先取得的郵件數上限（與Gmail批次請求建議的上限相同）
+PREFETCH_CHUNK_SIZE = 50
 
 class EmailTranslator:
     def __init__(self, config):
         """初始化郵件翻譯器"""
         self.config = config
         self.gmail_service = None
+        self._gmail_lock = threading.Lock()
+        # 保護延遲建立的共用資源（郵件儲存、翻譯記憶、處理紀錄等），並行的工作執行緒只會建立一份；
+        # 建立翻譯服務路由時會再取得翻譯執行器，因此使用可重入鎖
+        self._resource_lock = threading.RLock()
+        self.sync_checkpoint = None
+        self._pending_history_ids = {}  # 尚未確認處理完成的 historyId
+        self.message_store = None
+        self.processing_ledger = None
+        self.credentials = None
+        self.proofreader = None
+        self.translation_memory = None
+        self.template_memory = None
+        self.translation_batcher = None
+        self.translation_executor = None
+        self.backend_router = None
         
         # Gmail API權限範圍
         self.SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
     
     def authenticate_gmail(self):
         """Gmail OAuth 2.0 認證"""
+        from google.auth.transport.requests import Request
+        from google_auth_oauthlib.flow import InstalledAppFlow
+        
         creds = None
         
         # 檢查是否有已儲存的認證token
@@ -68,39 +97,119 @@ class EmailTranslator:
             with open('token.pickle', 'wb') as token:
                 pickle.dump(creds, token)
         
+        self.credentials = creds
+        
         try:
             # 建立Gmail API服務
-            self.gmail_service = build('gmail', 'v1', credentials=creds)
+            self.gmail_service = self.build_gmail_service(creds)
             print("✅ Gmail API連接成功")
             return True
         except Exception as e:
             print(f"❌ Gmail API連接失敗: {e}")
             return False
     
-    def search_emails(self, search_criteria):
-        """使用Gmail API搜尋郵件"""
+    def build_gmail_service(self, creds):
+        """以靜態discovery文件建立Gmail服務，不需要從網路下載
+        
+        設定 gmail_discovery_path 時使用該檔案，
+        否則使用 google-api-python-client 套件內附的discovery文件。
+        """
+        discovery_path = self.config.get('gmail_discovery_path')
+        if discovery_path and os.path.exists(discovery_path):
+            from googleapiclient.discovery import build_from_document
+            with open(discovery_path, 'r', encoding='utf-8') as f:
+                return build_from_document(f.read(), credentials=creds)
+        
+        from googleapiclient.discovery import build
+        return build('gmail', 'v1', credentials=creds,
+                     static_discovery=True, cache_discovery=False)
+    
+    def ensure_gmail_service(self):
+        """已連線時沿用現有的Gmail服務，否則進行認證"""
+        if self.gmail_service is not None:
+            return True
+        return self.authenticate_gmail()
+    
+    def refresh_credentials(self, margin_seconds=300):
+        """在token到期前主動更新，並寫回 token.pickle
+        
+        Args:
+            margin_seconds: 距離到期少於此秒數時更新
+        
+        Returns:
+            是否有進行更新
+        """
+        from google.auth.transport.requests import Request
+        
+        creds = self.credentials
+        if not creds or not creds.refresh_token:
+            return False
+        
+        if creds.valid and creds.expiry is not None:
+            remaining = (creds.expiry - datetime.utcnow()).total_seconds()
+            if remaining > margin_seconds:
+                return False
+        
         try:
-            # 建立搜尋查詢
-            query_parts = []
-            
-            if search_criteria.get('subject'):
-                query_parts.append(f'subject:"{search_criteria["subject"]}"')
-            
-            if search_criteria.get('sender'):
-                query_parts.append(f'from:{search_criteria["sender"]}')
-            
-            if search_criteria.get('date_after'):
-                query_parts.append(f'after:{search_criteria["date_after"]}')
-            
-            query = ' '.join(query_parts) if query_parts else 'in:inbox'
-            
+            # 與Gmail請求共用鎖，避免更新途中送出使用舊token的請求
+            with self._gmail_lock:
+                creds.refresh(Request())
+            with open('token.pickle', 'wb') as token:
+                pickle.dump(creds, token)
+            print("✅ Token已更新")
+            return True
+        except Exception as e:
+            print(f"⚠️ Token更新失敗: {e}")
+            return False
+    
+    def build_search_query(self, search_criteria):
+        """將搜尋條件轉換為Gmail查詢字串"""
+        query_parts = []
+        
+        if search_criteria.get('subject'):
+            query_parts.append(f'subject:"{search_criteria["subject"]}"')
+        
+        if search_criteria.get('sender'):
+            query_parts.append(f'from:{search_criteria["sender"]}')
+        
+        if search_criteria.get('date_after'):
+            query_parts.append(f'after:{search_criteria["date_after"]}')
+        
+        return ' '.join(query_parts) if query_parts else 'in:inbox'
+    
+    def search_emails(self, search_criteria, fetch_all=False, page_size=10):
+        """使用Gmail API搜尋郵件
+        
+        Args:
+            search_criteria: 搜尋條件字典
+            fetch_all: 是否依 nextPageToken 取得所有符合的郵件（批次模式）
+            page_size: 每頁筆數，單封模式只取第一頁
+        
+        Returns:
+            符合的郵件列表；搜尋失敗時回傳None（與找不到郵件區分，增量模式不可推進檢查點）
+        """
+        from googleapiclient.errors import HttpError
+        
+        try:
+            query = self.build_search_query(search_criteria)
             print(f"🔍 搜尋條件: {query}")
             
-            # 執行搜尋
-            results = self.gmail_service.users().messages().list(
-                userId='me', q=query, maxResults=10).execute()
-            
-            messages = results.get('messages', [])
+            # 執行搜尋，批次模式會持續翻頁直到沒有 nextPageToken
+            messages = []
+            page_token = None
+            while True:
+                request_args = {'userId': 'me', 'q': query, 'maxResults': page_size}
+                if page_token:
+                    request_args['pageToken'] = page_token
+                
+                with self._gmail_lock:
+                    results = self.gmail_service.users().messages().list(
+                        **request_args).execute()
+                
+                messages.extend(results.get('messages', []))
+                page_token = results.get('nextPageToken')
+                if not fetch_all or not page_token:
+                    break
             
             if not messages:
                 print("❌ 找不到符合條件的郵件")
@@ -111,35 +220,335 @@ class EmailTranslator:
             
         except HttpError as error:
             print(f"❌ Gmail API搜尋錯誤: {error}")
-            return []
+            return None
     
-    def get_email_content(self, message_id):
-        """取得郵件內容"""
+    def search_new_emails(self, search_criteria, search_name='default', fetch_all=False):
+        """增量搜尋：透過 history API 只取得上次同步後新增的郵件
+        
+        沒有檢查點（或檢查點已過期）時，退回一般查詢並記錄目前的 historyId
+        （單封模式只取最新的一封）。新的 historyId 會先暫存，回傳的郵件都處理完成、
+        呼叫 commit_sync_checkpoint 後才寫入檔案，避免未處理的郵件在下次執行時被略過。
+        
+        Returns:
+            推進檢查點前必須處理的所有郵件（最新的在前）；搜尋失敗時回傳None，
+            此時沒有暫存的 historyId，呼叫 commit_sync_checkpoint 也不會推進檢查點
+        """
+        from googleapiclient.errors import HttpError
+        
+        # 上一次輪詢未確認的 historyId 不可沿用：本次搜尋失敗時提交會略過上次未傳送的郵件
+        self._pending_history_ids.pop(search_name, None)
+        
+        if self.sync_checkpoint is None:
+            from sync_checkpoint import SyncCheckpoint
+            self.sync_checkpoint = SyncCheckpoint(
+                self.config.get('sync_state_file', 'sync_state.json'))
+        
+        start_history_id = self.sync_checkpoint.get_history_id(search_name)
+        
+        if start_history_id:
+            try:
+                new_ids, latest_history_id = self.list_history_message_ids(start_history_id)
+            except HttpError as error:
+                # historyId 太舊時 Gmail 回傳 404，需要重新完整同步
+                if error.resp.status != 404:
+                    print(f"❌ Gmail history API錯誤: {error}")
+                    return None
+                print("⚠️ 同步檢查點已過期，改用完整搜尋")
+            else:
+                if not new_ids:
+                    self._pending_history_ids[search_name] = latest_history_id
+                    print("✅ 沒有新郵件")
+                    return []
+                
+                print(f"📬 上次同步後新增 {len(new_ids)} 封郵件，套用搜尋條件篩選...")
+                try:
+                    messages = self.list_new_matching_messages(search_criteria, new_ids)
+                except HttpError as error:
+                    print(f"❌ Gmail API搜尋錯誤: {error}")
+                    return None
+                
+                self._pending_history_ids[search_name] = latest_history_id
+                if not messages:
+                    print("✅ 新郵件都不符合搜尋條件")
+                    return []
+                
+                print(f"📧 找到 {len(messages)} 封符合條件的新郵件")
+                return messages
+        
+        # 冷啟動：先記下目前的 historyId 再執行一般查詢，避免漏掉查詢期間的新郵件
+        history_id = None
         try:
-            # 取得完整郵件
-            message = self.gmail_service.users().messages().get(
-                userId='me', id=message_id, format='full').execute()
-            
-            # 解析郵件標頭
-            headers = message['payload'].get('headers', [])
-            subject = next((h['value'] for h in headers if h['name'] == 'Subject'), 'No Subject')
-            sender = next((h['value'] for h in headers if h['name'] == 'From'), 'Unknown Sender')
-            date = next((h['value'] for h in headers if h['name'] == 'Date'), 'Unknown Date')
-            
-            # 取得郵件內容
-            content = self.extract_message_content(message['payload'])
-            
-            return {
-                'subject': subject,
-                'sender': sender,
-                'content': content,
-                'date': date
+            with self._gmail_lock:
+                profile = self.gmail_service.users().getProfile(userId='me').execute()
+            history_id = profile['historyId']
+        except HttpError as error:
+            print(f"⚠️ 無法取得 historyId，本次不記錄同步檢查點: {error}")
+        
+        messages = self.search_emails(search_criteria, fetch_all=fetch_all,
+                                      page_size=100 if fetch_all else 10)
+        if messages is None:
+            return None
+        if history_id:
+            self._pending_history_ids[search_name] = history_id
+        return messages if fetch_all else messages[:1]
+    
+    def list_new_matching_messages(self, search_criteria, new_ids):
+        """以搜尋條件篩選新郵件，回傳符合條件的新郵件（最新的在前）
+        
+        新郵件排在查詢結果最前面：依 nextPageToken 翻頁，直到找齊所有新郵件，
+        或某一頁出現舊郵件（之後都是更舊的郵件）為止。
+        """
+        query = self.build_search_query(search_criteria)
+        new_id_set = set(new_ids)
+        messages = []
+        page_token = None
+        
+        while True:
+            request_args = {'userId': 'me', 'q': query, 'maxResults': min(500, len(new_ids))}
+            if page_token:
+                request_args['pageToken'] = page_token
+            with self._gmail_lock:
+                results = self.gmail_service.users().messages().list(**request_args).execute()
+            
+            page = results.get('messages', [])
+            messages.extend(m for m in page if m['id'] in new_id_set)
+            page_token = results.get('nextPageToken')
+            reached_old = any(m['id'] not in new_id_set for m in page)
+            if not page_token or reached_old or len(messages) >= len(new_id_set):
+                return messages
+    
+    def list_history_message_ids(self, start_history_id):
+        """取得指定 historyId 之後新增的郵件ID列表與最新的 historyId"""
+        message_ids = []
+        latest_history_id = start_history_id
+        page_token = None
+        
+        while True:
+            request_args = {
+                'userId': 'me',
+                'startHistoryId': start_history_id,
+                'historyTypes': ['messageAdded']
             }
+            if page_token:
+                request_args['pageToken'] = page_token
+            
+            with self._gmail_lock:
+                results = self.gmail_service.users().history().list(
+                    **request_args).execute()
+            
+            for record in results.get('history', []):
+                for added in record.get('messagesAdded', []):
+                    message_id = added['message']['id']
+                    if message_id not in message_ids:
+                        message_ids.append(message_id)
+            
+            latest_history_id = results.get('historyId', latest_history_id)
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+        
+        return message_ids, latest_history_id
+    
+    def commit_sync_checkpoint(self, search_name='default'):
+        """郵件處理完成後，將暫存的 historyId 寫入檢查點"""
+        history_id = self._pending_history_ids.pop(search_name, None)
+        if history_id and self.sync_checkpoint is not None:
+            self.sync_checkpoint.update_history_id(search_name, history_id)
+            print(f"💾 已更新同步檢查點: {search_name} → {history_id}")
+    
+    def get_message_store(self):
+        """取得本地郵件儲存，設定 message_store_path 為空值可停用"""
+        with self._resource_lock:
+            if self.message_store is None:
+                db_path = self.config.get('message_store_path', 'message_store.db')
+                if not db_path:
+                    return None
+                from message_store import MessageStore
+                self.message_store = MessageStore(
+                    db_path, max_bytes=self.config.get('message_store_max_bytes', 200 * 1024 * 1024))
+            return self.message_store
+    
+    def get_email_content(self, message_id):
+        """取得郵件內容（優先從本地郵件儲存讀取）"""
+        from googleapiclient.errors import HttpError
+        
+        store = self.get_message_store()
+        if store is not None:
+            email_data = store.get(message_id)
+            if email_data is not None:
+                print("💾 從本地郵件儲存讀取")
+                return email_data
+        
+        try:
+            # 取得完整郵件（googleapiclient的http物件不是執行緒安全的）
+            with self._gmail_lock:
+                message = self.gmail_service.users().messages().get(
+                    userId='me', id=message_id, format='full',
+                    fields=MESSAGE_FULL_FIELDS).execute()
+            
+            email_data = self.parse_email_message(message)
+            if store is not None:
+                store.put(message_id, email_data, message)
+            return email_data
             
         except HttpError as error:
             print(f"❌ 取得郵件內容失敗: {error}")
             return None
     
+    def _batch_get_messages(self, message_ids, parse, batch_size=50, **get_args):
+        """以Gmail批次請求執行多個 messages().get，並用 parse 解析每個回應
+        
+        每個批次最多 batch_size 封（Gmail建議不超過50），
+        100封郵件只需2次HTTP往返，而不是100次。
+        
+        Returns:
+            {message_id: parse的結果}，取得失敗的郵件不會出現在結果中
+        """
+        from googleapiclient.errors import HttpError
+        from httplib2 import HttpLib2Error
+        
+        # 連線中斷、逾時等傳輸錯誤不會包成 HttpError（socket.timeout 是 OSError 的子類別）
+        request_errors = (HttpError, HttpLib2Error, OSError)
+        results = {}
+        failed_ids = set()
+        
+        def on_response(request_id, response, exception):
+            if exception is not None:
+                failed_ids.add(request_id)
+                return
+            try:
+                results[request_id] = parse(request_id, response)
+            except (KeyError, ValueError) as e:
+                print(f"⚠️ 郵件 {request_id} 解析失敗: {e}")
+                failed_ids.add(request_id)
+        
+        for i in range(0, len(message_ids), batch_size):
+            group = message_ids[i:i + batch_size]
+            batch = self.gmail_service.new_batch_http_request(callback=on_response)
+            for message_id in group:
+                batch.add(
+                    self.gmail_service.users().messages().get(
+                        userId='me', id=message_id, **get_args),
+                    request_id=message_id)
+            
+            try:
+                with self._gmail_lock:
+                    batch.execute()
+            except request_errors as error:
+                # 整個批次失敗時改為逐封取得，單封失敗的留給處理時個別重試
+                remaining = [m for m in group if m not in results]
+                print(f"❌ Gmail批次請求失敗，改為逐封取得 {len(remaining)} 封郵件: {error}")
+                for message_id in remaining:
+                    try:
+                        with self._gmail_lock:
+                            response = self.gmail_service.users().messages().get(
+                                userId='me', id=message_id, **get_args).execute()
+                        results[message_id] = parse(message_id, response)
+                        failed_ids.discard(message_id)
+                    except request_errors + (KeyError, ValueError):
+                        failed_ids.add(message_id)
+        
+        if failed_ids:
+            print(f"⚠️ {len(failed_ids)} 封郵件批次取得失敗，稍後將個別重試")
+        
+        return results
+    
+    def get_email_metadata_batch(self, message_ids, batch_size=50):
+        """第一階段：只取得主旨、寄件者與日期標頭，供篩選與去重使用
+        
+        Returns:
+            {message_id: {subject, sender, date, size_estimate}}
+        """
+        def parse(message_id, message):
+            metadata = self.parse_email_headers(message['payload'].get('headers', []))
+            metadata['size_estimate'] = message.get('sizeEstimate', 0)
+            return metadata
+        
+        metadata = self._batch_get_messages(
+            message_ids, parse, batch_size=batch_size,
+            format='metadata', metadataHeaders=METADATA_HEADERS,
+            fields=MESSAGE_METADATA_FIELDS)
+        print(f"📋 批次取得 {len(metadata)}/{len(message_ids)} 封郵件標頭")
+        return metadata
+    
+    def get_email_bodies_batch(self, metadata_by_id, batch_size=50):
+        """第二階段：只下載要翻譯的郵件內文，並與第一階段的標頭合併
+        
+        透過fields遮罩只取回 extract_message_content 需要的 mimeType 與 body.data，
+        略過所有標頭、附件資訊與part屬性。
+        
+        Returns:
+            {message_id: 郵件資料字典}
+        """
+        store = self.get_message_store()
+        
+        def parse(message_id, message):
+            email_data = dict(metadata_by_id[message_id])
+            email_data.pop('size_estimate', None)
+            email_data['content'] = self.extract_message_content(message['payload'])
+            if store is not None:
+                store.put(message_id, email_data, message)
+            return email_data
+        
+        contents = self._batch_get_messages(
+            list(metadata_by_id), parse, batch_size=batch_size,
+            format='full', fields=MESSAGE_BODY_FIELDS)
+        print(f"📥 批次取得 {len(contents)}/{len(metadata_by_id)} 封郵件內文")
+        return contents
+    
+    def select_messages_for_translation(self, messages, metadata_by_id, seen=None):
+        """依第一階段的標頭篩選要翻譯的郵件
+        
+        同一封郵件寄到多個別名時會以不同ID出現，主旨、寄件者與日期都相同者只保留一封。
+        分批篩選時傳入同一個 seen 集合，跨批次的重複郵件也會略過。
+        
+        Returns:
+            (要翻譯的郵件列表, {message_id: 標頭資料})
+        """
+        selected = []
+        selected_metadata = {}
+        seen = set() if seen is None else seen
+        
+        for message in messages:
+            metadata = metadata_by_id.get(message['id'])
+            if metadata is None:
+                # 標頭取得失敗的郵件仍交給後續階段個別處理
+                selected.append(message)
+                continue
+            
+            key = (metadata['subject'], metadata['sender'], metadata['date'])
+            if key in seen:
+                print(f"⏭️ 略過重複郵件: {metadata['subject']}")
+                continue
+            
+            seen.add(key)
+            selected.append(message)
+            selected_metadata[message['id']] = metadata
+        
+        return selected, selected_metadata
+    
+    def parse_email_headers(self, headers):
+        """從郵件標頭取得主旨、寄件者與日期"""
+        subject = next((h['value'] for h in headers if h['name'] == 'Subject'), NO_SUBJECT)
+        sender = next((h['value'] for h in headers if h['name'] == 'From'), 'Unknown Sender')
+        date = next((h['value'] for h in headers if h['name'] == 'Date'), 'Unknown Date')
+        
+        return {
+            'subject': subject,
+            'sender': sender,
+            'date': date
+        }
+    
+    def parse_email_message(self, message):
+        """將Gmail API回傳的郵件解析為 {subject, sender, content, date} 字典"""
+        # 解析郵件標頭
+        email_data = self.parse_email_headers(message['payload'].get('headers', []))
+        
+        # 取得郵件內容
+        email_data['content'] = self.extract_message_content(message['payload'])
+        
+        return email_data
+    
     def extract_message_content(self, payload):
         """從郵件payload中提取文字內容"""
         content = ""
@@ -148,7 +557,8 @@ class EmailTranslator:
             # 多部分郵件
             for part in payload['parts']:
                 if part['mimeType'] == 'text/plain':
-                    if 'data' in part['body']:
+                    # 使用fields遮罩時，沒有data的body會整個被省略
+                    if 'data' in part.get('body', {}):
                         content = base64.urlsafe_b64decode(
                             part['body']['data']).decode('utf-8')
                         break
@@ -159,7 +569,7 @@ class EmailTranslator:
         else:
             # 單一部分郵件
             if payload['mimeType'] == 'text/plain':
-                if 'data' in payload['body']:
+                if 'data' in payload.get('body', {}):
                     content = base64.urlsafe_b64decode(
                         payload['body']['data']).decode('utf-8')
         
@@ -171,12 +581,12 @@ class EmailTranslator:
             return self.translate_long_text(text)
         
         translation_methods = [
-            self.translate_with_google_free     # Google翻譯免費版 (主要且最穩定)
+            self.translate_with_backends     # 已設定的翻譯服務（預設為Google翻譯免費版）
         ]
         
         for method in translation_methods:
             try:
-                result = method(text)
+                result = self.translate_with_memory(method, text)
                 if result and result != text and len(result) > 0:
                     print(f"✅ 翻譯成功使用: {method.__name__}")
                     return result
@@ -187,113 +597,202 @@ class EmailTranslator:
         print("⚠️ 所有翻譯服務都失敗，返回原文")
         return text
     
+    def get_translation_memory(self):
+        """取得翻譯記憶，未設定 translation_memory_path（或設為空值）時停用
+        
+        測試與其他直接建立 EmailTranslator 的程式不會在目前目錄留下記憶檔，
+        翻譯結果也不會受先前執行的快取影響；主程式由 build_runtime_config 設定路徑
+        """
+        with self._resource_lock:
+            if self.translation_memory is None:
+                db_path = self.config.get('translation_memory_path')
+                if not db_path:
+                    return None
+                from translation_memory import TranslationMemory
+                self.translation_memory = TranslationMemory(
+                    db_path,
+                    max_entries=self.config.get('translation_memory_max_entries', 50000),
+                    ttl_seconds=self.config.get('translation_memory_ttl', 30 * 24 * 3600))
+            return self.translation_memory
+    
+    def translate_with_memory(self, method, text, src_lang=None, dest_lang='zh-tw'):
+        """先查詢翻譯記憶，未命中時才呼叫翻譯方法並保存結果
+        
+        翻譯記憶依段落（過長的段落依句子）保存，只改了一段的郵件其餘段落仍可命中；
+        未命中的段落以 [PART_n] 標記合併成一個請求，翻譯後拆回各段落保存。
+        method 回傳 (翻譯結果, 實際完成翻譯的服務名稱)；翻譯記憶依服務分開保存，
+        本地測試服務等不可保存的結果不寫入記憶
+        """
+        memory = self.get_translation_memory()
+        if memory is None:
+            return method(text, src_lang)[0]
+        
+        from link_tokenizer import contains_links
+        from text_segmenter import Segmentation
+        
+        # 還有未標記的網址時翻譯結果會附上連結列表，無法拆成段落，整段保存
+        segmentation = Segmentation(text, self.config.get('translation_chunk_size', 2000), pack=False)
+        if len(segmentation) < 2 or contains_links(text):
+            return self.translate_segments(memory, method, [text], src_lang, dest_lang)[0]
+        return segmentation.join(
+            self.translate_segments(memory, method, segmentation.chunks(), src_lang, dest_lang))
+    
+    def translate_segments(self, memory, method, segments, src_lang, dest_lang):
+        """查詢各段落的翻譯記憶，未命中的段落合併成一個請求翻譯並保存，回傳各段落的翻譯"""
+        from link_tokenizer import local_placeholder_numbering, renumber_placeholders
+        from translation_batcher import join_batch, split_batch_translation
+        
+        lang_key = src_lang or 'auto'
+        backends = self.get_backend_router().cacheable_names
+        # 以段落內重新編號的連結佔位符為鍵，其他郵件中相同的段落也能命中
+        numberings = [local_placeholder_numbering(segment) for segment in segments]
+        keys = [renumber_placeholders(segment, numbering)
+                for segment, numbering in zip(segments, numberings)]
+        results = [None] * len(segments)
+        misses = []
+        for i, key in enumerate(keys):
+            cached = memory.lookup(key, lang_key, dest_lang, backends)
+            if cached is not None:
+                original = {(kind, local): index for (kind, index), local in numberings[i].items()}
+                results[i] = renumber_placeholders(cached[0], original)
+            else:
+                misses.append(i)
+        if not misses:
+            return results
+        
+        if len(misses) == 1:
+            translated = [method(segments[misses[0]], src_lang)]
+        else:
+            result, backend = method(join_batch([segments[i] for i in misses], 'PART'), src_lang)
+            parts = split_batch_translation(result, len(misses), 'PART')
+            if parts is not None:
+                translated = [(part, backend) for part in parts]
+            else:
+                # 標記被翻譯服務破壞，無法可靠拆回，改為逐段翻譯
+                print(f"⚠️ 翻譯記憶段落標記遺失，改為逐段翻譯 {len(misses)} 個段落")
+                translated = [method(segments[i], src_lang) for i in misses]
+        
+        for i, (result, backend) in zip(misses, translated):
+            results[i] = result
+            # 翻譯失敗時會回傳原文，不應保存
+            if result and result != segments[i] and backend in backends:
+                memory.put(keys[i], lang_key, dest_lang, backend,
+                           renumber_placeholders(result, numberings[i]))
+        return results
+    
+    def translate_subject(self, subject):
+        """翻譯郵件主旨（主旨很短，批次處理時會與其他郵件的段落合併送出）"""
+        if not subject or subject == NO_SUBJECT:
+            return subject
+        return self.translate_single_chunk(subject)
+    
     def translate_long_text(self, text):
         """處理長文本翻譯 - 優化速度版本"""
-        # 使用更大的分塊大小，減少API調用次數
-        max_chunk_size = 2000  # 增加到2000字符
+        chunks, src_lang, finish = self.plan_long_text(text)
+        # 並行翻譯（使用線程池），再以原本的段落與句子間隔組合
+        return finish(self.translate_chunks_parallel(chunks, src_lang) if chunks else [])
+    
+    def plan_long_text(self, text):
+        """將長文本標記連結並分塊，同步與非同步流程共用
         
-        # 如果文本不是很長，直接翻譯
-        if len(text) <= max_chunk_size:
-            return self.translate_single_chunk(text)
+        Returns:
+            (要翻譯的文本塊, 來源語言, finish)；finish(翻譯結果) 依原本的段落與句子間隔組合
+            各文本塊並還原連結。文本已經是中文時文本塊為空，finish 回傳原文。
+        """
+        # 使用更大的分塊大小，減少API調用次數（translation_chunk_size 可調整）
+        max_chunk_size = self.config.get('translation_chunk_size', 2000)
         
-        # 智能分段：優先保持段落完整性
-        paragraphs = text.split('\n\n')
-        chunks = []
-        current_chunk = ""
+        # 整封郵件的連結只提取一次，各文本塊共用連結編號，最後只產生一份連結列表
+        from link_tokenizer import LinkTable, tokenize_links
+        link_table = LinkTable()
+        protected = tokenize_links(text, link_table)
         
-        for paragraph in paragraphs:
-            # 如果加入這個段落後不會超過限制，就加入
-            if len(current_chunk + paragraph) <= max_chunk_size:
-                current_chunk += paragraph + '\n\n'
-            else:
-                # 如果當前塊不為空，先保存
-                if current_chunk.strip():
-                    chunks.append(current_chunk.strip())
-                
-                # 如果單個段落太長，需要進一步分割
-                if len(paragraph) > max_chunk_size:
-                    # 按句子分割長段落
-                    sentences = self.split_into_sentences(paragraph)
-                    temp_chunk = ""
-                    
-                    for sentence in sentences:
-                        if len(temp_chunk + sentence) <= max_chunk_size:
-                            temp_chunk += sentence + " "
-                        else:
-                            if temp_chunk.strip():
-                                chunks.append(temp_chunk.strip())
-                            temp_chunk = sentence + " "
-                    
-                    if temp_chunk.strip():
-                        current_chunk = temp_chunk
-                    else:
-                        current_chunk = ""
-                else:
-                    current_chunk = paragraph + '\n\n'
+        def restore(translated):
+            if not link_table:
+                return translated
+            return self.restore_links_in_translation(translated, link_table.links, link_table.images)
         
-        # 處理最後一個塊
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
+        # 如果文本不是很長，直接翻譯（由翻譯回應取得偵測到的語言）
+        if len(protected) <= max_chunk_size:
+            return [protected], None, lambda translated: restore(translated[0])
+        
+        # 整封郵件只偵測一次語言，所有文本塊共用結果
+        src_lang = self.detect_source_language(protected)
+        if src_lang and self.is_chinese_language(src_lang):
+            print("✅ 文本已經是中文，無需翻譯")
+            return [], src_lang, lambda translated: text
         
-        # 並行翻譯（使用線程池）
-        return self.translate_chunks_parallel(chunks)
+        # 智能分段：優先保持段落完整性（單次掃描，以原文位置表示各文本塊）
+        from text_segmenter import Segmentation
+        segmentation = Segmentation(protected, max_chunk_size)
+        return segmentation.chunks(), src_lang, lambda translated: restore(segmentation.join(translated))
     
-    def translate_chunks_parallel(self, chunks):
-        """並行翻譯多個文本塊 - 大幅提升速度"""
+    def detect_source_language(self, text, sample_size=500, min_confidence=0.3):
+        """以本地語言偵測器判斷來源語言，不需要網路請求
+        
+        Returns:
+            語言代碼；信心度不足時回傳None，改由翻譯服務自動偵測
+        """
+        from language_detector import detect_language
+        
+        sample, _, _ = self.clean_text_for_translation(text[:sample_size])
+        detected = detect_language(sample)
+        print(f"🔍 偵測到語言: {detected.lang} (信心度: {detected.confidence:.2f})")
+        
+        if detected.confidence < min_confidence:
+            print("⚠️ 偵測信心度不足，改由翻譯服務自動偵測")
+            return None
+        return detected.lang
+    
+    def is_chinese_language(self, lang):
+        """判斷語言代碼是否為不需翻譯的中文"""
+        return bool(lang) and lang.lower() in ('zh-tw', 'zh')
+    
+    def translate_chunks_parallel(self, chunks, src_lang=None):
+        """並行翻譯多個文本塊 - 大幅提升速度，回傳與 chunks 順序相同的翻譯結果"""
         if len(chunks) == 1:
-            return self.translate_single_chunk(chunks[0])
+            return [self.translate_single_chunk(chunks[0], src_lang)]
         
         print(f"🚀 使用並行翻譯處理 {len(chunks)} 個文本塊...")
         translated_chunks = [''] * len(chunks)  # 預分配結果列表
         
-        # 使用線程池並行處理
-        max_workers = min(6, len(chunks))  # 增加到6個並行線程，進一步提升速度
-        
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # 提交所有翻譯任務
-            future_to_index = {
-                executor.submit(self.translate_single_chunk_with_retry, chunk): i 
-                for i, chunk in enumerate(chunks)
-            }
-            
-            # 收集結果
-            completed = 0
-            for future in as_completed(future_to_index):
-                index = future_to_index[future]
-                try:
-                    result = future.result()
-                    translated_chunks[index] = result
-                    completed += 1
-                    print(f"✅ 完成 {completed}/{len(chunks)} 個文本塊")
-                except Exception as e:
-                    print(f"❌ 文本塊 {index+1} 翻譯失敗: {e}")
-                    translated_chunks[index] = chunks[index]  # 使用原文
-        
-        return '\n\n'.join(translated_chunks)
-    
-    def translate_single_chunk_with_retry(self, text):
-        """帶重試機制的單塊翻譯"""
-        max_retries = 2
+        # 交給全程式共用的翻譯執行器，並行數由全域上限控制（佇列滿時在此等待）
+        executor = self.get_translation_executor()
+        future_to_index = {
+            executor.submit(self.translate_single_chunk, chunk, src_lang): i 
+            for i, chunk in enumerate(chunks)
+        }
         
-        for attempt in range(max_retries + 1):
+        # 收集結果
+        completed = 0
+        for future in as_completed(future_to_index):
+            index = future_to_index[future]
             try:
-                result = self.translate_single_chunk(text)
-                if result and result != text:
-                    return result
+                result = future.result()
+                translated_chunks[index] = result
+                completed += 1
+                print(f"✅ 完成 {completed}/{len(chunks)} 個文本塊")
             except Exception as e:
-                if attempt < max_retries:
-                    time.sleep(0.5)  # 短暫延遲後重試
-                    continue
-                else:
-                    raise e
+                print(f"❌ 文本塊 {index+1} 翻譯失敗: {e}")
+                translated_chunks[index] = chunks[index]  # 使用原文
         
-        return text  # 所有重試都失敗，返回原文
+        return translated_chunks
+    
+    def get_translation_executor(self):
+        """取得全程式共用的翻譯執行器（依設定建立，翻譯服務路由與校對器共用）"""
+        with self._resource_lock:
+            if self.translation_executor is None:
+                from translation_executor import get_translation_executor
+                self.translation_executor = get_translation_executor(
+                    max_workers=self.config.get('translation_workers', 8),
+                    max_queue=self.config.get('translation_queue_size', 64),
+                    backend_limits=self.config.get('backend_limits'))
+            return self.translation_executor
     
     def split_into_sentences(self, text):
-        """將文本分割成句子"""
-        # 使用更智能的句子分割
-        sentences = re.split(r'(?<=[.!?])\s+(?=[A-Z])', text)
-        return [s.strip() for s in sentences if s.strip()]
+        """將文本分割成句子（支援中日文句尾標點）"""
+        from text_segmenter import iter_sentence_spans
+        return [text[start:end] for start, end in iter_sentence_spans(text)]
     
     def group_sentences_into_chunks(self, sentences, max_length=600):
         """將句子組合成適當大小的塊"""
@@ -313,122 +812,286 @@ class EmailTranslator:
         
         return chunks
     
-    def translate_single_chunk(self, text):
-        """翻譯單個文本塊"""
+    def translate_single_chunk(self, text, src_lang=None):
+        """翻譯單個文本塊
+        
+        Args:
+            text: 要翻譯的文本
+            src_lang: 已偵測到的來源語言，None時由翻譯服務自動偵測
+        """
         # 避免遞歸調用translate_to_chinese
         translation_methods = [
-            self.translate_with_google_free     # Google翻譯免費版（唯一且最穩定）
+            self.translate_with_backends     # 已設定的翻譯服務（依速度與健康狀態路由）
         ]
         
         for method in translation_methods:
             try:
-                result = method(text)
+                result = self.translate_with_memory(method, text, src_lang)
                 if result and result != text and len(result) > 0:
                     return result
             except Exception as e:
-                continue
+                # 暫時性錯誤已在翻譯服務層退避重試，這裡只記錄失敗並保留原文
+                print(f"⚠️ 文本塊翻譯失敗，保留原文: {e}")
         
         return text  # 如果所有方法都失敗，返回原文
     
 
     
-    def translate_with_google_free(self, text):
-        """使用Google翻譯免費版（透過googletrans套件）- 支援自動語言偵測"""
+    def translate_with_backends(self, text, src_lang=None):
+        """透過已設定的翻譯服務翻譯（預設為Google翻譯免費版）- 支援自動語言偵測
+        
+        未提供 src_lang 時以本地語言偵測器判斷；信心度不足時不另外呼叫偵測API，
+        直接以翻譯回應中偵測到的來源語言判斷，每個文本塊最多只需一次請求。
+        
+        Returns:
+            (翻譯結果, 實際完成翻譯的服務名稱)，不需翻譯或結果不可保存時服務名稱為None
+        """
         try:
-            from googletrans import Translator
-            translator = Translator()
-            
             # 清理文本並提取連結
             cleaned_text, links, image_links = self.clean_text_for_translation(text)
             
-            # 自動偵測語言
-            detected = translator.detect(cleaned_text)
-            detected_lang = detected.lang
-            confidence = detected.confidence if detected.confidence is not None else 0.0
-            
-            print(f"🔍 偵測到語言: {detected_lang} (信心度: {confidence:.2f})")
+            if src_lang is None:
+                src_lang = self.detect_source_language(cleaned_text)
             
             # 如果已經是繁體中文，直接返回
-            if detected_lang == 'zh-tw' or detected_lang == 'zh':
+            if src_lang and self.is_chinese_language(src_lang):
                 print("✅ 文本已經是中文，無需翻譯")
-                return text
+                return text, None
+            
+            # 範本郵件（帳單、通知等）：遮蔽變數後查詢範本記憶，命中時不需呼叫翻譯服務
+            template_memory = self.get_template_memory()
+            masked_text, variables = cleaned_text, []
+            if template_memory is not None:
+                from template_memory import mask_variables
+                masked_text, variables = mask_variables(cleaned_text)
+            use_template = template_memory is not None and template_memory.is_template(variables)
             
-            # 執行翻譯 - 自動偵測來源語言
-            result = translator.translate(cleaned_text, src='auto', dest='zh-tw')
+            applied = None
+            if use_template:
+                applied = self.apply_template_translation(
+                    template_memory, masked_text, variables, src_lang)
             
-            # 確保返回的是繁體中文
-            translated_text = result.text
+            if applied is not None:
+                translated_text, backend = applied
+            else:
+                # 執行翻譯 - 未知來源語言時由翻譯服務自動偵測
+                source_text = masked_text if use_template else cleaned_text
+                translated_text, detected_src, backend = self.request_translation(source_text, src_lang)
+                
+                if not src_lang:
+                    print(f"🔍 偵測到語言: {detected_src}")
+                    if detected_src and self.is_chinese_language(detected_src):
+                        print("✅ 文本已經是中文，無需翻譯")
+                        return text, None
+                
+                if use_template:
+                    filled = self.store_template_translation(
+                        template_memory, masked_text, variables, src_lang, translated_text, backend)
+                    if filled is None:
+                        filled, _, backend = self.request_translation(cleaned_text, src_lang)
+                    translated_text = filled
             
-            # 檢查翻譯結果是否包含異常字符
+            # 檢查翻譯結果是否包含異常字符，只重新翻譯損壞的句子
             if self.contains_invalid_chars(translated_text):
-                print("⚠️ 翻譯結果包含異常字符，嘗試重新翻譯...")
-                # 嘗試使用簡體中文再轉換
-                result_cn = translator.translate(cleaned_text, src='auto', dest='zh-cn')
-                # 將簡體轉繁體
-                result_tw = translator.translate(result_cn.text, src='zh-cn', dest='zh-tw')
-                translated_text = result_tw.text
+                translated_text = self.repair_translation(cleaned_text, translated_text, src_lang)
+            
+            # 連結佔位符在翻譯中遺失時，只重新翻譯遺失佔位符的句子
+            if self.has_lost_placeholders(cleaned_text, translated_text):
+                translated_text = self.repair_lost_placeholders(cleaned_text, translated_text, src_lang)
             
             # 處理連結佔位符並添加連結列表
             final_text = self.restore_links_in_translation(translated_text, links, image_links)
             
-            return final_text
+            return final_text, backend
             
-        except ImportError:
-            raise Exception("需要安裝 googletrans: pip install googletrans==4.0.0rc1")
+        except ImportError as e:
+            raise Exception(f"缺少翻譯服務需要的套件（例如 pip install googletrans==4.0.0rc1）: {e}")
         except Exception as e:
-            raise Exception(f"Google翻譯失敗: {e}")
+            raise Exception(f"翻譯失敗: {e}")
     
 
-    def clean_text_for_translation(self, text):
-        """清理文本以改善翻譯品質"""
-        # 提取並分類連結，避免重複
-        links = []
-        image_links = []
-        seen_links = set()  # 用於追蹤已見過的連結
-        seen_images = set()  # 用於追蹤已見過的圖片
-        
-        # 圖檔連結模式（包含常見圖檔格式）
-        image_pattern = r'https?://[^\s<>"{}|\\^`\[\]]+\.(?:jpg|jpeg|png|gif|bmp|webp|svg)(?:\?[^\s<>"{}|\\^`\[\]]*)?'
-        
-        # 一般連結模式 - 更寬鬆的匹配
-        general_link_pattern = r'https?://[^\s<>"{}|\\^`\[\]]+(?:[^\s<>"{}|\\^`\[\].,;!?\)\]]|[.,;!?](?!\s))*'
-        
-        def replace_image_link(match):
-            link = match.group(0)
-            if link not in seen_images:
-                seen_images.add(link)
-                image_links.append(link)
-                return f' [IMAGE_{len(image_links)-1}] '
-            else:
-                # 如果是重複的圖片連結，找到它的索引
-                try:
-                    index = image_links.index(link)
-                    return f' [IMAGE_{index}] '
-                except ValueError:
-                    return f' [IMAGE_{len(image_links)-1}] '
-        
-        def replace_general_link(match):
-            link = match.group(0)
-            # 檢查是否已經是圖檔連結
-            if not re.match(image_pattern, link):
-                if link not in seen_links:
-                    seen_links.add(link)
-                    links.append(link)
-                    return f' [LINK_{len(links)-1}] '
-                else:
-                    # 如果是重複的連結，找到它的索引
-                    try:
-                        index = links.index(link)
-                        return f' [LINK_{index}] '
-                    except ValueError:
-                        return f' [LINK_{len(links)-1}] '
-            return match.group(0)  # 保持圖檔連結不變
+    def repair_translation(self, source_text, translated_text, src_lang):
+        """重新翻譯包含異常字符的句子，其餘譯文保持不變"""
+        from translation_repair import repair_translation
+        
+        def fallback(text):
+            return self.fallback_translation(text, src_lang)
+        
+        repaired, repairs = repair_translation(
+            source_text, translated_text, fallback, self.contains_invalid_chars)
+        self.report_repairs(repairs, source_text)
+        return repaired
+    
+    def has_lost_placeholders(self, source_text, translated_text):
+        """原文中的連結佔位符是否在譯文中遺失（或被改寫到無法辨識）"""
+        from link_tokenizer import find_lost_placeholders
+        return bool(find_lost_placeholders(source_text, translated_text))
+    
+    def repair_lost_placeholders(self, source_text, translated_text, src_lang):
+        """重新翻譯遺失連結佔位符的句子，其餘譯文保持不變"""
+        from link_tokenizer import find_lost_placeholders
+        from translation_repair import apply_repairs, find_missing_spans
         
-        # 先處理圖檔連結
-        cleaned = re.sub(image_pattern, replace_image_link, text)
+        lost = find_lost_placeholders(source_text, translated_text)
+        repairs = find_missing_spans(source_text, translated_text, self.has_lost_placeholders)
+        self.report_repairs(repairs, source_text, f"翻譯結果遺失 {len(lost)} 個連結佔位符")
+        replacements = [self.fallback_translation(source_text[start:end], src_lang)
+                        for _, (start, end) in repairs]
+        return apply_repairs(translated_text, repairs, replacements)
+    
+    def fallback_translation(self, text, src_lang):
+        """備用翻譯路徑：改用簡體中文翻譯再以本地詞典轉成繁體"""
+        from chinese_converter import to_traditional
+        result_cn, _, _ = self.request_translation(text, src_lang, 'zh-cn')
+        return to_traditional(result_cn)
+    
+    def report_repairs(self, repairs, source_text, reason="翻譯結果包含異常字符"):
+        """輸出修復的句子範圍"""
+        characters = sum(s_end - s_start for _, (s_start, s_end) in repairs)
+        print(f"⚠️ {reason}，重新翻譯 {len(repairs)} 處（{characters}/{len(source_text)} 字）")
+    
+    def request_translation(self, text, src_lang, dest_lang='zh-tw'):
+        """送出翻譯請求，回傳 (翻譯結果, 來源語言, 完成翻譯的服務名稱)
         
-        # 再處理一般連結
-        cleaned = re.sub(general_link_pattern, replace_general_link, cleaned)
+        批次處理時，已知來源語言的文本交給微批次與其他郵件的段落合併成一個請求；
+        來源語言未知時仍需要翻譯回應中偵測到的語言，因此直接送出。
+        """
+        batcher = self.translation_batcher
+        if batcher is not None and src_lang:
+            translated, backend = batcher.translate(text, src_lang, dest_lang)
+            return translated, src_lang, backend
+        
+        return self.get_backend_router().translate(text, src_lang, dest_lang)
+    
+    def get_backend_router(self):
+        """取得翻譯服務路由
+        
+        translation_backends 依優先順序列出要使用的服務（google、deepl、gemini、stub），
+        未設定時使用Google翻譯免費版，並在提供 deepl_api_key 時加入 DeepL。
+        """
+        with self._resource_lock:
+            if self.backend_router is None:
+                from translation_backends import BackendRouter, create_backends
+                names = self.config.get('translation_backends')
+                if not names:
+                    names = ['google'] + (['deepl'] if self.config.get('deepl_api_key') else [])
+                backends = create_backends(names, self.config, self.config.get('backend_limits'))
+                
+                # 請求超過近期 p95 延遲仍未回應時送出對沖請求，設定 hedge_budget 為0可停用
+                hedger = None
+                if self.config.get('hedge_budget', 0.1) > 0:
+                    from request_hedging import Hedger
+                    hedger = Hedger(budget_ratio=self.config.get('hedge_budget', 0.1))
+                self.backend_router = BackendRouter(
+                    backends, self.get_translation_executor(), hedger,
+                    max_retries=self.config.get('translation_max_retries', 2),
+                    retry_delay=self.config.get('translation_retry_delay', 0.5))
+            return self.backend_router
+    
+    def start_micro_batching(self):
+        """啟用跨郵件的翻譯微批次，設定 micro_batching 為 false 可停用"""
+        if self.translation_batcher is None and self.config.get('micro_batching', True):
+            from translation_batcher import TranslationBatcher
+            router = self.get_backend_router()
+            
+            def send(text, src, dest):
+                translated, _, backend = router.translate(text, src, dest)
+                return translated, backend
+            
+            self.translation_batcher = TranslationBatcher(
+                send,
+                max_chars=self.config.get('micro_batch_max_chars', router.max_chars),
+                linger_seconds=self.config.get('micro_batch_linger', 0.05))
+        return self.translation_batcher
+    
+    def stop_micro_batching(self):
+        """送出剩餘段落並停用微批次，回傳批次統計"""
+        batcher, self.translation_batcher = self.translation_batcher, None
+        if batcher is None:
+            return None
+        batcher.close()
+        return batcher.stats()
+    
+    def get_template_memory(self):
+        """取得範本翻譯記憶，未設定 template_memory_path（或設為空值）時停用"""
+        with self._resource_lock:
+            if self.template_memory is None:
+                db_path = self.config.get('template_memory_path')
+                if not db_path:
+                    return None
+                from template_memory import TemplateMemory
+                self.template_memory = TemplateMemory(
+                    db_path, min_variables=self.config.get('template_min_variables', 3))
+            return self.template_memory
+    
+    def apply_template_translation(self, template_memory, masked_text, variables, src_lang):
+        """查詢範本記憶並填回變數，回傳 (翻譯結果, 翻譯服務名稱)，未命中或佔位符無法對應時回傳None
+        
+        相近（非完全相同）的範本只差幾句，例如 "has shipped" 與 "was not shipped"，
+        直接套用會得到相反的意思，因此重新翻譯內容不同的句子後才使用，並保存成新範本
+        """
+        from template_memory import fill_variables
+        
+        cacheable = self.get_backend_router().cacheable_names
+        cached = template_memory.lookup(masked_text, variables, src_lang or 'auto', 'zh-tw', cacheable)
+        if cached is None:
+            return None
+        
+        translation, similar_source, backend = cached
+        if similar_source is not None:
+            patched = self.patch_similar_template(similar_source, masked_text, translation, src_lang)
+            if patched is None:
+                return None
+            translation, patch_backends = patched
+            if not patch_backends <= set(cacheable):
+                # 重新翻譯的句子來自不可保存的服務，結果不寫入記憶
+                backend = None
+        
+        filled = fill_variables(translation, variables)
+        if filled is None:
+            return None
+        if similar_source is not None and backend is not None:
+            template_memory.store(masked_text, variables, src_lang or 'auto', 'zh-tw',
+                                  backend, translation)
+        print(f"🧩 套用範本翻譯（{len(variables)} 個變數）")
+        return filled, backend
+    
+    def patch_similar_template(self, similar_source, masked_text, translation, src_lang):
+        """重新翻譯相近範本中與本文不同的句子，回傳 (翻譯結果, 使用的翻譯服務)；句子無法逐句對應時回傳None"""
+        from translation_repair import apply_repairs, find_changed_spans
+        
+        changes = find_changed_spans(similar_source, masked_text, translation)
+        if changes is None:
+            return None
+        results = [self.request_translation(masked_text[start:end], src_lang)
+                   for _, (start, end) in changes]
+        print(f"🧩 相近範本重新翻譯 {len(changes)} 處不同的句子")
+        return (apply_repairs(translation, changes, [text for text, _, _ in results]),
+                {backend for _, _, backend in results})
+    
+    def store_template_translation(self, template_memory, masked_text, variables, src_lang,
+                                   translated_template, backend):
+        """保存翻譯後的範本並填回變數；佔位符被翻譯服務破壞時回傳None，由呼叫端改為翻譯原文
+        
+        範本依完成翻譯的服務分開保存，不可保存的服務（例如本地測試服務）只填回變數
+        """
+        from template_memory import fill_variables
+        
+        filled = fill_variables(translated_template, variables)
+        if filled is None:
+            print("⚠️ 範本佔位符遺失，改為直接翻譯原文")
+            return None
+        
+        if backend in self.get_backend_router().cacheable_names:
+            template_memory.store(masked_text, variables, src_lang or 'auto', 'zh-tw',
+                                  backend, translated_template)
+        return filled
+    
+    def clean_text_for_translation(self, text):
+        """清理文本以改善翻譯品質"""
+        # 提取並分類連結（圖片與一般連結一次比對，重複的連結共用同一個編號）
+        from link_tokenizer import extract_links
+        cleaned, links, image_links = extract_links(text)
         
         # 移除多餘的空白和換行
         cleaned = re.sub(r'\s+', ' ', cleaned.strip())
@@ -456,114 +1119,28 @@ class EmailTranslator:
         return False
     
     def restore_links_in_translation(self, translated_text, links, image_links=None):
-        """在翻譯結果中恢復連結並格式化 - 只顯示實際被引用的連結"""
-        result = translated_text
-        used_links = []  # 記錄實際被使用的連結
-        used_images = []  # 記錄實際被使用的圖片
-        link_mapping = {}  # 記錄原始索引到新索引的映射
-        
-        # 先掃描文本，找出實際存在的連結引用
-        import re
-        
-        # 尋找所有可能的連結引用格式
-        link_patterns = [
-            r'\[LINK_(\d+)\]',
-            r'\[link_(\d+)\]', 
-            r'\[Link_(\d+)\]'
-        ]
+        """在翻譯結果中恢復連結並格式化 - 只顯示實際被引用的連結
         
-        found_link_indices = set()
-        for pattern in link_patterns:
-            matches = re.findall(pattern, result)
-            for match in matches:
-                try:
-                    # LINK_ 格式使用0基索引
-                    original_index = int(match)
-                    if 0 <= original_index < len(links):
-                        found_link_indices.add(original_index)
-                except (ValueError, IndexError):
-                    continue
-        
-        # 對找到的索引進行排序
-        sorted_indices = sorted(found_link_indices)
-        
-        # 建立映射關係
-        for new_index, original_index in enumerate(sorted_indices):
-            link_mapping[original_index] = new_index + 1
-            used_links.append(links[original_index])
-        
-        # 處理圖片連結佔位符
-        if image_links:
-            image_patterns = [
-                r'\[IMAGE_(\d+)\]',
-                r'\[image_(\d+)\]',
-                r'\[Image_(\d+)\]'
-            ]
-            
-            found_image_indices = set()
-            for pattern in image_patterns:
-                matches = re.findall(pattern, result)
-                for match in matches:
-                    try:
-                        original_index = int(match)
-                        if 0 <= original_index < len(image_links):
-                            found_image_indices.add(original_index)
-                    except (ValueError, IndexError):
-                        continue
-            
-            sorted_image_indices = sorted(found_image_indices)
-            for new_index, original_index in enumerate(sorted_image_indices):
-                used_images.append(image_links[original_index])
-                
-                # 替換圖片佔位符
-                placeholders = [
-                    f'[IMAGE_{original_index}]',
-                    f'[image_{original_index}]',
-                    f'[Image_{original_index}]'
-                ]
-                reference = f'[圖片{new_index + 1}]'
-                
-                for placeholder in placeholders:
-                    if placeholder in result:
-                        result = result.replace(placeholder, reference)
-                        break
+        單次掃描譯文，同時辨識翻譯服務改寫過的佔位符格式（大小寫、全形括號、(連結 n) 等）
+        """
+        from link_tokenizer import restore_placeholders
+        result, used_links, used_images = restore_placeholders(
+            translated_text, links, image_links or [])
         
-        # 替換連結佔位符
-        for original_index, new_index in link_mapping.items():
-            # 所有可能的佔位符格式
-            placeholders = [
-                f'[LINK_{original_index}]',
-                f'[link_{original_index}]',
-                f'[Link_{original_index}]',
-                f'(連結 {original_index + 1})',
-                f'（連結 {original_index + 1}）',
-                f'[連結{original_index + 1}]',
-                f'(連結{original_index + 1})',
-                f'（連結{original_index + 1}）'
-            ]
-            
-            reference = f'[連結{new_index}]'
-            
-            for placeholder in placeholders:
-                if placeholder in result:
-                    result = result.replace(placeholder, reference)
-        
-        # 清理多餘空格
-        result = re.sub(r'\s+', ' ', result.strip())
+        # 清理多餘空格（保留分塊翻譯後組合時的段落換行）
+        parts = [re.sub(r'[^\S\n]+', ' ', result.strip())]
         
         # 只添加實際被使用的圖檔連結
         if used_images:
-            result += "\n\n### 🖼️ 圖片連結\n\n"
-            for i, image_link in enumerate(used_images, 1):
-                result += f"{i}. ![圖片{i}]({image_link})\n"
+            parts.append("\n\n### 🖼️ 圖片連結\n\n")
+            parts.extend(f"{i}. ![圖片{i}]({image_link})\n" for i, image_link in enumerate(used_images, 1))
         
         # 只添加實際被使用的一般連結
         if used_links:
-            result += "\n\n### 📎 相關連結\n\n"
-            for i, link in enumerate(used_links, 1):
-                result += f"{i}. {link}\n"
+            parts.append("\n\n### 📎 相關連結\n\n")
+            parts.extend(f"{i}. {link}\n" for i, link in enumerate(used_links, 1))
         
-        return result
+        return ''.join(parts)
     
 
     
@@ -575,7 +1152,8 @@ class EmailTranslator:
 
 ## 📋 郵件資訊
 
-- **主旨**: {email_data['subject']}
+- **主旨**: {email_data.get('translated_subject') or email_data['subject']}
+- **原始主旨**: {email_data['subject']}
 - **寄件者**: {email_data['sender']}
 - **日期**: {email_data['date']}
 - **翻譯時間**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
@@ -602,33 +1180,49 @@ class EmailTranslator:
             print(f"❌ 建立Markdown檔案失敗: {e}")
             return False
     
+    def build_telegram_request(self, file_path):
+        """建立Telegram通知訊息與檔案傳送的網址與參數
+        
+        Returns:
+            (訊息網址, 訊息參數, 檔案網址, 檔案類型名稱)
+        """
+        bot_token = self.config['telegram_bot_token']
+        chat_id = self.config['telegram_chat_id']
+        
+        # 判斷檔案類型
+        file_extension = os.path.splitext(file_path)[1].lower()
+        if file_extension == '.md':
+            file_type = 'Markdown檔案'
+            emoji = '📝'
+        else:
+            file_type = 'PDF檔案'
+            emoji = '📄'
+        
+        message_url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+        message_data = {
+            'chat_id': chat_id,
+            'text': f'📧 郵件翻譯完成！{emoji} {file_type}如下：'
+        }
+        document_url = f"https://api.telegram.org/bot{bot_token}/sendDocument"
+        return message_url, message_data, document_url, file_type
+    
     def send_telegram_message(self, file_path):
         """透過Telegram傳送檔案"""
+        import requests
+        from resilience import get_policy, raise_for_retry
+        
         try:
-            bot_token = self.config['telegram_bot_token']
-            chat_id = self.config['telegram_chat_id']
-            
-            # 判斷檔案類型
-            file_extension = os.path.splitext(file_path)[1].lower()
-            if file_extension == '.md':
-                file_type = 'Markdown檔案'
-                emoji = '📝'
-            else:
-                file_type = 'PDF檔案'
-                emoji = '📄'
+            message_url, message_data, document_url, file_type = self.build_telegram_request(file_path)
+            # 限流（429）或伺服器錯誤時退避重試；檔案先讀入記憶體，重試時可重新上傳
+            policy = get_policy('telegram', max_delay=30.0)
+            policy.call(lambda: raise_for_retry(requests.post(message_url, data=message_data, timeout=30)))
             
-            message_url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-            message_data = {
-                'chat_id': chat_id,
-                'text': f'📧 郵件翻譯完成！{emoji} {file_type}如下：'
-            }
-            requests.post(message_url, data=message_data)
-            
-            document_url = f"https://api.telegram.org/bot{bot_token}/sendDocument"
             with open(file_path, 'rb') as file:
-                files = {'document': file}
-                data = {'chat_id': chat_id}
-                response = requests.post(document_url, files=files, data=data)
+                content = file.read()
+            data = {'chat_id': self.config['telegram_chat_id']}
+            response = policy.call(lambda: raise_for_retry(requests.post(
+                document_url, files={'document': (os.path.basename(file_path), content)},
+                data=data, timeout=60)))
             
             if response.status_code == 200:
                 print(f"✅ {file_type}已成功透過Telegram傳送")
@@ -641,79 +1235,434 @@ class EmailTranslator:
             print(f"❌ Telegram傳送錯誤: {e}")
             return False
     
-    def process_email(self, search_criteria):
-        """主要處理流程"""
+    def proofread_translation(self, email_data, translated_content):
+        """校對與潤飾翻譯，失敗時回傳原翻譯"""
+        try:
+            proofread_result = self.get_proofreader().enhance_translation_quality(
+                email_data['content'], translated_content
+            )
+            return self.report_proofreading(proofread_result)
+        except ImportError:
+            print("⚠️ 校對模組未找到，跳過校對步驟")
+        except Exception as e:
+            print(f"⚠️ 校對過程出錯，使用原翻譯: {e}")
+        return translated_content
+    
+    def get_proofreader(self):
+        """取得共用的翻譯校對器"""
+        with self._resource_lock:
+            if self.proofreader is None:
+                from translation_proofreader import TranslationProofreader
+                self.proofreader = TranslationProofreader(self.get_translation_executor())
+            return self.proofreader
+    
+    def report_proofreading(self, proofread_result):
+        """輸出校對結果摘要並回傳校對後的文本"""
+        if proofread_result['improvements']:
+            print(f"✅ 翻譯校對完成，改進了 {len(proofread_result['improvements'])} 個地方")
+            for improvement in proofread_result['improvements'][:3]:  # 只顯示前3個改進
+                print(f"   - {improvement}")
+        else:
+            print("✅ 翻譯品質良好，無需校對")
+        return proofread_result['proofread']
+    
+    def get_processing_ledger(self):
+        """取得處理紀錄，設定 ledger_path 為空值可停用"""
+        with self._resource_lock:
+            if self.processing_ledger is None:
+                db_path = self.config.get('ledger_path', 'processing_ledger.db')
+                if not db_path:
+                    return None
+                from processing_ledger import ProcessingLedger
+                self.processing_ledger = ProcessingLedger(db_path)
+            return self.processing_ledger
+    
+    def process_message(self, message_id, markdown_filename=None, email_data=None):
+        """處理單封郵件：讀取 → 翻譯 → 校對 → Markdown → Telegram
+        
+        每完成一個階段就寫入處理紀錄，中斷後再次執行時從最後完成的階段繼續。
+        
+        Args:
+            message_id: Gmail郵件ID
+            markdown_filename: 輸出檔名，未指定時以時間戳記命名
+            email_data: 已預先取得的郵件資料（例如批次請求的結果）
+        
+        Returns:
+            成功時回傳處理過的郵件資料字典，失敗時回傳None
+        """
+        from processing_ledger import MessageProgress
+        progress = MessageProgress(self.get_processing_ledger(), message_id)
+        
+        # 1. 讀取郵件內容
+        if email_data is None:
+            email_data = self.get_email_content(message_id)
+        if not email_data:
+            return None
+        self.announce_message(email_data, progress)
+        
+        # 2. 翻譯主旨與內容（主旨未保存在處理紀錄，繼續處理時由翻譯記憶取得）
+        if not progress.reached('rendered'):
+            email_data['translated_subject'] = self.translate_subject(email_data['subject'])
+        
+        translated_content = progress.saved('translated', 'translated_content')
+        if translated_content is None:
+            print("🔄 正在翻譯...")
+            translated_content = self.translate_to_chinese(email_data['content'])
+            progress.record('translated', translated_content=translated_content)
+        
+        # 3. 校對與潤飾翻譯
+        proofread_content = progress.saved('proofread', 'proofread_content')
+        if proofread_content is None:
+            print("📝 正在校對翻譯...")
+            proofread_content = self.proofread_translation(email_data, translated_content)
+            progress.record('proofread', proofread_content=proofread_content)
+        
+        # 4. 建立Markdown檔案
+        markdown_filename = self.render_message(progress, email_data, proofread_content, markdown_filename)
+        if not markdown_filename:
+            return None
+        
+        # 5. 透過Telegram傳送
+        print("📤 正在透過Telegram傳送...")
+        if not self.send_telegram_message(markdown_filename):
+            print("❌ Telegram傳送失敗")
+            return None
+        progress.record('delivered')
+        
+        return email_data
+    
+    def announce_message(self, email_data, progress):
+        """顯示正在處理的郵件與處理紀錄中已完成的階段"""
+        print(f"📖 正在處理郵件: {email_data['subject']}")
+        if progress.stage:
+            print(f"⏩ 從處理紀錄繼續（已完成: {progress.stage}）")
+    
+    def render_message(self, progress, email_data, translated_content, markdown_filename=None):
+        """建立Markdown檔案並記錄階段（已建立且檔案仍存在時沿用），失敗時回傳None
+        
+        同步與非同步流程共用；檔案寫入與處理紀錄都是阻塞呼叫，非同步流程在背景執行緒呼叫。
+        """
+        existing = progress.rendered_path()
+        if existing:
+            return existing
+        
+        if not markdown_filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            markdown_filename = f"email_translation_{timestamp}.md"
+        print(f"📝 正在建立Markdown檔案: {markdown_filename}")
+        
+        if not self.create_markdown(email_data, translated_content, markdown_filename):
+            print("❌ Markdown檔案建立失敗")
+            return None
+        print("✅ Markdown檔案建立成功")
+        progress.record('rendered', markdown_path=markdown_filename)
+        return markdown_filename
+    
+    def process_email(self, search_criteria, search_name='default', incremental=False):
+        """主要處理流程
+        
+        Args:
+            search_criteria: 搜尋條件字典
+            search_name: 搜尋條件名稱，用於記錄增量同步檢查點
+            incremental: 是否只處理上次同步後的新郵件
+        """
         print("🚀 開始處理郵件...")
         
         # 1. Gmail認證
-        if not self.authenticate_gmail():
+        if not self.ensure_gmail_service():
             return False
         
         try:
             # 2. 搜尋郵件
-            messages = self.search_emails(search_criteria)
-            if not messages:
-                return False
-            
-            # 取得最新的郵件
-            latest_message = messages[0]
-            print(f"📧 處理最新的郵件")
-            
-            # 3. 讀取郵件內容
-            email_data = self.get_email_content(latest_message['id'])
-            if not email_data:
+            if incremental:
+                messages = self.search_new_emails(search_criteria, search_name)
+            else:
+                messages = self.search_emails(search_criteria)
+            if messages is None:
                 return False
             
-            print(f"📖 正在處理郵件: {email_data['subject']}")
-            
-            # 4. 翻譯內容
-            print("🔄 正在翻譯...")
-            translated_content = self.translate_to_chinese(email_data['content'])
-            
-            # 5. 校對與潤飾翻譯
-            print("📝 正在校對翻譯...")
-            try:
-                from translation_proofreader import TranslationProofreader
-                proofreader = TranslationProofreader()
-                proofread_result = proofreader.enhance_translation_quality(
-                    email_data['content'], translated_content
-                )
-                translated_content = proofread_result['proofread']
-                
-                if proofread_result['improvements']:
-                    print(f"✅ 翻譯校對完成，改進了 {len(proofread_result['improvements'])} 個地方")
-                    for improvement in proofread_result['improvements'][:3]:  # 只顯示前3個改進
-                        print(f"   - {improvement}")
-                else:
-                    print("✅ 翻譯品質良好，無需校對")
-            except ImportError:
-                print("⚠️ 校對模組未找到，跳過校對步驟")
-            except Exception as e:
-                print(f"⚠️ 校對過程出錯，使用原翻譯: {e}")
-            
-            # 5. 建立Markdown檔案
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            markdown_filename = f"email_translation_{timestamp}.md"
-            print(f"� 正在建立PMarkdown檔案: {markdown_filename}")
-            
-            if self.create_markdown(email_data, translated_content, markdown_filename):
-                print("✅ Markdown檔案建立成功")
-                
-                # 6. 透過Telegram傳送
-                print("📤 正在透過Telegram傳送...")
-                if self.send_telegram_message(markdown_filename):
-                    print("🎉 處理完成！")
+            # 一般模式只看最新的郵件；增量模式中所有新郵件都處理完才推進同步檢查點
+            ledger = self.get_processing_ledger()
+            pending = [m for m in (messages if incremental else messages[:1])
+                       if ledger is None or not ledger.has_reached(m['id'], 'delivered')]
+            if not pending:
+                if messages:
+                    print("✅ 最新的郵件已經翻譯並傳送過，略過")
+                if incremental:
+                    # 沒有新郵件也算同步成功
+                    self.commit_sync_checkpoint(search_name)
                     return True
-                else:
-                    print("❌ Telegram傳送失敗")
-                    return False
+                return bool(messages)
+            if pending[0] is messages[0]:
+                print("📧 處理最新的郵件")
             else:
-                print("❌ Markdown檔案建立失敗")
+                print("📧 較新的郵件已經傳送過，處理尚未傳送的最新一封")
+            
+            # 3. 讀取、翻譯、校對、建立Markdown並傳送
+            if not self.process_message(pending[0]['id']):
                 return False
+            if incremental:
+                if len(pending) == 1:
+                    self.commit_sync_checkpoint(search_name)
+                else:
+                    print(f"⏳ 還有 {len(pending) - 1} 封新郵件尚未處理，下次執行時繼續"
+                          f"（同步檢查點暫不推進，可改用 --batch 一次處理）")
+            print("🎉 處理完成！")
+            return True
                 
         except Exception as e:
             print(f"❌ 處理過程發生錯誤: {e}")
             return False
+    
+    def process_emails_batch(self, search_criteria, max_workers=4,
+                             search_name='default', incremental=False):
+        """批次處理流程：翻頁取得所有符合的郵件，並以有限的並行數處理
+        
+        郵件內文依處理進度分批取得：有空位時才下載下一批，處理較慢時不會先把所有郵件堆在記憶體中。
+        
+        Args:
+            search_criteria: 搜尋條件字典
+            max_workers: 同時處理的郵件數上限
+            search_name: 搜尋條件名稱，用於記錄增量同步檢查點
+            incremental: 是否只處理上次同步後的新郵件
+        
+        Returns:
+            本次執行的統計資料字典
+        """
+        print("🚀 開始批次處理郵件...")
+        stats = self.new_batch_stats()
+        
+        # 1. Gmail認證
+        if not self.ensure_gmail_service():
+            return stats
+        
+        start_time = time.time()
+        
+        # 2. 搜尋所有符合的郵件（跟隨nextPageToken，只取得郵件ID）
+        messages = self.find_messages_to_process(search_criteria, stats, search_name, incremental)
+        
+        if messages:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            stats_lock = threading.Lock()
+            workers = max(1, min(max_workers, len(messages)))
+            # 處理中與已取得、等待處理的郵件數上限：翻譯跟不上時不再下載更多郵件內文；
+            # 至少是一批Gmail批次請求的大小，每批仍能合併多封郵件
+            window = max(workers * 2, PREFETCH_CHUNK_SIZE)
+            capacity = threading.Semaphore(window)
+            
+            def run(message, email_data):
+                # 以郵件ID命名，避免同一秒內的檔名衝突
+                filename = f"email_translation_{timestamp}_{message['id']}.md"
+                try:
+                    email_data = self.process_message(message['id'], filename, email_data)
+                except Exception as e:
+                    print(f"❌ 郵件 {message['id']} 處理失敗: {e}")
+                    email_data = None
+                finally:
+                    capacity.release()
+                
+                with stats_lock:
+                    if email_data:
+                        stats['succeeded'] += 1
+                        stats['characters'] += len(email_data['content'])
+                    else:
+                        stats['failed'] += 1
+            
+            # 3. 以有限並行數處理每封郵件，各郵件的翻譯段落經由微批次合併送出
+            self.start_micro_batching()
+            try:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    seen = set()
+                    position = 0
+                    while position < len(messages):
+                        # 等到至少一半的空位釋出，再依目前的空位數取得下一批郵件
+                        # （先從本地郵件儲存讀取，其餘以批次請求取得）
+                        limit = min(PREFETCH_CHUNK_SIZE, len(messages) - position)
+                        size = min(window // 2, limit)
+                        for _ in range(size):
+                            capacity.acquire()
+                        while size < limit and capacity.acquire(blocking=False):
+                            size += 1
+                        chunk = messages[position:position + size]
+                        position += size
+                        
+                        selected, prefetched = self.prefetch_messages(chunk, stats, seen)
+                        for _ in range(len(chunk) - len(selected)):
+                            capacity.release()
+                        for message in selected:
+                            executor.submit(run, message, prefetched.get(message['id']))
+            finally:
+                batch_stats = self.stop_micro_batching()
+            if batch_stats:
+                stats['batched_segments'] = batch_stats['segments']
+                stats['batch_requests'] = batch_stats['requests']
+        
+        # 搜尋成功且全部處理成功才推進檢查點，失敗的郵件下次會再處理
+        if incremental and not stats['search_failed'] and stats['failed'] == 0:
+            self.commit_sync_checkpoint(search_name)
+        
+        stats['elapsed'] = time.time() - start_time
+        self.print_batch_summary(stats)
+        return stats
+    
+    @staticmethod
+    def new_batch_stats():
+        """建立批次處理的統計資料字典"""
+        return {
+            'found': 0,
+            'succeeded': 0,
+            'failed': 0,
+            'search_failed': False,
+            'skipped': 0,
+            'already_delivered': 0,
+            'characters': 0,
+            'batched_segments': 0,
+            'batch_requests': 0,
+            'elapsed': 0.0
+        }
+    
+    def find_messages_to_process(self, search_criteria, stats, search_name='default',
+                                 incremental=False):
+        """搜尋所有符合的郵件並略過已傳送過的郵件，同時更新統計資料"""
+        if incremental:
+            messages = self.search_new_emails(search_criteria, search_name, fetch_all=True)
+        else:
+            messages = self.search_emails(search_criteria, fetch_all=True, page_size=100)
+        if messages is None:
+            stats['search_failed'] = True
+            return []
+        stats['found'] = len(messages)
+        
+        # 已傳送過的郵件直接略過，不需要再讀取
+        ledger = self.get_processing_ledger()
+        if messages and ledger is not None:
+            delivered = ledger.delivered_ids(m['id'] for m in messages)
+            if delivered:
+                print(f"⏭️ 略過 {len(delivered)} 封已處理完成的郵件")
+                messages = [m for m in messages if m['id'] not in delivered]
+                stats['already_delivered'] = len(delivered)
+        return messages
+    
+    def prefetch_messages(self, messages, stats, seen=None):
+        """先從本地郵件儲存讀取，其餘以批次請求取得標頭篩選去重，再只下載要翻譯的郵件內文
+        
+        分批取得時傳入同一個 seen 集合（見 select_messages_for_translation）。
+        
+        Returns:
+            (要翻譯的郵件列表, {郵件ID: 郵件資料})
+        """
+        store = self.get_message_store()
+        stored = store.get_many(m['id'] for m in messages) if store is not None else {}
+        if stored:
+            print(f"💾 從本地郵件儲存讀取 {len(stored)} 封郵件")
+        
+        metadata = self.get_email_metadata_batch(
+            [m['id'] for m in messages if m['id'] not in stored])
+        for message_id, email_data in stored.items():
+            metadata[message_id] = {key: email_data[key] for key in ('subject', 'sender', 'date')}
+        
+        selected, metadata = self.select_messages_for_translation(messages, metadata, seen)
+        stats['skipped'] += len(messages) - len(selected)
+        
+        prefetched = {m: stored[m] for m in metadata if m in stored}
+        prefetched.update(self.get_email_bodies_batch(
+            {m: data for m, data in metadata.items() if m not in stored}))
+        return selected, prefetched
+    
+    def print_batch_summary(self, stats):
+        """輸出批次處理的吞吐量統計"""
+        elapsed = stats['elapsed']
+        processed = stats['succeeded'] + stats['failed']
+        
+        print("\n📊 批次處理統計")
+        print("=" * 40)
+        print(f"📧 找到郵件: {stats['found']} 封")
+        print(f"✅ 成功: {stats['succeeded']} 封")
+        print(f"❌ 失敗: {stats['failed']} 封")
+        print(f"⏭️ 略過重複: {stats['skipped']} 封")
+        print(f"📚 先前已完成: {stats['already_delivered']} 封")
+        if self.translation_memory is not None:
+            memory_stats = self.translation_memory.stats()
+            print(f"🧠 翻譯記憶: 命中 {memory_stats['hits']} / 未命中 {memory_stats['misses']} "
+                  f"(命中率 {memory_stats['hit_rate']:.0%})")
+        if self.template_memory is not None:
+            template_stats = self.template_memory.stats()
+            print(f"🧩 範本記憶: 完全相同 {template_stats['exact_hits']} / "
+                  f"相近 {template_stats['fuzzy_hits']} / 未命中 {template_stats['misses']}")
+        if self.translation_executor is not None:
+            gauges = self.translation_executor.gauges()
+            print(f"🧵 翻譯執行器: 最多同時 {gauges['peak_in_flight']}/{gauges['max_workers']} 個工作, "
+                  f"佇列最深 {gauges['peak_queue_depth']}")
+            for name, backend in gauges['backends'].items():
+                if backend['successes'] or backend['throttled'] or backend['errors']:
+                    print(f"📶 {name} 並行上限: {backend['limit']:.1f} "
+                          f"(成功 {backend['successes']} / 限流 {backend['throttled']} / "
+                          f"錯誤 {backend['errors']}, 平均延遲 {backend['average_latency'] * 1000:.0f} ms)")
+        if self.backend_router is not None:
+            for name, backend in self.backend_router.stats().items():
+                if backend['requests']:
+                    speed = backend['seconds_per_kchar']
+                    speed_text = f"{speed:.2f} 秒/千字" if speed is not None else "尚無成功紀錄"
+                    print(f"🌐 翻譯服務 {name}: {backend['requests']} 次請求 / "
+                          f"失敗 {backend['failures']}, {speed_text}"
+                          f"{'' if backend['healthy'] else '（暫停中）'}")
+            hedger = self.backend_router.hedger
+            hedge_stats = hedger.stats() if hedger is not None else None
+            if hedge_stats and hedge_stats['hedged']:
+                print(f"🪁 對沖請求: {hedge_stats['hedged']} / {hedge_stats['requests']} 次 "
+                      f"(對沖先完成 {hedge_stats['hedge_wins']} 次, 超出預算 {hedge_stats['budget_denied']} 次)")
+        if 'resilience' in sys.modules:
+            from resilience import policy_stats
+            for name, policy in policy_stats().items():
+                if policy['retries'] or policy['failures'] or policy['short_circuited']:
+                    print(f"🛡️ {name}: 重試 {policy['retries']} 次 / 放棄 {policy['failures']} 次 / "
+                          f"暫停中略過 {policy['short_circuited']} 次 / 超出重試預算 {policy['budget_denied']} 次")
+        if stats.get('batched_segments'):
+            print(f"🚚 翻譯微批次: {stats['batched_segments']} 個段落 → "
+                  f"{stats['batch_requests']} 次請求")
+        print(f"⏱️ 總耗時: {elapsed:.1f} 秒")
+        if elapsed > 0:
+            print(f"🚀 吞吐量: {processed / elapsed * 60:.1f} 封/分鐘, "
+                  f"{stats['characters'] / elapsed:.0f} 字符/秒")
+        print("=" * 40)
+
+def build_runtime_config(config_manager):
+    """從配置管理器建立程式配置，Telegram設定不完整時回傳None"""
+    telegram_config = config_manager.get_telegram_config()
+    translation_config = config_manager.get_translation_config()
+    
+    config = {
+        'telegram_bot_token': telegram_config.get('bot_token', ''),
+        'telegram_chat_id': telegram_config.get('chat_id', ''),
+        'deepl_api_key': translation_config.get('deepl_api_key', ''),
+        'translation_backends': translation_config.get('backends'),
+        'hedge_budget': translation_config.get('hedge_budget', 0.1),
+        'micro_batching': translation_config.get('micro_batching', True),
+        'micro_batch_linger': translation_config.get('micro_batch_linger', 0.05),
+        'translation_workers': translation_config.get('workers', 8),
+        'translation_queue_size': translation_config.get('queue_size', 64),
+        'backend_limits': translation_config.get('backend_limits'),
+        'translation_chunk_size': translation_config.get('chunk_size', 2000),
+        'translation_memory_path': translation_config.get('memory_path', 'translation_memory.db'),
+        'template_memory_path': translation_config.get('template_memory_path', 'template_memory.db'),
+        'template_min_variables': translation_config.get('template_min_variables', 3),
+        'translation_max_retries': translation_config.get('max_retries', 2),
+        'translation_retry_delay': translation_config.get('retry_delay', 0.5),
+        'async_stage_limits': translation_config.get('async_stage_limits')
+    }
+    
+    # 檢查必要設定
+    if not config['telegram_bot_token'] or config['telegram_bot_token'] == '[your_bot_token]':
+        print("❌ 請先設定Telegram Bot Token")
+        print("💡 執行 python config_manager.py 來設定Telegram資訊")
+        return None
+    
+    if not config['telegram_chat_id'] or config['telegram_chat_id'] == '[your_chat_id]':
+        print("❌ 請先設定Telegram Chat ID")
+        print("💡 執行 python config_manager.py 來設定Telegram資訊")
+        return None
+    
+    return config
 
 def main():
     """主程式"""
@@ -724,13 +1673,33 @@ def main():
     config_manager = ConfigManager()
     
     # 檢查命令列參數
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    flags = [arg for arg in sys.argv[1:] if arg.startswith('--')]
+    batch_mode = '--batch' in flags
+    incremental = '--incremental' in flags
+    async_mode = '--async' in flags
+    max_workers = 4
+    for flag in flags:
+        if flag.startswith('--workers='):
+            try:
+                max_workers = int(flag.split('=', 1)[1])
+            except ValueError:
+                max_workers = 0
+            if max_workers < 1:
+                print(f"❌ 並行數必須是正整數: {flag}")
+                print("💡 例如: python email_translator.py [搜尋條件名稱] --batch --workers=4")
+                return
+    
     search_name = None
-    if len(sys.argv) > 1:
-        search_name = sys.argv[1]
+    if args:
+        search_name = args[0]
         print(f"🔍 使用搜尋條件: {search_name}")
     else:
         print("🔍 使用預設搜尋條件")
         print("💡 提示: 可以使用 python email_translator.py [搜尋條件名稱] 來指定特定搜尋條件")
+        print("💡 加上 --batch 可處理所有符合的郵件，--workers=N 設定並行數")
+        print("💡 加上 --incremental 只處理上次執行後的新郵件")
+        print("💡 加上 --async 以非同步方式同時處理所有符合的郵件")
     
     # 取得搜尋條件
     search_criteria = config_manager.get_search_criteria(search_name)
@@ -747,29 +1716,29 @@ def main():
             print(f"   {key}: {value}")
     
     # 建立程式配置
-    telegram_config = config_manager.get_telegram_config()
-    translation_config = config_manager.get_translation_config()
-    
-    config = {
-        'telegram_bot_token': telegram_config.get('bot_token', ''),
-        'telegram_chat_id': telegram_config.get('chat_id', ''),
-        'deepl_api_key': translation_config.get('deepl_api_key', '')
-    }
-    
-    # 檢查必要設定
-    if not config['telegram_bot_token'] or config['telegram_bot_token'] == '[your_bot_token]':
-        print("❌ 請先設定Telegram Bot Token")
-        print("💡 執行 python config_manager.py 來設定Telegram資訊")
-        return
-    
-    if not config['telegram_chat_id'] or config['telegram_chat_id'] == '[your_chat_id]':
-        print("❌ 請先設定Telegram Chat ID")
-        print("💡 執行 python config_manager.py 來設定Telegram資訊")
+    config = build_runtime_config(config_manager)
+    if config is None:
         return
     
     # 建立翻譯器並執行
     translator = EmailTranslator(config)
-    success = translator.process_email(search_criteria)
+    if async_mode:
+        import asyncio
+        from async_pipeline import run_async_pipeline
+        stats = asyncio.run(run_async_pipeline(
+            translator, search_criteria, search_name=search_name or 'default',
+            incremental=incremental))
+        success = (not stats['search_failed'] and stats['failed'] == 0
+                   and (incremental or stats['found'] > 0))
+    elif batch_mode:
+        stats = translator.process_emails_batch(
+            search_criteria, max_workers=max_workers,
+            search_name=search_name or 'default', incremental=incremental)
+        success = (not stats['search_failed'] and stats['failed'] == 0
+                   and (incremental or stats['found'] > 0))
+    else:
+        success = translator.process_email(
+            search_criteria, search_name=search_name or 'default', incremental=incremental)
     
     if success:
         print("🎊 郵件翻譯和傳送完成！")
@@ -12,7 +12,8 @@ def test_all_issues_resolved():
     print("🧪 最終綜合測試 - 驗證所有問題解決狀況")
     print("=" * 60)
     
-    config = {'telegram_bot_token': '', 'telegram_chat_id': '', 'deepl_api_key': ''}
+    config = {'telegram_bot_token': '', 'telegram_chat_id': '', 'deepl_api_key': '',
+              'translation_memory_path': '', 'template_memory_path': ''}
     translator = EmailTranslator(config)
     proofreader = TranslationProofreader()
     
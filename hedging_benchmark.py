@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+請求對沖效能測試 - 以模擬的長尾延遲翻譯服務比較有無對沖時每封郵件的延遲
+（每封郵件的延遲取決於最慢的文本塊，不需要網路）
+"""
+
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from request_hedging import Hedger
+from translation_backends import BackendRouter, LocalStubBackend
+
+class SlowTailBackend(LocalStubBackend):
+    """大多數請求約50ms，約2%的請求卡住1秒"""
+    name = 'slow_tail'
+
+    def __init__(self, seed=0):
+        super().__init__()
+        self._random = random.Random(seed)
+
+    def _translate(self, text, src_lang, dest_lang):
+        time.sleep(1.0 if self._random.random() < 0.02 else self._random.uniform(0.03, 0.07))
+        return super()._translate(text, src_lang, dest_lang)
+
+def measure_emails(router, emails=40, chunks_per_email=8):
+    """每封郵件並行翻譯所有文本塊，回傳每封郵件的延遲（秒）"""
+    latencies = []
+    with ThreadPoolExecutor(max_workers=chunks_per_email) as executor:
+        for _ in range(emails):
+            start = time.perf_counter()
+            list(executor.map(lambda i: router.translate(f"chunk {i}", 'en'), range(chunks_per_email)))
+            latencies.append(time.perf_counter() - start)
+    return sorted(latencies)
+
+def percentile(latencies, q):
+    return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+def report(name, latencies):
+    print(f"{name}: 中位數 {percentile(latencies, 0.5) * 1000:.0f} ms, "
+          f"p95 {percentile(latencies, 0.95) * 1000:.0f} ms, "
+          f"p99 {percentile(latencies, 0.99) * 1000:.0f} ms")
+    return percentile(latencies, 0.99)
+
+def test_size_normalized_delay():
+    """短主旨與長文本塊混合時，正常速度的長文本塊不應被當成緩慢請求對沖"""
+    hedger = Hedger(min_delay=0.005, budget_ratio=1.0)
+
+    def request(size):
+        # 固定約20ms的連線與處理時間，另外每千字約10ms
+        latency = 0.02 + size / 1000 * 0.01
+        return hedger.run('sized', lambda: time.sleep(latency), lambda: time.sleep(latency), size=size)
+
+    # 長文本塊不到5%，未依大小換算時 p95 只有短請求的延遲
+    for i in range(60):
+        request(8000 if i % 30 == 0 else 300)
+    before = hedger.stats()
+    for _ in range(5):
+        request(8000)
+    after = hedger.stats()
+    attempts = (after['hedged'] - before['hedged']) + (after['budget_denied'] - before['budget_denied'])
+    print(f"📏 等待時間: 300字 {hedger.hedge_delay('sized', 300) * 1000:.0f} ms, "
+          f"8000字 {hedger.hedge_delay('sized', 8000) * 1000:.0f} ms")
+    print(f"{'✅' if attempts == 0 else '❌'} 正常速度的長文本塊對沖 {attempts} 次")
+    return attempts == 0
+
+if __name__ == "__main__":
+    print("🚀 請求對沖效能測試")
+    print("=" * 60)
+
+    before = report("🐢 無對沖", measure_emails(BackendRouter([SlowTailBackend(seed=1)])))
+
+    hedger = Hedger(min_delay=0.05, budget_ratio=0.1)
+    router = BackendRouter([SlowTailBackend(seed=1)], hedger=hedger)
+    # 先累積延遲樣本，讓對沖等待時間反映 p95
+    measure_emails(router, emails=5)
+    after = report("🪁 對沖", measure_emails(router))
+
+    stats = hedger.stats()
+    print("-" * 60)
+    print(f"📨 對沖請求: {stats['hedged']} / {stats['requests']} 次 "
+          f"({stats['hedged'] / max(1, stats['requests']):.1%})，對沖先完成 {stats['hedge_wins']} 次")
+    print("-" * 60)
+    sized = test_size_normalized_delay()
+    if after < before and sized:
+        print(f"🎉 每封郵件 p99 延遲降低 {(1 - after / before):.0%}")
+    elif not sized:
+        print("⚠️ 對沖等待時間沒有依請求大小換算")
+    else:
+        print("⚠️ 對沖沒有降低 p99 延遲")
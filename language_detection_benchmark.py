@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+語言偵測效能測試 - 以 language_detection_test.py 的案例比較本地偵測器與 googletrans 線上偵測
+"""
+
+import time
+
+from language_detection_test import TEST_TEXTS
+from language_detector import LanguageDetector
+
+# 各測試案例預期的語言代碼
+EXPECTED_LANGUAGES = {
+    "英文": "en",
+    "日文": "ja",
+    "韓文": "ko",
+    "法文": "fr",
+    "德文": "de",
+    "西班牙文": "es",
+    "義大利文": "it",
+    "俄文": "ru",
+    "繁體中文": "zh-tw",
+    "簡體中文": "zh-cn"
+}
+
+def time_detection(detect, text, repeat):
+    """回傳偵測結果與每次偵測的平均時間（秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        detected = detect(text)
+    return detected, (time.perf_counter() - start) / repeat
+
+def test_local_detector(repeat=1000):
+    """測試本地偵測器的準確度與速度"""
+    print("🧪 本地語言偵測器")
+    print("=" * 60)
+
+    detector = LanguageDetector()
+    correct = 0
+    total_time = 0.0
+
+    for name, text in TEST_TEXTS.items():
+        detected, elapsed = time_detection(detector.detect, text, repeat)
+        total_time += elapsed
+        expected = EXPECTED_LANGUAGES[name]
+        ok = detected.lang == expected
+        correct += ok
+        print(f"{'✅' if ok else '❌'} {name}: {detected.lang} "
+              f"(信心度: {detected.confidence:.2f}, 預期: {expected}) {elapsed * 1e6:.0f} µs")
+
+    print("-" * 60)
+    print(f"🎯 準確度: {correct}/{len(TEST_TEXTS)}")
+    print(f"⚡ 平均偵測時間: {total_time / len(TEST_TEXTS) * 1e6:.0f} µs")
+    return correct == len(TEST_TEXTS), total_time / len(TEST_TEXTS)
+
+def test_online_detector():
+    """測試 googletrans 線上偵測的速度作為比較基準（需要網路）"""
+    print("\n🌐 googletrans 線上偵測")
+    print("=" * 60)
+
+    try:
+        from googletrans import Translator
+        translator = Translator()
+    except ImportError:
+        print("⚠️ 未安裝 googletrans，略過線上偵測比較")
+        return None
+
+    total_time = 0.0
+    for name, text in TEST_TEXTS.items():
+        try:
+            detected, elapsed = time_detection(translator.detect, text, 1)
+        except Exception as e:
+            print(f"❌ {name}: 偵測失敗 {e}")
+            return None
+        total_time += elapsed
+        print(f"🔍 {name}: {detected.lang} {elapsed * 1000:.0f} ms")
+
+    print("-" * 60)
+    print(f"🐢 平均偵測時間: {total_time / len(TEST_TEXTS) * 1000:.0f} ms")
+    return total_time / len(TEST_TEXTS)
+
+if __name__ == "__main__":
+    print("🚀 語言偵測效能測試")
+    print("=" * 60)
+
+    accurate, local_time = test_local_detector()
+    online_time = test_online_detector()
+
+    if online_time:
+        print(f"\n📈 本地偵測比線上偵測快 {online_time / local_time:,.0f} 倍")
+
+    if accurate:
+        print("\n🎉 本地偵測器所有案例都正確！")
+    else:
+        print("\n⚠️ 本地偵測器有案例判斷錯誤")
@@ -5,25 +5,33 @@
 測試自動偵測不同語言並翻譯成繁體中文的功能
 """
 
+# 測試文本 - 不同語言（language_detection_benchmark.py 也使用這些案例）
+TEST_TEXTS = {
+    "英文": "Hello, this is a test message. How are you today?",
+    "日文": "こんにちは、これはテストメッセージです。今日はいかがですか？",
+    "韓文": "안녕하세요, 이것은 테스트 메시지입니다. 오늘 어떻게 지내세요?",
+    "法文": "Bonjour, ceci est un message de test. Comment allez-vous aujourd'hui?",
+    "德文": "Hallo, das ist eine Testnachricht. Wie geht es Ihnen heute?",
+    "西班牙文": "Hola, este es un mensaje de prueba. ¿Cómo estás hoy?",
+    "義大利文": "Ciao, questo è un messaggio di prova. Come stai oggi?",
+    "俄文": "Привет, это тестовое сообщение. Как дела сегодня?",
+    "繁體中文": "你好，這是一個測試訊息。你今天好嗎？",
+    "簡體中文": "你好，这是一个测试消息。你今天好吗？"
+}
+
+MIXED_TEXT = """
+        Hello everyone! 今天天気がいいですね。
+        Bonjour mes amis. 안녕하세요!
+        This is a mixed language test message.
+        """
+
 def test_language_detection():
     """測試語言偵測和翻譯功能"""
     try:
         from googletrans import Translator
         translator = Translator()
         
-        # 測試文本 - 不同語言
-        test_texts = {
-            "英文": "Hello, this is a test message. How are you today?",
-            "日文": "こんにちは、これはテストメッセージです。今日はいかがですか？",
-            "韓文": "안녕하세요, 이것은 테스트 메시지입니다. 오늘 어떻게 지내세요?",
-            "法文": "Bonjour, ceci est un message de test. Comment allez-vous aujourd'hui?",
-            "德文": "Hallo, das ist eine Testnachricht. Wie geht es Ihnen heute?",
-            "西班牙文": "Hola, este es un mensaje de prueba. ¿Cómo estás hoy?",
-            "義大利文": "Ciao, questo è un messaggio di prova. Come stai oggi?",
-            "俄文": "Привет, это тестовое сообщение. Как дела сегодня?",
-            "繁體中文": "你好，這是一個測試訊息。你今天好嗎？",
-            "簡體中文": "你好，这是一个测试消息。你今天好吗？"
-        }
+        test_texts = TEST_TEXTS
         
         print("🧪 開始測試語言偵測和翻譯功能...\n")
         print("=" * 60)
@@ -71,11 +79,7 @@ def test_mixed_language():
         
         print("\n🌐 測試混合語言文本...")
         
-        mixed_text = """
-        Hello everyone! 今天天気がいいですね。
-        Bonjour mes amis. 안녕하세요!
-        This is a mixed language test message.
-        """
+        mixed_text = MIXED_TEXT
         
         print(f"混合語言文本: {mixed_text}")
         
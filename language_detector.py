@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地語言偵測 - 以文字系統與字元三元組模型判斷語言，不需要網路
+偵測結果與 googletrans 的 Detected 物件一樣提供 lang 與 confidence 屬性
+"""
+
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Dict, Optional
+
+# 只取文本開頭的樣本即可判斷語言
+SAMPLE_SIZE = 1000
+
+# 簡繁體對照（只收錄兩種字形不同且不會互相混用的常用字），用來區分簡體與繁體中文
+_SIMPLIFIED_TRADITIONAL_PAIRS = (
+    '这這个個们們来來时時说說为為会會过過对對发發经經国國学學还還问問长長东東'
+    '车車见見现現无無门門间間开開关關将將头頭实實点點样樣话話种種让讓认認进進'
+    '动動应應当當从從机機电電气氣边邊两兩业業务務员員产產觉覺总總给給听聽书書'
+    '买買卖賣钱錢爱愛亲親记記码碼网網页頁络絡软軟视視频頻数數据據计計脑腦节節'
+    '报報题題观觀热熱欢歡谢謝请請许許试試语語读讀写寫课課连連运運邮郵费費货貨'
+    '单單号號订訂购購礼禮华華马馬鱼魚龙龍风風飞飛处處办辦备備复復杂雜统統类類'
+    '条條际際区區义義乐樂师師历歷压壓厂廠广廣庆慶户戶择擇护護换換击擊构構标標'
+    '树樹欧歐毕畢汉漢没沒决決况況测測济濟温溫满滿灯燈烦煩状狀独獨环環画畫疗療'
+    '确確离離称稱稳穩笔筆签簽简簡纪紀约約级級纸紙线線组組细細终終结結绝絕继繼'
+    '续續维維综綜绿綠罗羅职職联聯声聲胜勝脸臉艺藝药藥获獲营營虽雖补補装裝规規'
+    '览覽议議讲講设設访訪证證评評识識词詞译譯诗詩该該详詳误誤调調谈談负負责責'
+    '质質贵貴资資赛賽转轉轮輪较較辑輯输輸达達远遠违違选選适適递遞铁鐵银銀销銷'
+    '错錯键鍵闭閉闻聞阅閱队隊阳陽阶階陆陸险險随隨难難静靜顶頂项項顺順须須预預'
+    '领領颜顏饭飯馆館验驗鸡雞黄黃齐齊'
+)
+SIMPLIFIED_CHARS = frozenset(_SIMPLIFIED_TRADITIONAL_PAIRS[0::2])
+TRADITIONAL_CHARS = frozenset(_SIMPLIFIED_TRADITIONAL_PAIRS[1::2])
+
+# 拉丁字母語言的訓練語料（常用詞與句型），用來建立字元三元組模型
+_LATIN_SEED_TEXT = {
+    'en': (
+        "Hello, this is a test message. How are you today? Please check the attached file "
+        "and let me know what you think. The new version of the software includes important "
+        "security fixes and performance improvements. We would like to thank you for your "
+        "support and we look forward to working with you. If you have any questions about "
+        "your account, please contact our team. This week we have made great progress on "
+        "the project and the results will be shared with everyone next week. Thank you for "
+        "reading our newsletter, you can unsubscribe at any time."
+    ),
+    'fr': (
+        "Bonjour, ceci est un message de test. Comment allez-vous aujourd'hui? Veuillez "
+        "vérifier les informations de mise à jour du logiciel dans le fichier joint. La "
+        "nouvelle version comprend des correctifs de sécurité importants et des améliorations "
+        "de performance. Nous vous remercions de votre confiance et nous sommes heureux de "
+        "travailler avec vous. Si vous avez des questions sur votre compte, n'hésitez pas à "
+        "contacter notre équipe. Cette semaine, nous avons fait de grands progrès sur le "
+        "projet et les résultats seront partagés avec tout le monde."
+    ),
+    'de': (
+        "Hallo, das ist eine Testnachricht. Wie geht es Ihnen heute? Bitte überprüfen Sie "
+        "die Informationen zur Softwareaktualisierung in der angehängten Datei. Die neue "
+        "Version enthält wichtige Sicherheitskorrekturen und Leistungsverbesserungen. Wir "
+        "danken Ihnen für Ihre Unterstützung und freuen uns auf die Zusammenarbeit mit Ihnen. "
+        "Wenn Sie Fragen zu Ihrem Konto haben, wenden Sie sich bitte an unser Team. Diese "
+        "Woche haben wir große Fortschritte bei dem Projekt gemacht und die Ergebnisse werden "
+        "nächste Woche mit allen geteilt."
+    ),
+    'es': (
+        "Hola, este es un mensaje de prueba. ¿Cómo estás hoy? Por favor, revise la "
+        "información de actualización del software en el archivo adjunto. La nueva versión "
+        "incluye correcciones de seguridad importantes y mejoras de rendimiento. Le "
+        "agradecemos su apoyo y esperamos trabajar con usted. Si tiene alguna pregunta sobre "
+        "su cuenta, no dude en ponerse en contacto con nuestro equipo. Esta semana hemos "
+        "hecho grandes progresos en el proyecto y los resultados se compartirán con todos."
+    ),
+    'it': (
+        "Ciao, questo è un messaggio di prova. Come stai oggi? Si prega di controllare le "
+        "informazioni sull'aggiornamento del software nel file allegato. La nuova versione "
+        "include importanti correzioni di sicurezza e miglioramenti delle prestazioni. Vi "
+        "ringraziamo per il vostro sostegno e non vediamo l'ora di lavorare con voi. Se avete "
+        "domande sul vostro account, contattate il nostro gruppo. Questa settimana abbiamo "
+        "fatto grandi progressi sul progetto e i risultati saranno condivisi con tutti."
+    ),
+    'pt': (
+        "Olá, esta é uma mensagem de teste. Como você está hoje? Por favor, verifique as "
+        "informações de atualização do software no arquivo anexo. A nova versão inclui "
+        "correções de segurança importantes e melhorias de desempenho. Agradecemos o seu "
+        "apoio e esperamos trabalhar com você. Se tiver alguma dúvida sobre a sua conta, "
+        "entre em contato com a nossa equipe. Esta semana fizemos grandes progressos no "
+        "projeto e os resultados serão compartilhados com todos não só hoje."
+    ),
+    'nl': (
+        "Hallo, dit is een testbericht. Hoe gaat het vandaag met je? Controleer de informatie "
+        "over de software-update in het bijgevoegde bestand. De nieuwe versie bevat "
+        "belangrijke beveiligingsoplossingen en prestatieverbeteringen. Wij danken u voor uw "
+        "steun en kijken ernaar uit om met u samen te werken. Als u vragen heeft over uw "
+        "account, neem dan contact op met ons team. Deze week hebben we grote vooruitgang "
+        "geboekt met het project en de resultaten worden volgende week met iedereen gedeeld."
+    ),
+}
+
+# 越南文特有的字母（拉丁字母加上特殊附加符號）
+_VIETNAMESE_CHARS = frozenset('ăâđêôơưạảấầẩẫậắằẳẵặẹẻẽếềểễệỉịọỏốồổỗộớờởỡợụủứừửữựỳỵỷỹ')
+_UKRAINIAN_CHARS = frozenset('іїєґ')
+
+# 非拉丁文字系統直接對應到語言
+_SCRIPT_LANGUAGES = {
+    'hangul': 'ko',
+    'cyrillic': 'ru',
+    'greek': 'el',
+    'arabic': 'ar',
+    'hebrew': 'iw',
+    'thai': 'th',
+    'devanagari': 'hi',
+}
+
+# 漢字、假名與韓文一個字的資訊量約等於數個拉丁字母
+_CJK_WEIGHT = 3
+
+_WORD_PATTERN = re.compile(r"[^\W\d_]+")
+
+class Detected:
+    """語言偵測結果（與 googletrans.models.Detected 相容的屬性）"""
+
+    def __init__(self, lang: str, confidence: float):
+        self.lang = lang
+        self.confidence = confidence
+
+    def __repr__(self):
+        return f'Detected(lang={self.lang}, confidence={self.confidence:.2f})'
+
+def _char_script(char: str) -> Optional[str]:
+    """判斷單一字元所屬的文字系統"""
+    code = ord(char)
+    if 0x3040 <= code <= 0x30ff or 0x31f0 <= code <= 0x31ff:
+        return 'kana'
+    if 0xac00 <= code <= 0xd7af or 0x1100 <= code <= 0x11ff or 0x3130 <= code <= 0x318f:
+        return 'hangul'
+    if 0x4e00 <= code <= 0x9fff or 0x3400 <= code <= 0x4dbf or 0xf900 <= code <= 0xfaff:
+        return 'han'
+    if 0x0400 <= code <= 0x04ff:
+        return 'cyrillic'
+    if 0x0370 <= code <= 0x03ff:
+        return 'greek'
+    if 0x0600 <= code <= 0x06ff:
+        return 'arabic'
+    if 0x0590 <= code <= 0x05ff:
+        return 'hebrew'
+    if 0x0e00 <= code <= 0x0e7f:
+        return 'thai'
+    if 0x0900 <= code <= 0x097f:
+        return 'devanagari'
+    if char.isalpha() and unicodedata.name(char, '').startswith('LATIN'):
+        return 'latin'
+    return None
+
+def _trigrams(text: str):
+    """將文本切成以空白補齊的字元三元組"""
+    for word in _WORD_PATTERN.findall(text.lower()):
+        padded = f' {word} '
+        for i in range(len(padded) - 2):
+            yield padded[i:i + 3]
+
+class LanguageDetector:
+    def __init__(self, seed_text: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            seed_text: {語言代碼: 訓練語料}，預設使用內建的拉丁字母語言語料
+        """
+        self._models = {}
+        for lang, text in (seed_text or _LATIN_SEED_TEXT).items():
+            counts = Counter(_trigrams(text))
+            total = sum(counts.values())
+            vocabulary = len(counts) + 1
+            # 預先計算對數機率，未出現的三元組使用加一平滑的預設值
+            self._models[lang] = (
+                {gram: math.log((count + 1) / (total + vocabulary)) for gram, count in counts.items()},
+                math.log(1 / (total + vocabulary))
+            )
+
+    def detect(self, text: str) -> Detected:
+        """偵測文本語言，無法判斷時回傳英文且信心度為0"""
+        sample = text[:SAMPLE_SIZE]
+
+        script_counts = Counter()
+        for char in sample:
+            script = _char_script(char)
+            if script:
+                script_counts[script] += 1
+
+        if not script_counts:
+            return Detected('en', 0.0)
+
+        cjk = script_counts['han'] + script_counts['kana']
+        weighted = {
+            'cjk': cjk * _CJK_WEIGHT,
+            'hangul': script_counts['hangul'] * _CJK_WEIGHT,
+        }
+        for script, count in script_counts.items():
+            if script not in ('han', 'kana', 'hangul'):
+                weighted[script] = count
+
+        total = sum(weighted.values())
+        dominant = max(weighted, key=weighted.get)
+        share = weighted[dominant] / total
+
+        if dominant == 'cjk':
+            return self._detect_cjk(sample, script_counts, share)
+        if dominant == 'cyrillic' and any(c in _UKRAINIAN_CHARS for c in sample.lower()):
+            return Detected('uk', share)
+        if dominant in _SCRIPT_LANGUAGES:
+            return Detected(_SCRIPT_LANGUAGES[dominant], share)
+        return self._detect_latin(sample, share)
+
+    def _detect_cjk(self, sample: str, script_counts: Counter, share: float) -> Detected:
+        """區分日文與簡繁體中文"""
+        # 日文幾乎一定會出現假名
+        if script_counts['kana'] >= max(2, script_counts['han'] * 0.1):
+            return Detected('ja', share)
+
+        simplified = sum(1 for c in sample if c in SIMPLIFIED_CHARS)
+        traditional = sum(1 for c in sample if c in TRADITIONAL_CHARS)
+        if simplified > traditional:
+            return Detected('zh-cn', share * simplified / (simplified + traditional))
+        if traditional > simplified:
+            return Detected('zh-tw', share * traditional / (simplified + traditional))
+        # 沒有可區分的字形時視為繁體，避免不必要的翻譯
+        return Detected('zh-tw', share * 0.5)
+
+    def _detect_latin(self, sample: str, share: float) -> Detected:
+        """以字元三元組模型判斷拉丁字母語言"""
+        lowered = sample.lower()
+        if sum(1 for c in lowered if c in _VIETNAMESE_CHARS) >= 3:
+            return Detected('vi', share)
+
+        grams = list(_trigrams(sample))
+        if not grams:
+            return Detected('en', 0.0)
+
+        scores = {}
+        for lang, (log_probs, unseen) in self._models.items():
+            scores[lang] = sum(log_probs.get(gram, unseen) for gram in grams)
+
+        best = max(scores, key=scores.get)
+        # 以平均每個三元組的分數差換算成0~1的信心度
+        normalizer = max(scores.values())
+        weights = {lang: math.exp((score - normalizer) / math.sqrt(len(grams)))
+                   for lang, score in scores.items()}
+        confidence = weights[best] / sum(weights.values())
+        return Detected(best, share * confidence)
+
+_default_detector = None
+_default_detector_lock = threading.Lock()
+
+def get_language_detector() -> LanguageDetector:
+    """取得全程式共用的語言偵測器（模型只建立一次）"""
+    global _default_detector
+    with _default_detector_lock:
+        if _default_detector is None:
+            _default_detector = LanguageDetector()
+        return _default_detector
+
+def detect_language(text: str) -> Detected:
+    """使用共用的語言偵測器偵測文本語言"""
+    return get_language_detector().detect(text)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+連結標記 - 整封郵件只掃描一次，把網址換成 [LINK_n] / [IMAGE_n] 佔位符
+網址由預先編譯的正規表示式一次比對，再依副檔名分出圖片，重複的網址以字典在 O(1) 時間找到既有編號。
+編號在整封郵件中共用，分塊翻譯後只需要在郵件結尾產生一份連結列表。
+還原時同樣只掃描一次譯文，辨識翻譯服務改寫過的佔位符，並找出在翻譯中遺失的佔位符。
+"""
+
+import re
+from typing import Dict, List, Set, Tuple
+
+_URL_CHARS = r'[^\s<>"{}|\\^`\[\]]'
+
+# 網址只掃描一次；開頭是圖檔網址（常見圖檔格式，可帶查詢參數）的視為圖片，其餘為一般連結
+_LINK_PATTERN = re.compile(
+    r'https?://' + _URL_CHARS + r'+(?:[^\s<>"{}|\\^`\[\].,;!?\)\]]|[.,;!?](?!\s))*')
+_IMAGE_PATTERN = re.compile(
+    r'https?://' + _URL_CHARS + r'+\.(?:jpg|jpeg|png|gif|bmp|webp|svg)(?:\?' + _URL_CHARS + r'*)?')
+
+# 翻譯服務可能改寫的佔位符：大小寫、全形括號、多餘空白，
+# 或被翻成中文的 [連結n]、(連結 n)、（圖片n）等（中文格式從 1 開始編號）
+_PLACEHOLDER_PATTERN = re.compile(
+    r'[\[［【]\s*(?P<kind>link|image)\s*_\s*(?P<index>\d+)\s*[\]］】]'
+    r'|[\[［【(（]\s*(?P<zh_kind>連結|圖片)\s*(?P<number>\d+)\s*[\]］】)）]',
+    re.IGNORECASE)
+
+Placeholder = Tuple[str, int]
+
+def _parse_placeholder(match) -> Placeholder:
+    """回傳佔位符的 ('link' 或 'image', 從 0 開始的編號)"""
+    if match.group('kind'):
+        return match.group('kind').lower(), int(match.group('index'))
+    return ('link' if match.group('zh_kind') == '連結' else 'image'), int(match.group('number')) - 1
+
+class LinkTable:
+    """整封郵件的連結與圖片列表，同一網址只保存一次"""
+
+    def __init__(self):
+        self.links: List[str] = []
+        self.images: List[str] = []
+        self._link_index: Dict[str, int] = {}
+        self._image_index: Dict[str, int] = {}
+
+    def __bool__(self):
+        return bool(self.links or self.images)
+
+    def add_link(self, url: str) -> int:
+        """加入一般連結，回傳編號（重複的網址回傳既有編號）"""
+        index = self._link_index.get(url)
+        if index is None:
+            index = self._link_index[url] = len(self.links)
+            self.links.append(url)
+        return index
+
+    def add_image(self, url: str) -> int:
+        """加入圖片連結，回傳編號（重複的網址回傳既有編號）"""
+        index = self._image_index.get(url)
+        if index is None:
+            index = self._image_index[url] = len(self.images)
+            self.images.append(url)
+        return index
+
+def tokenize_links(text: str, table: LinkTable) -> str:
+    """把文本中的網址換成佔位符，網址加入 table"""
+    def replace(match):
+        url = match.group(0)
+        image = _IMAGE_PATTERN.match(url)
+        if image:
+            # 圖檔網址後面的字元（例如句點）保留在文本中
+            return f' [IMAGE_{table.add_image(image.group(0))}] ' + url[image.end():]
+        return f' [LINK_{table.add_link(url)}] '
+    return _LINK_PATTERN.sub(replace, text)
+
+def extract_links(text: str) -> Tuple[str, List[str], List[str]]:
+    """標記單段文本的網址，回傳 (標記後的文本, 連結列表, 圖片列表)"""
+    table = LinkTable()
+    return tokenize_links(text, table), table.links, table.images
+
+def contains_links(text: str) -> bool:
+    """文本中是否還有未標記的網址"""
+    return _LINK_PATTERN.search(text) is not None
+
+def find_placeholders(text: str) -> Set[Placeholder]:
+    """文本中出現的佔位符 {('link' 或 'image', 編號)}，包含被改寫的格式"""
+    return {_parse_placeholder(match) for match in _PLACEHOLDER_PATTERN.finditer(text)}
+
+def find_lost_placeholders(source: str, translated: str) -> List[Placeholder]:
+    """原文中有、譯文中卻找不到（遺失或改寫到無法辨識）的佔位符"""
+    return sorted(find_placeholders(source) - find_placeholders(translated))
+
+def local_placeholder_numbering(text: str) -> Dict[Placeholder, int]:
+    """依出現順序把文本中的佔位符從 0 重新編號（連結與圖片分開編號）
+
+    同一段落在不同郵件中的連結編號不同，翻譯記憶以重新編號後的文本為鍵才能互相命中。
+    """
+    numbering: Dict[Placeholder, int] = {}
+    counts = {'link': 0, 'image': 0}
+    for match in _PLACEHOLDER_PATTERN.finditer(text):
+        placeholder = _parse_placeholder(match)
+        if placeholder not in numbering:
+            numbering[placeholder] = counts[placeholder[0]]
+            counts[placeholder[0]] += 1
+    return numbering
+
+def renumber_placeholders(text: str, numbering: Dict[Placeholder, int]) -> str:
+    """依 numbering 把佔位符改成新編號的 [LINK_n] / [IMAGE_n]，不在 numbering 中的保持原樣"""
+    def replace(match):
+        kind, index = _parse_placeholder(match)
+        new_index = numbering.get((kind, index))
+        if new_index is None:
+            return match.group(0)
+        return f'[{kind.upper()}_{new_index}]'
+    return _PLACEHOLDER_PATTERN.sub(replace, text)
+
+def restore_placeholders(text: str, links: List[str],
+                         images: List[str]) -> Tuple[str, List[str], List[str]]:
+    """單次掃描把佔位符換成 [連結n] / [圖片n]，回傳 (還原後的文本, 文中引用的連結, 文中引用的圖片)
+
+    只列出文中實際引用的連結，依原本的編號排序後重新從 1 編號；
+    編號超出範圍的佔位符保持原樣。
+    """
+    tables = {'link': links, 'image': images}
+    matches = []
+    used = {'link': set(), 'image': set()}
+    for match in _PLACEHOLDER_PATTERN.finditer(text):
+        kind, index = _parse_placeholder(match)
+        if 0 <= index < len(tables[kind]):
+            matches.append((match.start(), match.end(), kind, index))
+            used[kind].add(index)
+
+    numbering = {kind: {index: number for number, index in enumerate(sorted(indices), 1)}
+                 for kind, indices in used.items()}
+    labels = {'link': '連結', 'image': '圖片'}
+    parts = []
+    position = 0
+    for start, end, kind, index in matches:
+        parts.append(text[position:start])
+        parts.append(f'[{labels[kind]}{numbering[kind][index]}]')
+        position = end
+    parts.append(text[position:])
+
+    return (''.join(parts),
+            [links[index] for index in sorted(used['link'])],
+            [images[index] for index in sorted(used['image'])])
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+連結標記效能測試 - 以連結很多的電子報比較逐塊提取連結與整封郵件提取一次的速度、
+原本逐一替換與單次掃描還原佔位符的速度，並以本地測試翻譯服務檢查整封郵件只產生一份連結列表、
+遺失佔位符的句子會被重新翻譯（不需要網路）
+"""
+
+import re
+import time
+
+from link_tokenizer import LinkTable, restore_placeholders, tokenize_links
+
+IMAGE_PATTERN = r'https?://[^\s<>"{}|\\^`\[\]]+\.(?:jpg|jpeg|png|gif|bmp|webp|svg)(?:\?[^\s<>"{}|\\^`\[\]]*)?'
+GENERAL_LINK_PATTERN = r'https?://[^\s<>"{}|\\^`\[\]]+(?:[^\s<>"{}|\\^`\[\].,;!?\)\]]|[.,;!?](?!\s))*'
+
+def build_newsletter(items=300):
+    """產生連結很多的電子報：每則有文章連結、追蹤連結、重複的頁尾連結與圖片"""
+    paragraphs = []
+    for i in range(items):
+        paragraphs.append(
+            f"Story {i}: researchers released a new model with strong results on several benchmarks. "
+            f"Read more at https://news.example.com/articles/{i}?utm_source=newsletter and "
+            f"https://twitter.com/example/status/{1945000000000000000 + i}. "
+            f"Cover image https://cdn.example.com/images/{i % 50}.png "
+            f"Discuss at https://forum.example.com/t/{i % 40} or unsubscribe https://example.com/unsubscribe")
+    return '\n\n'.join(paragraphs)
+
+def legacy_extract_links(text):
+    """原本的做法：圖片與一般連結分兩次掃描，重複的連結以 list.index 尋找編號"""
+    links, image_links = [], []
+    seen_links, seen_images = set(), set()
+
+    def replace_image_link(match):
+        link = match.group(0)
+        if link not in seen_images:
+            seen_images.add(link)
+            image_links.append(link)
+            return f' [IMAGE_{len(image_links)-1}] '
+        return f' [IMAGE_{image_links.index(link)}] '
+
+    def replace_general_link(match):
+        link = match.group(0)
+        if re.match(IMAGE_PATTERN, link):
+            return link
+        if link not in seen_links:
+            seen_links.add(link)
+            links.append(link)
+            return f' [LINK_{len(links)-1}] '
+        return f' [LINK_{links.index(link)}] '
+
+    cleaned = re.sub(IMAGE_PATTERN, replace_image_link, text)
+    cleaned = re.sub(GENERAL_LINK_PATTERN, replace_general_link, cleaned)
+    return cleaned, links, image_links
+
+def legacy_restore_links(text, links, image_links):
+    """原本的做法：每種格式各掃描一次，再對每個連結逐一嘗試各種格式的 str.replace"""
+    found_links = set()
+    for pattern in (r'\[LINK_(\d+)\]', r'\[link_(\d+)\]', r'\[Link_(\d+)\]'):
+        found_links.update(i for i in map(int, re.findall(pattern, text)) if i < len(links))
+    found_images = set()
+    for pattern in (r'\[IMAGE_(\d+)\]', r'\[image_(\d+)\]', r'\[Image_(\d+)\]'):
+        found_images.update(i for i in map(int, re.findall(pattern, text)) if i < len(image_links))
+
+    for new_index, index in enumerate(sorted(found_images), 1):
+        for placeholder in (f'[IMAGE_{index}]', f'[image_{index}]', f'[Image_{index}]'):
+            if placeholder in text:
+                text = text.replace(placeholder, f'[圖片{new_index}]')
+                break
+    for new_index, index in enumerate(sorted(found_links), 1):
+        for placeholder in (f'[LINK_{index}]', f'[link_{index}]', f'[Link_{index}]',
+                            f'(連結 {index + 1})', f'（連結 {index + 1}）', f'[連結{index + 1}]',
+                            f'(連結{index + 1})', f'（連結{index + 1}）'):
+            if placeholder in text:
+                text = text.replace(placeholder, f'[連結{new_index}]')
+    return text
+
+def time_call(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+def test_tokenizer_speed(newsletter, chunk_size=2000, repeat=20):
+    """比較逐塊提取（每塊各自編號）與整封郵件提取一次"""
+    from text_segmenter import iter_chunk_spans
+
+    print("🧪 連結提取速度")
+    print("=" * 60)
+    spans = list(iter_chunk_spans(newsletter, chunk_size))
+    legacy = time_call(lambda: [legacy_extract_links(newsletter[s:e]) for s, e in spans], repeat)
+    legacy_whole = time_call(lambda: legacy_extract_links(newsletter), repeat)
+    single = time_call(lambda: tokenize_links(newsletter, LinkTable()), repeat)
+
+    legacy_links = sum(len(legacy_extract_links(newsletter[s:e])[1]) for s, e in spans)
+    table = LinkTable()
+    tokenize_links(newsletter, table)
+    print(f"🐢 逐塊提取（{len(spans)} 塊）: {legacy * 1000:.1f} ms, 各塊連結列表共 {legacy_links} 個連結")
+    print(f"🐢 原本做法提取整封郵件: {legacy_whole * 1000:.1f} ms")
+    print(f"⚡ 單次掃描提取整封郵件: {single * 1000:.1f} ms, 列出 {len(table.links)} 個連結、{len(table.images)} 張圖片")
+    print(f"🎉 整封郵件提取速度提升 {legacy_whole / single:.1f} 倍，重複列出的連結減少 {legacy_links - len(table.links)} 個")
+
+def test_restore_scaling(repeat=5):
+    """比較原本逐一替換與單次掃描還原佔位符，連結數加倍時觀察耗時的成長"""
+    print("\n🧪 佔位符還原速度")
+    print("=" * 60)
+    for count in (100, 200, 400, 800):
+        tokenized = tokenize_links(build_newsletter(count), LinkTable())
+        links = [f'https://example.com/{i}' for i in range(count * 4)]
+        images = [f'https://example.com/{i}.png' for i in range(count)]
+        legacy = time_call(lambda: legacy_restore_links(tokenized, links, images), repeat)
+        single = time_call(lambda: restore_placeholders(tokenized, links, images), repeat)
+        print(f"🔗 {count} 則（{len(tokenized)} 字）: 原本 {legacy * 1000:.1f} ms, "
+              f"單次掃描 {single * 1000:.1f} ms（提升 {legacy / single:.0f} 倍）")
+
+def test_single_appendix(newsletter):
+    """以本地測試翻譯服務翻譯整封電子報，檢查只產生一份連結列表且編號連續"""
+    from email_translator import EmailTranslator
+    from translation_backends import BackendRouter, LocalStubBackend
+
+    print("\n🧪 整封郵件的連結列表")
+    print("=" * 60)
+    translator = EmailTranslator({'translation_memory_path': '', 'template_memory_path': '',
+                                  'hedge_budget': 0})
+    translator.backend_router = BackendRouter([LocalStubBackend()])
+    start = time.perf_counter()
+    result = translator.translate_long_text(newsletter)
+    elapsed = time.perf_counter() - start
+
+    appendices = result.count('### 📎 相關連結')
+    body = result.split('### 🖼️ 圖片連結')[0]
+    references = {int(n) for n in re.findall(r'\[連結(\d+)\]', body)}
+    listed = len(re.findall(r'^\d+\. https?://', result, re.MULTILINE))
+    ok = appendices == 1 and references == set(range(1, listed + 1))
+    print(f"{'✅' if ok else '❌'} 連結列表 {appendices} 份, 文中引用 {len(references)} 個連結, "
+          f"列表 {listed} 個連結 ({elapsed * 1000:.0f} ms)")
+    return ok
+
+def test_lost_placeholder_repair():
+    """以會弄丟佔位符的測試翻譯服務翻譯，檢查只重新翻譯遺失佔位符的句子"""
+    from email_translator import EmailTranslator
+    from translation_backends import BackendRouter, LocalStubBackend
+
+    class DroppingBackend(LocalStubBackend):
+        """繁體中文翻譯會弄丟 [LINK_1]，簡體中文（備用路徑）則正常保留"""
+        def _translate(self, text, src_lang, dest_lang):
+            if dest_lang == 'zh-tw':
+                text = text.replace('[LINK_1]', '')
+            return super()._translate(text, src_lang, dest_lang)
+
+    print("\n🧪 遺失佔位符的句子重新翻譯")
+    print("=" * 60)
+    translator = EmailTranslator({'translation_memory_path': '', 'template_memory_path': '',
+                                  'hedge_budget': 0})
+    translator.backend_router = BackendRouter([DroppingBackend()])
+    text = ("Read the launch post at https://example.com/launch today. "
+            "The benchmark results are at https://example.com/results for everyone. "
+            "Thanks for reading and see you next week.")
+    result = translator.translate_long_text(text)
+    body = result.split('### 📎 相關連結')[0]
+    ok = body.count('〔zh-cn〕') == 1 and '[連結1]' in body and '[連結2]' in body
+    print(f"{'✅' if ok else '❌'} {body.strip()}")
+    return ok
+
+if __name__ == "__main__":
+    print("🚀 連結標記效能測試")
+    newsletter = build_newsletter()
+    print(f"📰 測試電子報: {len(newsletter)} 字")
+    test_tokenizer_speed(newsletter)
+    test_restore_scaling()
+    if test_single_appendix(newsletter) & test_lost_placeholder_repair():
+        print("\n🎉 連結標記測試通過！")
+    else:
+        print("\n⚠️ 連結列表不符合預期")
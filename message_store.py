@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地郵件儲存 - 以Gmail郵件ID為鍵保存已解析的郵件內容與原始payload
+Gmail郵件內容不會改變，重新執行、重試或重新產生報告時可直接從本地讀取
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+class MessageStore:
+    def __init__(self, db_path='message_store.db', max_bytes=200 * 1024 * 1024):
+        """
+        Args:
+            db_path: SQLite資料庫路徑
+            max_bytes: 儲存上限，超過時淘汰最久未使用的郵件
+        """
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS messages (
+                message_id TEXT PRIMARY KEY,
+                email_data TEXT NOT NULL,
+                raw_payload TEXT,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+        ''')
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_messages_last_accessed ON messages (last_accessed)')
+        self._conn.commit()
+
+    def get(self, message_id: str) -> Optional[Dict[str, str]]:
+        """取得已解析的郵件資料，不存在時回傳None"""
+        return self.get_many([message_id]).get(message_id)
+
+    def get_many(self, message_ids: Iterable[str]) -> Dict[str, Dict[str, str]]:
+        """一次取得多封郵件，回傳 {message_id: 郵件資料字典}"""
+        message_ids = list(message_ids)
+        found = {}
+
+        with self._lock:
+            # SQLite參數上限為999，分段查詢
+            for i in range(0, len(message_ids), 500):
+                group = message_ids[i:i + 500]
+                placeholders = ','.join('?' * len(group))
+                rows = self._conn.execute(
+                    f'SELECT message_id, email_data FROM messages WHERE message_id IN ({placeholders})',
+                    group).fetchall()
+                for message_id, email_data in rows:
+                    found[message_id] = json.loads(email_data)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    'UPDATE messages SET last_accessed = ? WHERE message_id = ?',
+                    [(now, message_id) for message_id in found])
+                self._conn.commit()
+
+            self.hits += len(found)
+            self.misses += len(message_ids) - len(found)
+
+        return found
+
+    def get_raw_payload(self, message_id: str) -> Optional[dict]:
+        """取得Gmail API回傳的原始郵件資料"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT raw_payload FROM messages WHERE message_id = ?',
+                (message_id,)).fetchone()
+        if row and row[0]:
+            return json.loads(row[0])
+        return None
+
+    def put(self, message_id: str, email_data: Dict[str, str], raw_payload: Optional[dict] = None):
+        """儲存郵件，並在超過容量上限時淘汰最久未使用的郵件"""
+        email_json = json.dumps(email_data, ensure_ascii=False)
+        raw_json = json.dumps(raw_payload, ensure_ascii=False) if raw_payload is not None else None
+        size = len(email_json.encode('utf-8')) + len(raw_json.encode('utf-8') if raw_json else b'')
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO messages '
+                '(message_id, email_data, raw_payload, size, created_at, last_accessed) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (message_id, email_json, raw_json, size, now, now))
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """淘汰最久未使用的郵件直到低於容量上限（呼叫前需持有鎖）"""
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM messages').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute(
+            'SELECT message_id, size FROM messages ORDER BY last_accessed ASC').fetchall()
+        evicted = []
+        for message_id, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((message_id,))
+            total -= size
+
+        self._conn.executemany('DELETE FROM messages WHERE message_id = ?', evicted)
+
+    def stats(self) -> Dict[str, int]:
+        """取得儲存統計"""
+        with self._lock:
+            count, total = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM messages').fetchone()
+        return {
+            'messages': count,
+            'bytes': total,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+    def close(self):
+        """關閉資料庫連線"""
+        with self._lock:
+            self._conn.close()
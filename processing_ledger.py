@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+處理紀錄 - 記錄每封郵件完成到哪個處理階段
+已傳送的郵件不會重複翻譯，中斷的郵件可從最後完成的階段繼續
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional, Set
+
+# 處理階段（依順序）
+STAGES = ['translated', 'proofread', 'rendered', 'delivered']
+
+class ProcessingLedger:
+    def __init__(self, db_path='processing_ledger.db'):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS processed_messages (
+                message_id TEXT PRIMARY KEY,
+                stage TEXT NOT NULL,
+                translated_content TEXT,
+                proofread_content TEXT,
+                markdown_path TEXT,
+                updated_at REAL NOT NULL
+            )
+        ''')
+        self._conn.commit()
+
+    def get(self, message_id: str) -> Optional[Dict[str, str]]:
+        """取得郵件的處理紀錄，沒有紀錄時回傳None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT stage, translated_content, proofread_content, markdown_path '
+                'FROM processed_messages WHERE message_id = ?',
+                (message_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            'stage': row[0],
+            'translated_content': row[1],
+            'proofread_content': row[2],
+            'markdown_path': row[3]
+        }
+
+    def has_reached(self, message_id: str, stage: str) -> bool:
+        """檢查郵件是否已完成指定階段"""
+        entry = self.get(message_id)
+        return entry is not None and STAGES.index(entry['stage']) >= STAGES.index(stage)
+
+    def delivered_ids(self, message_ids: Iterable[str]) -> Set[str]:
+        """從郵件ID中找出已傳送完成的郵件"""
+        message_ids = list(message_ids)
+        delivered = set()
+        with self._lock:
+            for i in range(0, len(message_ids), 500):
+                group = message_ids[i:i + 500]
+                placeholders = ','.join('?' * len(group))
+                rows = self._conn.execute(
+                    f'SELECT message_id FROM processed_messages '
+                    f'WHERE stage = ? AND message_id IN ({placeholders})',
+                    ['delivered'] + group).fetchall()
+                delivered.update(row[0] for row in rows)
+        return delivered
+
+    def record(self, message_id: str, stage: str, **fields):
+        """記錄郵件完成的階段，並保存該階段的產出以便之後繼續處理
+
+        Args:
+            message_id: Gmail郵件ID
+            stage: 完成的階段（STAGES之一）
+            fields: translated_content / proofread_content / markdown_path
+        """
+        if stage not in STAGES:
+            raise ValueError(f"未知的處理階段: {stage}")
+
+        columns = ['translated_content', 'proofread_content', 'markdown_path']
+        unknown = set(fields) - set(columns)
+        if unknown:
+            raise ValueError(f"未知的欄位: {', '.join(sorted(unknown))}")
+
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR IGNORE INTO processed_messages (message_id, stage, updated_at) '
+                'VALUES (?, ?, ?)',
+                (message_id, stage, time.time()))
+            assignments = ', '.join(f'{column} = ?' for column in fields)
+            values = list(fields.values())
+            self._conn.execute(
+                f'UPDATE processed_messages SET stage = ?, updated_at = ?'
+                f'{", " + assignments if assignments else ""} WHERE message_id = ?',
+                [stage, time.time()] + values + [message_id])
+            self._conn.commit()
+
+    def reset(self, message_id: str):
+        """清除郵件的處理紀錄，下次會重新處理"""
+        with self._lock:
+            self._conn.execute(
+                'DELETE FROM processed_messages WHERE message_id = ?', (message_id,))
+            self._conn.commit()
+
+    def close(self):
+        """關閉資料庫連線"""
+        with self._lock:
+            self._conn.close()
+
+class MessageProgress:
+    """單封郵件的處理進度：判斷哪些階段可以略過、取得已保存的產出，並在完成階段時寫入紀錄
+
+    同步與非同步處理流程共用同一套判斷；處理紀錄停用（ledger 為None）時每個階段都會執行。
+    """
+
+    def __init__(self, ledger: Optional[ProcessingLedger], message_id: str):
+        self.ledger = ledger
+        self.message_id = message_id
+        self.entry = ledger.get(message_id) if ledger is not None else None
+        self.stage = self.entry['stage'] if self.entry else None
+
+    def reached(self, stage: str) -> bool:
+        """是否已完成指定階段"""
+        return self.stage is not None and STAGES.index(self.stage) >= STAGES.index(stage)
+
+    def saved(self, stage: str, field: str) -> Optional[str]:
+        """已完成指定階段時回傳該階段保存的產出，否則回傳None"""
+        return self.entry[field] if self.reached(stage) else None
+
+    def rendered_path(self) -> Optional[str]:
+        """已建立且檔案仍存在的Markdown路徑"""
+        path = self.saved('rendered', 'markdown_path')
+        return path if path and os.path.exists(path) else None
+
+    def record(self, stage: str, **fields):
+        """記錄完成的階段（處理紀錄停用時不做任何事）"""
+        if self.ledger is not None:
+            self.ledger.record(self.message_id, stage, **fields)
+        self.stage = stage
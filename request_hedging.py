@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+請求對沖 - 降低單一緩慢回應拖住整封郵件的尾端延遲
+請求超過近期延遲的 p95 仍未回應時，再送出一個相同的請求（同一或備用翻譯服務），
+採用先完成的結果並取消另一個。延遲依請求的字元數換算成每單位（預設1000字元）的延遲保存，
+等待時間再依請求大小換算回來：短主旨的延遲不會讓長文本塊太早對沖，長文本塊也不會拖慢短請求的對沖。對沖請求受預算限制（預設約為請求數的10%），
+翻譯服務整體變慢時不會讓請求量倍增。
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Optional
+
+class LatencyTracker:
+    """保存各翻譯服務近期的請求延遲（每單位請求大小的延遲）"""
+
+    def __init__(self, window=200):
+        self.window = window
+        self._samples: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, latency: float):
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(latency)
+
+    def percentile(self, key: str, q: float, min_samples: int = 20) -> Optional[float]:
+        """近期延遲的百分位數，樣本不足時回傳None"""
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+class HedgeBudget:
+    """對沖預算：每個請求累積 ratio 個額度，每次對沖消耗1個"""
+
+    def __init__(self, ratio=0.1, max_tokens=10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+class Hedger:
+    def __init__(self, percentile=0.95, min_delay=0.2, budget_ratio=0.1,
+                 min_samples=20, max_workers=16, size_unit=1000):
+        """
+        Args:
+            percentile: 以近期延遲的哪個百分位數作為對沖等待時間
+            min_delay: 最短等待時間（秒），避免對很快的請求也進行對沖
+            budget_ratio: 對沖請求佔全部請求的比例上限
+            min_samples: 至少累積幾個延遲樣本後才開始對沖
+            max_workers: 執行請求的執行緒數
+            size_unit: 換算延遲的請求大小單位（字元）；小於一個單位的請求以一個單位計算
+        """
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.size_unit = size_unit
+        self.latencies = LatencyTracker()
+        self.budget = HedgeBudget(budget_ratio)
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.budget_denied = 0
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='translation-hedge')
+
+    def _units(self, size: Optional[int]) -> float:
+        return max(1.0, size / self.size_unit) if size else 1.0
+
+    def hedge_delay(self, key: str, size: Optional[int] = None) -> Optional[float]:
+        """大小為 size 字元的請求對沖前的等待時間，延遲樣本不足時回傳None（不對沖）"""
+        unit_delay = self.latencies.percentile(key, self.percentile, self.min_samples)
+        return None if unit_delay is None else max(self.min_delay, unit_delay * self._units(size))
+
+    def _timed(self, key: str, call: Callable, units: float):
+        """執行請求並記錄成功請求的每單位延遲"""
+        def run():
+            start = time.monotonic()
+            result = call()
+            self.latencies.record(key, (time.monotonic() - start) / units)
+            return result
+        return run
+
+    def run(self, key: str, primary: Callable, hedge: Optional[Callable] = None,
+            size: Optional[int] = None):
+        """執行請求，超過同樣大小請求的 p95 延遲仍未完成時送出對沖請求，回傳先成功的結果
+
+        Args:
+            key: 延遲統計的分類（主要翻譯服務名稱）
+            primary: 主要請求
+            hedge: 對沖請求，None 時不對沖
+            size: 請求的字元數，None時視為一個單位
+        """
+        with self._lock:
+            self.requests += 1
+        self.budget.deposit()
+
+        units = self._units(size)
+        delay = self.hedge_delay(key, size) if hedge is not None else None
+        if delay is None:
+            return self._timed(key, primary, units)()
+
+        first = self._pool.submit(self._timed(key, primary, units))
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+
+        if not self.budget.try_spend():
+            with self._lock:
+                self.budget_denied += 1
+            return first.result()
+
+        with self._lock:
+            self.hedged += 1
+        second = self._pool.submit(hedge)
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                # 已送出的HTTP請求無法中斷，取消尚未開始的請求，其餘結果直接捨棄
+                for other in pending:
+                    other.cancel()
+                if future is second:
+                    with self._lock:
+                        self.hedge_wins += 1
+                return future.result()
+        raise error
+
+    def stats(self) -> Dict[str, int]:
+        """取得對沖統計"""
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'hedged': self.hedged,
+                'hedge_wins': self.hedge_wins,
+                'budget_denied': self.budget_denied
+            }
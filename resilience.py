@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+連線韌性 - 翻譯服務、Gemini 與 Telegram 共用的重試與斷路器
+每個外部端點各有一個斷路器：連續失敗達門檻後暫停送出請求，冷卻後先放行一個試探請求，
+成功才恢復。暫時性錯誤（逾時、連線錯誤、429、5xx）以去相關抖動（decorrelated jitter）
+的指數退避重試，回應帶有 Retry-After 時依伺服器指定的時間等待；
+重試受預算限制（預設約為請求數的20%），服務整體故障時不會因重試讓請求量倍增。
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+
+# 值得重試的HTTP狀態碼（逾時、限流與伺服器暫時性錯誤）
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+class CircuitOpenError(Exception):
+    """斷路器開啟中，請求沒有送出"""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} 暫停使用中，{retry_in:.0f} 秒後再試")
+        self.name = name
+        self.retry_in = retry_in
+
+class RetryableStatusError(Exception):
+    """需要重試的HTTP回應（429、5xx），保留回應以便讀取 Retry-After"""
+
+    def __init__(self, response):
+        super().__init__(f"HTTP {response.status_code}: {response.text[:200]}")
+        self.response = response
+        self.status_code = response.status_code
+
+def raise_for_retry(response):
+    """回應狀態碼值得重試時拋出 RetryableStatusError，其餘回應原樣回傳"""
+    if response.status_code in RETRYABLE_STATUS:
+        raise RetryableStatusError(response)
+    return response
+
+def parse_retry_after(value) -> Optional[float]:
+    """解析 Retry-After（秒數或HTTP日期），無法解析時回傳None"""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def retry_after_of(error: Exception) -> Optional[float]:
+    """從例外附帶的回應取得伺服器指定的等待秒數"""
+    response = getattr(error, 'response', None)
+    if response is None:
+        return None
+    headers = getattr(response, 'headers', None) or {}
+    delay = parse_retry_after(headers.get('Retry-After'))
+    if delay is not None:
+        return delay
+    # Telegram 以 JSON 的 parameters.retry_after 回傳等待秒數
+    try:
+        return parse_retry_after(response.json().get('parameters', {}).get('retry_after'))
+    except Exception:
+        return None
+
+def is_retryable(error: Exception) -> bool:
+    """判斷錯誤是否為暫時性錯誤；4xx（408、429 以外）代表請求本身有問題，重試也不會成功"""
+    if isinstance(error, CircuitOpenError):
+        return False
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    # 逾時、連線中斷與翻譯端點回傳的非預期內容都視為暫時性錯誤
+    return True
+
+def decorrelated_jitter(previous: float, base: float, cap: float, rng=random) -> float:
+    """去相關抖動退避：下一次等待時間介於 base 與上一次的3倍之間，最長 cap"""
+    return min(cap, rng.uniform(base, max(base, previous * 3)))
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold=5, reset_timeout=30.0):
+        """
+        Args:
+            name: 端點名稱（顯示於訊息與統計）
+            failure_threshold: 連續失敗幾次後開啟斷路器
+            reset_timeout: 開啟後多少秒放行試探請求
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened = 0
+        self._open_until = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """closed（正常）、open（暫停中）或 half_open（等待試探請求結果）"""
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now: float) -> str:
+        if self._open_until == 0.0:
+            return 'closed'
+        return 'open' if now < self._open_until or self._probing else 'half_open'
+
+    def before_call(self):
+        """送出請求前檢查，斷路器開啟中時拋出 CircuitOpenError"""
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(now)
+            if state == 'closed':
+                return
+            if state == 'half_open':
+                # 冷卻結束後只放行一個試探請求，其餘請求繼續等待結果
+                self._probing = True
+                return
+            raise CircuitOpenError(self.name, max(0.0, self._open_until - now))
+
+    def record_success(self):
+        with self._lock:
+            if self._open_until:
+                print(f"✅ {self.name} 已恢復")
+            self.consecutive_failures = 0
+            self._open_until = 0.0
+            self._probing = False
+
+    def record_failure(self, open_for: Optional[float] = None):
+        """記錄失敗；open_for 為伺服器指定的等待秒數（Retry-After），指定時立即暫停"""
+        if open_for is not None and open_for <= 0:
+            open_for = None
+        with self._lock:
+            now = time.monotonic()
+            probe_failed = self._probing
+            self._probing = False
+            self.consecutive_failures += 1
+            if open_for is None and not probe_failed and self.consecutive_failures < self.failure_threshold:
+                return
+            duration = self.reset_timeout if open_for is None else open_for
+            if now + duration > self._open_until:
+                self._open_until = now + duration
+                self.opened += 1
+                print(f"⏸️ {self.name} 暫停使用 {duration:.0f} 秒")
+
+class RetryBudget:
+    """重試預算：每個請求累積 ratio 個額度，每次重試消耗1個"""
+
+    def __init__(self, ratio=0.2, max_tokens=10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+class ResiliencePolicy:
+    def __init__(self, name: str, max_retries=2, base_delay=0.5, max_delay=10.0,
+                 failure_threshold=5, reset_timeout=30.0, budget_ratio=0.2):
+        """
+        Args:
+            name: 端點名稱
+            max_retries: 每個請求最多重試幾次
+            base_delay: 退避的最短等待秒數
+            max_delay: 退避的最長等待秒數；Retry-After 超過此值時不等待，直接回報失敗
+            failure_threshold: 連續失敗幾次後開啟斷路器
+            reset_timeout: 斷路器開啟的秒數
+            budget_ratio: 重試請求佔全部請求的比例上限
+        """
+        self.name = name
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+        self.budget = RetryBudget(budget_ratio)
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.short_circuited = 0
+        self.budget_denied = 0
+        self._lock = threading.Lock()
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """執行請求，暫時性錯誤依退避時間重試"""
+        delay = self._start()
+        for attempt in range(self.max_retries + 1):
+            self._before_attempt()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                delay = self._after_failure(e, attempt, delay)
+                time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def call_async(self, fn: Callable, *args, **kwargs):
+        """call 的非同步版本，fn 回傳 awaitable"""
+        import asyncio
+
+        delay = self._start()
+        for attempt in range(self.max_retries + 1):
+            self._before_attempt()
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                delay = self._after_failure(e, attempt, delay)
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+    def _start(self) -> float:
+        with self._lock:
+            self.calls += 1
+        self.budget.deposit()
+        return self.base_delay
+
+    def _before_attempt(self):
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            with self._lock:
+                self.short_circuited += 1
+            raise
+
+    def _after_failure(self, error: Exception, attempt: int, previous_delay: float) -> float:
+        """記錄失敗並回傳下一次重試前的等待秒數；不應重試時重新拋出錯誤"""
+        retryable = is_retryable(error)
+        retry_after = retry_after_of(error) if retryable else None
+        if retryable:
+            self.breaker.record_failure(retry_after)
+        else:
+            # 請求本身有問題（4xx）代表端點仍有回應，不計入斷路器
+            self.breaker.record_success()
+
+        give_up = (not retryable or attempt >= self.max_retries
+                   or (retry_after is not None and retry_after > self.max_delay))
+        if not give_up and not self.budget.try_spend():
+            with self._lock:
+                self.budget_denied += 1
+            give_up = True
+        if give_up:
+            with self._lock:
+                self.failures += 1
+            raise error
+
+        with self._lock:
+            self.retries += 1
+        if retry_after is not None:
+            # 伺服器指定的等待時間優先，斷路器也暫停到相同時間，試探請求由這次重試送出
+            return retry_after
+        return decorrelated_jitter(previous_delay, self.base_delay, self.max_delay)
+
+    def stats(self) -> Dict[str, object]:
+        """取得請求、重試、失敗與斷路器統計"""
+        state = self.breaker.state
+        with self._lock:
+            return {
+                'state': state,
+                'calls': self.calls,
+                'retries': self.retries,
+                'failures': self.failures,
+                'short_circuited': self.short_circuited,
+                'budget_denied': self.budget_denied,
+                'opened': self.breaker.opened
+            }
+
+_policies: Dict[str, ResiliencePolicy] = {}
+_policies_lock = threading.Lock()
+
+def get_policy(name: str, **kwargs) -> ResiliencePolicy:
+    """取得端點共用的重試與斷路器設定，參數只在第一次建立時使用
+
+    同一端點（例如 gemini 的翻譯與校對）共用同一個斷路器。
+    """
+    with _policies_lock:
+        policy = _policies.get(name)
+        if policy is None:
+            policy = _policies[name] = ResiliencePolicy(name, **kwargs)
+        return policy
+
+def policy_stats() -> Dict[str, Dict[str, object]]:
+    """取得所有端點的重試與斷路器統計"""
+    with _policies_lock:
+        policies = list(_policies.values())
+    return {policy.name: policy.stats() for policy in policies}
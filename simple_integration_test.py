@@ -22,7 +22,9 @@ def test_translation_with_proofreading():
     config = {
         'telegram_bot_token': '',
         'telegram_chat_id': '',
-        'deepl_api_key': ''
+        'deepl_api_key': '',
+        'translation_memory_path': '',
+        'template_memory_path': ''
     }
     
     translator = EmailTranslator(config)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+啟動時間測試 - 檢查只用到翻譯或文字處理功能時的匯入成本
+每次測量都在新的Python程序中執行，避免模組快取影響結果
+"""
+
+import subprocess
+import sys
+
+# 只使用文字處理功能時不應該載入的重量級套件
+HEAVY_MODULES = ['googleapiclient', 'google_auth_oauthlib', 'google.auth', 'requests']
+
+IMPORT_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+from email_translator import EmailTranslator
+import_time = time.perf_counter() - start
+
+start = time.perf_counter()
+translator = EmailTranslator({'translation_memory_path': '', 'template_memory_path': ''})
+translator.clean_text_for_translation('Visit https://example.com/ and https://example.com/logo.png')
+call_time = time.perf_counter() - start
+
+heavy = [m for m in %r if m in sys.modules]
+print(f'{import_time:.6f} {call_time:.6f} {",".join(heavy)}')
+""" % HEAVY_MODULES
+
+def measure_once():
+    """在新程序中測量一次匯入時間與首次呼叫時間"""
+    output = subprocess.run(
+        [sys.executable, '-c', IMPORT_SNIPPET],
+        capture_output=True, text=True, check=True).stdout.strip()
+    parts = output.split(' ')
+    import_time, call_time = float(parts[0]), float(parts[1])
+    heavy = parts[2].split(',') if len(parts) > 2 and parts[2] else []
+    return import_time, call_time, heavy
+
+def measure_interpreter():
+    """測量空白Python程序的啟動時間作為基準"""
+    import time
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'pass'], check=True)
+    return time.perf_counter() - start
+
+def test_startup_time(runs=5):
+    """測試翻譯相關程式路徑的啟動時間"""
+    print("⏱️ 啟動時間測試")
+    print("=" * 50)
+
+    baseline = min(measure_interpreter() for _ in range(runs))
+    print(f"🐍 Python直譯器啟動: {baseline * 1000:.1f} ms")
+
+    results = [measure_once() for _ in range(runs)]
+    best_import = min(r[0] for r in results)
+    best_call = min(r[1] for r in results)
+    heavy = results[0][2]
+
+    print(f"📦 匯入 email_translator: {best_import * 1000:.1f} ms (最佳 {runs} 次)")
+    print(f"🔗 首次呼叫 clean_text_for_translation: {best_call * 1000:.2f} ms")
+
+    if heavy:
+        print(f"❌ 只使用文字處理功能卻載入了: {', '.join(heavy)}")
+        return False
+
+    print("✅ 未載入Gmail API、OAuth與requests等重量級套件")
+    return True
+
+if __name__ == "__main__":
+    print("🚀 郵件翻譯器啟動效能測試")
+    print("=" * 50)
+
+    if test_startup_time():
+        print("\n🎉 啟動時間測試通過！")
+    else:
+        print("\n⚠️ 啟動時間測試失敗，請檢查模組層級的匯入")
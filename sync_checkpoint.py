@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+同步檢查點 - 記錄每組搜尋條件最後同步到的 Gmail historyId
+讓增量模式只需透過 history API 取得新郵件
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+class SyncCheckpoint:
+    def __init__(self, state_file='sync_state.json'):
+        self.state_file = state_file
+        self.state = {'searches': {}}
+        self._lock = threading.Lock()
+        self.load_state()
+
+    def load_state(self):
+        """載入檢查點檔案"""
+        if not os.path.exists(self.state_file):
+            return
+
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+            self.state.setdefault('searches', {})
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"⚠️ 同步檢查點讀取失敗，將重新同步: {e}")
+            self.state = {'searches': {}}
+
+    def save_state(self):
+        """儲存檢查點檔案（先寫暫存檔再取代，避免寫到一半中斷）"""
+        temp_file = f"{self.state_file}.tmp"
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f, indent=2, ensure_ascii=False)
+            os.replace(temp_file, self.state_file)
+        except OSError as e:
+            print(f"❌ 儲存同步檢查點失敗: {e}")
+
+    def get_history_id(self, search_name: str) -> Optional[str]:
+        """取得搜尋條件最後同步的 historyId，沒有則回傳None"""
+        with self._lock:
+            entry = self.state['searches'].get(search_name)
+            return entry.get('history_id') if entry else None
+
+    def update_history_id(self, search_name: str, history_id: str):
+        """更新搜尋條件的 historyId 並寫入檔案"""
+        with self._lock:
+            self.state['searches'][search_name] = {
+                'history_id': str(history_id),
+                'updated_at': datetime.now().isoformat(timespec='seconds')
+            }
+            self.save_state()
+
+    def reset(self, search_name: str):
+        """清除搜尋條件的檢查點，下次執行會重新完整搜尋"""
+        with self._lock:
+            if self.state['searches'].pop(search_name, None) is not None:
+                self.save_state()
+
+    def get_all(self) -> Dict[str, Dict[str, str]]:
+        """取得所有搜尋條件的檢查點"""
+        with self._lock:
+            return dict(self.state['searches'])
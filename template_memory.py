@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+範本翻譯記憶 - 針對帳單、出貨通知、週報等由範本產生的郵件
+先把數字、金額、日期、訂單編號、電子郵件地址等變數遮蔽成佔位符，
+再以 simhash 找出幾乎相同的範本，重複使用已翻譯的範本並填回變數
+只有遮蔽後完全相同的範本可以直接套用；相近的範本可能只差一句（例如 "has shipped" 與
+"was not shipped"），會連同範本原文一起回傳，由呼叫端重新翻譯不同的句子
+
+處理的是已經過 clean_text_for_translation 的文本，連結已替換成 [LINK_n]，
+因此不同郵件的連結不會影響範本比對，也會由原本的連結流程還原
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# 依序比對：連結與圖片佔位符、翻譯記憶的段落標記保持原樣（由各自的流程還原），其餘依具體程度排列
+# 只遮蔽形狀明確的變數；一般文字中的大寫詞、"4th"、"3pm"、"MP3"、"2FA" 等不算變數，
+# 否則普通文章也會被當成範本，帶著 [VAR_n] 送去翻譯，不相關的郵件也會互相比對成範本
+_VARIABLE_PATTERN = re.compile(
+    r'(?P<placeholder>\[(?:LINK|IMAGE|PART)_\d+\])'
+    r'|(?P<email>[\w.+-]+@[\w-]+(?:\.[\w-]+)+)'
+    r'|(?P<date>\b(?:\d{4}[-/.]\d{1,2}[-/.]\d{1,2}'
+    r'|\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4}'
+    r'|(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]*\.?\s+\d{1,2}(?:st|nd|rd|th)?,?\s+\d{4}'
+    r'|\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]*\.?\s+\d{4})\b)'
+    r'|(?P<amount>(?:[$€£¥]|NT\$|US\$)\s?\d[\d,]*(?:\.\d+)?'
+    r'|\b\d[\d,]*(?:\.\d+)?\s?(?:USD|EUR|GBP|JPY|TWD|NTD)\b)'
+    # 訂單編號：# 加至少4位數字、大寫字母前綴加至少4位數字（INV-20240001），或以 - 分隔的數字組
+    r'|(?P<id>#\s?\d{4,}[\w-]*'
+    r'|(?-i:\b[A-Z]{1,5}-?\d{4,}[A-Z0-9-]*\b)'
+    r'|\b\d{3,}(?:-\d{2,})+\b)'
+    r'|(?P<number>\b\d[\d,]*(?:\.\d+)?\b)',
+    re.IGNORECASE
+)
+
+# 翻譯服務可能改寫佔位符的大小寫或加入空白
+_PLACEHOLDER_PATTERN = re.compile(r'\[\s*VAR\s*_?\s*(\d+)\s*\]', re.IGNORECASE)
+
+_SHINGLE_PATTERN = re.compile(r'\[VAR_\d+\]|\w+')
+
+def mask_variables(text: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """將變數替換成 [VAR_n] 佔位符
+
+    Returns:
+        (遮蔽後的文本, [(變數類型, 原始值), ...])
+    """
+    variables = []
+
+    def replace(match):
+        kind = match.lastgroup
+        if kind == 'placeholder':
+            return match.group(0)
+        variables.append((kind, match.group(0)))
+        return f'[VAR_{len(variables) - 1}]'
+
+    return _VARIABLE_PATTERN.sub(replace, text), variables
+
+def fill_variables(translation: str, variables: List[Tuple[str, str]]) -> Optional[str]:
+    """把變數填回翻譯後的範本，有佔位符遺失或無法對應時回傳None"""
+    found = set()
+
+    def replace(match):
+        index = int(match.group(1))
+        if index >= len(variables):
+            return match.group(0)
+        found.add(index)
+        return variables[index][1]
+
+    filled = _PLACEHOLDER_PATTERN.sub(replace, translation)
+    if len(found) != len(variables):
+        return None
+    return filled
+
+def variable_signature(variables: List[Tuple[str, str]]) -> str:
+    """變數類型序列，只有類型相同的範本才能互相套用"""
+    return ','.join(kind for kind, _ in variables)
+
+def simhash(text: str, bits: int = 64) -> int:
+    """以兩詞片段計算 simhash，幾乎相同的文本會得到漢明距離很小的值"""
+    tokens = _SHINGLE_PATTERN.findall(text.lower())
+    shingles = [' '.join(tokens[i:i + 2]) for i in range(max(1, len(tokens) - 1))]
+    weights = [0] * bits
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.md5(shingle.encode('utf-8')).digest()[:8], 'big')
+        for bit in range(bits):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit in range(bits) if weights[bit] > 0)
+
+def _bands(value: int, band_count: int = 8, band_bits: int = 8):
+    """把 simhash 切成數段，任一段相同即為候選（漢明距離≤7時至少有一段完全相同）"""
+    mask = (1 << band_bits) - 1
+    return [(band, value >> (band * band_bits) & mask) for band in range(band_count)]
+
+class TemplateMemory:
+    def __init__(self, db_path='template_memory.db', max_templates=5000,
+                 max_distance=6, min_variables=3):
+        """
+        Args:
+            db_path: SQLite資料庫路徑
+            max_templates: 最多保存的範本數，超過時淘汰最久未使用的
+            max_distance: 視為相同範本的最大 simhash 漢明距離
+            min_variables: 至少包含幾個變數才視為範本郵件
+        """
+        self.db_path = db_path
+        self.max_templates = max_templates
+        self.max_distance = max_distance
+        self.min_variables = min_variables
+        self.exact_hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS templates (
+                key TEXT PRIMARY KEY,
+                scope TEXT NOT NULL,
+                signature TEXT NOT NULL,
+                simhash TEXT NOT NULL,
+                length INTEGER NOT NULL,
+                translation TEXT NOT NULL,
+                last_used REAL NOT NULL,
+                source TEXT
+            )
+        ''')
+        # 舊版資料庫沒有保存範本原文，這些範本只能完全相同時套用
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(templates)')}
+        if 'source' not in columns:
+            self._conn.execute('ALTER TABLE templates ADD COLUMN source TEXT')
+        self._conn.commit()
+
+        # 記憶體內的 simhash 索引：(範圍, 段編號, 段值) → {key}
+        self._index: Dict[tuple, set] = {}
+        self._entries: Dict[str, tuple] = {}
+        for key, scope, signature, hash_text, length in self._conn.execute(
+                'SELECT key, scope, signature, simhash, length FROM templates'):
+            self._add_to_index(key, scope, signature, int(hash_text), length)
+
+    @staticmethod
+    def _scope(src_lang: str, dest_lang: str, backend: str) -> str:
+        return f'{src_lang.lower()}|{dest_lang.lower()}|{backend}'
+
+    @staticmethod
+    def _key(masked_text: str, scope: str) -> str:
+        normalized = ' '.join(masked_text.split())
+        return hashlib.sha256(f'{scope}\x1f{normalized}'.encode('utf-8')).hexdigest()
+
+    def _add_to_index(self, key, scope, signature, hash_value, length):
+        self._entries[key] = (scope, signature, hash_value, length)
+        for band in _bands(hash_value):
+            self._index.setdefault((scope,) + band, set()).add(key)
+
+    def _remove_from_index(self, key):
+        scope, _, hash_value, _ = self._entries.pop(key)
+        for band in _bands(hash_value):
+            self._index.get((scope,) + band, set()).discard(key)
+
+    def is_template(self, variables: List[Tuple[str, str]]) -> bool:
+        """判斷文本是否包含足夠的變數，值得使用範本記憶"""
+        return len(variables) >= self.min_variables
+
+    def lookup(self, masked_text: str, variables: List[Tuple[str, str]], src_lang: str,
+               dest_lang: str, backends: Sequence[str]) -> Optional[Tuple[str, Optional[str], str]]:
+        """依偏好順序查詢各翻譯服務已翻譯的範本，回傳 (範本翻譯, 相近範本的原文, 翻譯服務)
+
+        完全相同時相近範本的原文為None，翻譯可以直接套用；
+        只找到 simhash 相近的範本時一併回傳其原文，呼叫端需重新翻譯內容不同的句子。
+        """
+        scopes = [(self._scope(src_lang, dest_lang, backend), backend) for backend in backends]
+        signature = variable_signature(variables)
+
+        with self._lock:
+            row = None
+            for scope, backend in scopes:
+                key = self._key(masked_text, scope)
+                if key in self._entries:
+                    row = self._conn.execute(
+                        'SELECT translation FROM templates WHERE key = ?', (key,)).fetchone()
+                    if row is not None:
+                        match_key, similar_source, match_backend = key, None, backend
+                        self.exact_hits += 1
+                        break
+
+            if row is None:
+                for scope, backend in scopes:
+                    key = self._find_similar(masked_text, scope, signature)
+                    if key is None:
+                        continue
+                    row = self._conn.execute(
+                        'SELECT translation, source FROM templates WHERE key = ?', (key,)).fetchone()
+                    if row is not None and row[1] is not None:
+                        match_key, similar_source, match_backend = key, row[1], backend
+                        self.fuzzy_hits += 1
+                        break
+                    row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                'UPDATE templates SET last_used = ? WHERE key = ?', (time.time(), match_key))
+            self._conn.commit()
+            return row[0], similar_source, match_backend
+
+    def _find_similar(self, masked_text: str, scope: str, signature: str) -> Optional[str]:
+        """在 simhash 索引中找出最相近且變數類型相同的範本（呼叫前需持有鎖）"""
+        hash_value = simhash(masked_text)
+        length = len(masked_text)
+        candidates = set()
+        for band in _bands(hash_value):
+            candidates |= self._index.get((scope,) + band, set())
+
+        best_key, best_distance = None, self.max_distance + 1
+        for key in candidates:
+            _, candidate_signature, candidate_hash, candidate_length = self._entries[key]
+            if candidate_signature != signature:
+                continue
+            if abs(candidate_length - length) > max(10, length * 0.1):
+                continue
+            distance = bin(candidate_hash ^ hash_value).count('1')
+            if distance < best_distance:
+                best_key, best_distance = key, distance
+        return best_key
+
+    def store(self, masked_text: str, variables: List[Tuple[str, str]],
+              src_lang: str, dest_lang: str, backend: str, translation: str):
+        """保存翻譯後的範本與範本原文（translation 中應保留所有 [VAR_n] 佔位符）"""
+        scope = self._scope(src_lang, dest_lang, backend)
+        key = self._key(masked_text, scope)
+        signature = variable_signature(variables)
+        hash_value = simhash(masked_text)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove_from_index(key)
+            self._conn.execute(
+                'INSERT OR REPLACE INTO templates '
+                '(key, scope, signature, simhash, length, translation, last_used, source) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, scope, signature, str(hash_value), len(masked_text), translation, time.time(),
+                 masked_text))
+            self._add_to_index(key, scope, signature, hash_value, len(masked_text))
+
+            overflow = len(self._entries) - self.max_templates
+            if overflow > 0:
+                rows = self._conn.execute(
+                    'SELECT key FROM templates ORDER BY last_used ASC LIMIT ?', (overflow,)).fetchall()
+                for (old_key,) in rows:
+                    self._remove_from_index(old_key)
+                self._conn.executemany('DELETE FROM templates WHERE key = ?', rows)
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """取得命中統計"""
+        return {
+            'templates': len(self._entries),
+            'exact_hits': self.exact_hits,
+            'fuzzy_hits': self.fuzzy_hits,
+            'misses': self.misses
+        }
+
+    def close(self):
+        """關閉資料庫連線"""
+        with self._lock:
+            self._conn.close()
@@ -11,7 +11,7 @@ def test_duplicate_links():
     print("🧪 測試重複連結處理")
     print("=" * 50)
     
-    translator = EmailTranslator({})
+    translator = EmailTranslator({'translation_memory_path': '', 'template_memory_path': ''})
     
     # 測試包含重複連結的文本
     test_cases = [
@@ -97,7 +97,7 @@ def test_link_deduplication_logic():
     print("\n🔧 測試連結去重邏輯")
     print("=" * 30)
     
-    translator = EmailTranslator({})
+    translator = EmailTranslator({'translation_memory_path': '', 'template_memory_path': ''})
     
     # 直接測試 clean_text_for_translation 函數
     test_text = """
@@ -37,7 +37,9 @@ def test_translation_workflow():
     config = {
         'telegram_bot_token': '',
         'telegram_chat_id': '',
-        'deepl_api_key': ''
+        'deepl_api_key': '',
+        'translation_memory_path': '',
+        'template_memory_path': ''
     }
     
     translator = EmailTranslator(config)
@@ -119,7 +121,9 @@ def test_language_detection_integration():
     config = {
         'telegram_bot_token': '',
         'telegram_chat_id': '',
-        'deepl_api_key': ''
+        'deepl_api_key': '',
+        'translation_memory_path': '',
+        'template_memory_path': ''
     }
     
     translator = EmailTranslator(config)
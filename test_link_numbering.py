@@ -15,7 +15,9 @@ def test_link_numbering():
     config = {
         'telegram_bot_token': '',
         'telegram_chat_id': '',
-        'deepl_api_key': ''
+        'deepl_api_key': '',
+        'translation_memory_path': '',
+        'template_memory_path': ''
     }
     translator = EmailTranslator(config)
     
@@ -122,7 +124,9 @@ def test_with_translation():
     config = {
         'telegram_bot_token': '',
         'telegram_chat_id': '',
-        'deepl_api_key': ''
+        'deepl_api_key': '',
+        'translation_memory_path': '',
+        'template_memory_path': ''
     }
     translator = EmailTranslator(config)
     
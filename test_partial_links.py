@@ -12,7 +12,7 @@ def test_partial_link_conversion():
     print("🧪 測試部分連結轉換問題")
     print("=" * 50)
     
-    translator = EmailTranslator({})
+    translator = EmailTranslator({'translation_memory_path': '', 'template_memory_path': ''})
     
     # 模擬你遇到的情況：
     # 1. 原文有12個連結
@@ -88,7 +88,7 @@ def test_missing_placeholders():
     print("\n🔧 測試佔位符丟失的情況")
     print("=" * 40)
     
-    translator = EmailTranslator({})
+    translator = EmailTranslator({'translation_memory_path': '', 'template_memory_path': ''})
     
     # 模擬佔位符在翻譯過程中完全丟失的情況
     links = ['https://example.com/1', 'https://example.com/2', 'https://example.com/3']
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試佔位符還原 - 翻譯服務改寫過的佔位符（全形括號、多餘空白、大小寫、重複或遺失）
+都能單次掃描還原，網址中類似佔位符的文字不會被再次展開，並回報遺失的佔位符
+"""
+
+from link_tokenizer import find_lost_placeholders, restore_placeholders
+
+LINKS = ['https://example.com/launch', 'https://example.com/results']
+IMAGES = ['https://cdn.example.com/cover.png']
+
+def check(name, ok, detail=''):
+    print(f"{'✅' if ok else '❌'} {name}{'：' + detail if detail else ''}")
+    return ok
+
+def test_rewritten_placeholders():
+    """翻譯服務改寫過的佔位符格式"""
+    print("🧪 改寫過的佔位符")
+    print("=" * 50)
+    cases = [
+        ("全形括號", "請見 ［LINK_0］ 與 【LINK_1】", "請見 [連結1] 與 [連結2]"),
+        ("插入空白", "請見 [ LINK _ 0 ] 與 [LINK_ 1 ]", "請見 [連結1] 與 [連結2]"),
+        ("大小寫改變", "請見 [link_0]、[Link_1] 與 [iMaGe_0]", "請見 [連結1]、[連結2] 與 [圖片1]"),
+        ("翻成中文", "請見 (連結 1)、[連結2] 與（圖片1）", "請見 [連結1]、[連結2] 與[圖片1]"),
+    ]
+    ok = True
+    for name, translated, expected in cases:
+        restored, links, _ = restore_placeholders(translated, LINKS, IMAGES)
+        ok &= check(name, restored == expected and links == LINKS, repr(restored))
+    return ok
+
+def test_duplicated_and_dropped():
+    """重複的佔位符共用同一個編號，遺失的不會出現在連結列表"""
+    print("\n🧪 重複與遺失的佔位符")
+    print("=" * 50)
+    restored, links, images = restore_placeholders("[LINK_1] 再提一次 [LINK_1]", LINKS, IMAGES)
+    ok = check("重複的佔位符只列出一次",
+               restored == "[連結1] 再提一次 [連結1]" and links == [LINKS[1]] and images == [],
+               repr((restored, links)))
+
+    restored, links, _ = restore_placeholders("只剩 [LINK_1] 與 [LINK_7]", LINKS, IMAGES)
+    ok &= check("遺失的佔位符不列出，編號超出範圍的保持原樣",
+                restored == "只剩 [連結1] 與 [LINK_7]" and links == [LINKS[1]], repr(restored))
+    return ok
+
+def test_single_pass():
+    """還原只掃描一次：新產生的 [連結n] 不會再被當成佔位符，網址內容也不會被展開"""
+    print("\n🧪 單次掃描")
+    print("=" * 50)
+    restored, links, _ = restore_placeholders("先看 [LINK_1] 再看 [LINK_0]", LINKS, [])
+    ok = check("倒序引用的編號不會被重複替換", restored == "先看 [連結2] 再看 [連結1]", repr(restored))
+
+    tricky = ['https://example.com/go?next=[LINK_1]', 'https://example.com/?ref=(連結1)']
+    restored, links, _ = restore_placeholders("[LINK_0] 與 [LINK_1]", tricky, [])
+    ok &= check("包含佔位符文字的網址保持原樣",
+                restored == "[連結1] 與 [連結2]" and links == tricky, repr((restored, links)))
+
+    from email_translator import EmailTranslator
+    translator = EmailTranslator({'translation_memory_path': '', 'template_memory_path': ''})
+    result = translator.restore_links_in_translation("[LINK_0] 與 [LINK_1]", tricky, [])
+    body, appendix = result.split('### 📎 相關連結')
+    ok &= check("連結列表中的網址不會被再次還原",
+                body.strip() == "[連結1] 與 [連結2]" and all(url in appendix for url in tricky),
+                repr(appendix.strip()))
+    return ok
+
+def test_lost_placeholders():
+    """回報遺失（或改寫到無法辨識）的佔位符，可辨識的改寫不算遺失"""
+    print("\n🧪 遺失的佔位符")
+    print("=" * 50)
+    source = "Read [LINK_0] and [LINK_1], see [IMAGE_0]."
+    ok = check("可辨識的改寫不算遺失",
+               find_lost_placeholders(source, "閱讀 ［link_0］ 與 [ LINK_1 ]，見（圖片 1）。") == [])
+    lost = find_lost_placeholders(source, "閱讀 [LINK_0] 與 [LINK_0]，見圖。")
+    ok &= check("遺失與被重複取代的佔位符", lost == [('image', 0), ('link', 1)], repr(lost))
+    lost = find_lost_placeholders(source, "閱讀 [LINK 0] 與 LINK_1，見 IMAGE-0。")
+    ok &= check("改寫到無法辨識的佔位符",
+                lost == [('image', 0), ('link', 0), ('link', 1)], repr(lost))
+    return ok
+
+if __name__ == "__main__":
+    print("🚀 佔位符還原測試")
+    print("=" * 50)
+    results = [test_rewritten_placeholders(), test_duplicated_and_dropped(),
+               test_single_pass(), test_lost_placeholders()]
+    if all(results):
+        print("\n🎉 所有佔位符還原測試通過！")
+    else:
+        print("\n⚠️ 部分佔位符還原測試失敗")
@@ -27,7 +27,7 @@ Model Releases, Performance & Benchmarks
 
 • Kimi K2 Open Model Challenges Proprietary Models: Moonshot AI's Kimi K2, a trillion-parameter Mixture-of-Experts (MoE) model, has been a major topic. It is now live on W&B Inference via CoreWeave and available in the LM Arena. Cline showed a demo of Kimi K2 running on Groq, achieving speeds of 200 tokens/second, significantly faster than Claude Sonnet-4's typical ~60 TPS. On benchmarks, All-Hands AI reported that Kimi-K2 achieved"""
     
-    translator = EmailTranslator({})
+    translator = EmailTranslator({'translation_memory_path': '', 'template_memory_path': ''})
     
     print("原始郵件內容:")
     print(real_email_content[:500] + "...")
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試文本分段 - 段落、句子、片段與文本塊的位置必須剛好涵蓋原文，
+並檢查中日文句尾、英文縮寫與小數、中英混合文本的斷句
+"""
+
+from text_segmenter import (Segmentation, iter_chunk_spans, iter_paragraph_spans,
+                            iter_segment_spans, iter_sentence_spans)
+
+SAMPLES = [
+    "Hello world. This is a test.\n\nSecond paragraph here! Is it?\n  \n\nThird.",
+    "他說：「好。」然後離開了。真的嗎？！太好了！\n\n第二段。",
+    "  我們用 Python 3.12 寫了 API。Mr. Lee 說 OK.下週見。Thanks!謝謝  \n",
+    "這是一個沒有任何空白而且非常非常長的中文句子需要被直接切開才能放進文本塊裡面。",
+    "Short.\n\n\n\n" + "word " * 40 + "end.",
+    "",
+    "   \n\n  ",
+]
+
+def check(name, ok, detail=''):
+    print(f"{'✅' if ok else '❌'} {name}{'：' + detail if detail else ''}")
+    return ok
+
+def sentences(text):
+    return [text[start:end] for start, end in iter_sentence_spans(text)]
+
+def covers_exactly(text, spans):
+    """位置依序排列、不重疊、前後沒有空白，且位置之外只有空白"""
+    position = 0
+    for start, end in spans:
+        if not (position <= start < end <= len(text)):
+            return False
+        if text[position:start].strip() or text[start].isspace() or text[end - 1].isspace():
+            return False
+        position = end
+    return not text[position:].strip()
+
+def test_spans_cover_input():
+    """各層級的位置剛好涵蓋原文所有非空白字元"""
+    print("🧪 位置涵蓋原文")
+    print("=" * 50)
+    ok = True
+    for i, text in enumerate(SAMPLES, 1):
+        layers = {
+            '段落': list(iter_paragraph_spans(text)),
+            '句子': list(iter_sentence_spans(text)),
+        }
+        for max_size in (8, 30, 200):
+            layers[f'片段({max_size})'] = list(iter_segment_spans(text, max_size))
+            layers[f'文本塊({max_size})'] = chunks = list(iter_chunk_spans(text, max_size))
+            if any(end - start > max_size for start, end in chunks):
+                ok &= check(f"樣本 {i} 文本塊({max_size}) 超過長度上限", False)
+            segmentation = Segmentation(text, max_size)
+            if segmentation.join(segmentation.chunks()) != text.strip():
+                ok &= check(f"樣本 {i} Segmentation({max_size}) 組合後與原文不同", False)
+        broken = [name for name, spans in layers.items() if not covers_exactly(text, spans)]
+        ok &= check(f"樣本 {i}", not broken, f"未剛好涵蓋: {broken}" if broken else '')
+    return ok
+
+def test_cjk_terminators():
+    """中日文句尾不需要空白，結尾的全形引號與括號屬於同一句"""
+    print("\n🧪 中日文句尾")
+    print("=" * 50)
+    cases = [
+        ("他說：「好。」然後離開了。真的嗎？！太好了！",
+         ['他說：「好。」', '然後離開了。', '真的嗎？！', '太好了！']),
+        ("他說：“明天見。”我們就走了。『真的？』她問。",
+         ['他說：“明天見。”', '我們就走了。', '『真的？』', '她問。']),
+        ("注意（請見附件。）下一句", ['注意（請見附件。）', '下一句']),
+    ]
+    ok = True
+    for text, expected in cases:
+        result = sentences(text)
+        ok &= check(text, result == expected, repr(result))
+    return ok
+
+def test_abbreviations_and_decimals():
+    """縮寫與小數點不是句尾"""
+    print("\n🧪 縮寫與小數")
+    print("=" * 50)
+    cases = [
+        ("Dr. Smith arrived at 3 p.m. today. Version 3.5 costs $4.99. See e.g. the docs! Done?",
+         ['Dr. Smith arrived at 3 p.m. today.', 'Version 3.5 costs $4.99.',
+          'See e.g. the docs!', 'Done?']),
+        ("Call the U.S. office. We live in the U.S. It is open.",
+         ['Call the U.S. office.', 'We live in the U.S.', 'It is open.']),
+        ("Item No. 5 is sold out. I said no. Then left.",
+         ['Item No. 5 is sold out.', 'I said no.', 'Then left.']),
+        ("Version 2.0.1 is out. Pi is 3.14159! Visit https://example.com/a.b.c now.",
+         ['Version 2.0.1 is out.', 'Pi is 3.14159!', 'Visit https://example.com/a.b.c now.']),
+        ("價格是3.5元，折扣0.5。好", ['價格是3.5元，折扣0.5。', '好']),
+    ]
+    ok = True
+    for text, expected in cases:
+        result = sentences(text)
+        ok &= check(text, result == expected, repr(result))
+    return ok
+
+def test_mixed_cjk_latin():
+    """中英混合文本：英文標點後直接接中文時也是句尾"""
+    print("\n🧪 中英混合")
+    print("=" * 50)
+    cases = [
+        ("我們用 Python 3.12 寫了 API。Mr. Lee 說 OK.下週見。Thanks!謝謝",
+         ['我們用 Python 3.12 寫了 API。', 'Mr. Lee 說 OK.', '下週見。', 'Thanks!', '謝謝']),
+        ("Please check 附件。Dr.王 will reply by Friday. 謝謝！",
+         ['Please check 附件。', 'Dr.王 will reply by Friday.', '謝謝！']),
+    ]
+    ok = True
+    for text, expected in cases:
+        result = sentences(text)
+        ok &= check(text, result == expected, repr(result))
+
+    text = "這是一個沒有任何空白而且非常非常長的中文句子需要被直接切開才能放進文本塊裡面。"
+    pieces = [text[start:end] for start, end in iter_segment_spans(text, 10)]
+    ok &= check("沒有空白的長句直接切開", ''.join(pieces) == text
+                and all(len(piece) <= 10 for piece in pieces), repr(pieces))
+    return ok
+
+if __name__ == "__main__":
+    print("🚀 文本分段測試")
+    print("=" * 50)
+    results = [test_spans_cover_input(), test_cjk_terminators(),
+               test_abbreviations_and_decimals(), test_mixed_cjk_latin()]
+    if all(results):
+        print("\n🎉 所有文本分段測試通過！")
+    else:
+        print("\n⚠️ 部分文本分段測試失敗")
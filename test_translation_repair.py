@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試翻譯修復 - 檢查遺失佔位符與內容變更時找到的句子範圍，
+以及修復時只重新翻譯受影響的句子、其餘譯文逐字不變
+"""
+
+from link_tokenizer import find_lost_placeholders
+from translation_repair import find_changed_spans, find_missing_spans, repair_translation
+
+def check(name, ok, detail=''):
+    print(f"{'✅' if ok else '❌'} {name}{'：' + detail if detail else ''}")
+    return ok
+
+def test_find_missing_spans():
+    """遺失佔位符的句子應對應到原文中包含該佔位符的句子"""
+    print("🧪 find_missing_spans")
+    print("=" * 50)
+
+    def is_missing(source, translated):
+        return bool(find_lost_placeholders(source, translated))
+
+    source = ("Welcome to our store. See [LINK_0] for details. Thanks for reading.\n\n"
+              "Visit [LINK_1] today. Have a nice day.")
+    translated = ("歡迎光臨本店。詳情請見網站。感謝閱讀。\n\n"
+                  "今天就造訪 [LINK_1]。祝您有美好的一天。")
+    spans = find_missing_spans(source, translated, is_missing)
+    pairs = [(translated[a:b], source[c:d]) for (a, b), (c, d) in spans]
+    ok = check("只找到遺失 [LINK_0] 的句子",
+               pairs == [('詳情請見網站。', 'See [LINK_0] for details.')], repr(pairs))
+
+    complete = translated.replace('詳情請見網站', '詳情請見 [LINK_0]')
+    ok &= check("佔位符都保留時沒有要修復的範圍",
+                find_missing_spans(source, complete, is_missing) == [])
+    return ok
+
+def test_find_changed_spans():
+    """新舊原文只差一句時，只回傳那一句對應的舊譯文與新原文範圍"""
+    print("\n🧪 find_changed_spans")
+    print("=" * 50)
+    old_source = ("Your order 1001 has shipped. It arrives on Monday. Thank you!\n\n"
+                  "Questions? Reply to this email.")
+    new_source = old_source.replace('1001', '1002')
+    translated = "您的訂單 1001 已出貨。預計週一送達。謝謝您！\n\n有問題嗎？請回覆此郵件。"
+
+    spans = find_changed_spans(old_source, new_source, translated)
+    pairs = [(translated[a:b], new_source[c:d]) for (a, b), (c, d) in spans]
+    ok = check("只找到訂單編號不同的句子",
+               pairs == [('您的訂單 1001 已出貨。', 'Your order 1002 has shipped.')], repr(pairs))
+
+    ok &= check("原文相同時沒有要重新翻譯的範圍",
+                find_changed_spans(old_source, old_source, translated) == [])
+
+    split = old_source.replace("It arrives on Monday.", "It arrives soon. Track it online.")
+    ok &= check("句數不同時回傳None", find_changed_spans(old_source, split, translated) is None)
+
+    ok &= check("段落數不同時回傳None",
+                find_changed_spans(old_source, "Your order shipped.\n\nA.\n\nB.", translated) is None)
+    return ok
+
+def test_repair_translation():
+    """只重新翻譯包含異常字符的句子，其餘譯文逐字不變"""
+    print("\n🧪 repair_translation")
+    print("=" * 50)
+    source = ("The meeting moved to Friday. Please update your calendar. See you there.\n\n"
+              "Best regards.")
+    translated = "會議改到週五。請更新您的�曆。到時見。\n\n此致敬禮。"
+    calls = []
+
+    def translate(text):
+        calls.append(text)
+        return "請更新您的行事曆。"
+
+    repaired, spans = repair_translation(source, translated, translate, lambda text: '�' in text)
+    ok = check("只重新翻譯損壞的句子",
+               calls == ["Please update your calendar."] and len(spans) == 1, repr(calls))
+    if not ok:
+        return ok
+    (start, end), _ = spans[0]
+    ok &= check("修復後的譯文", repaired == "會議改到週五。請更新您的行事曆。到時見。\n\n此致敬禮。",
+                repr(repaired))
+    ok &= check("損壞句子之前與之後的譯文逐字不變",
+                repaired[:start] == translated[:start]
+                and repaired[start + len("請更新您的行事曆。"):] == translated[end:])
+
+    calls.clear()
+    unchanged, spans = repair_translation(source, translated.replace('�', '行事'), translate,
+                                          lambda text: '�' in text)
+    ok &= check("沒有異常字符時不重新翻譯", not calls and not spans
+                and unchanged == translated.replace('�', '行事'))
+    return ok
+
+if __name__ == "__main__":
+    print("🚀 翻譯修復測試")
+    print("=" * 50)
+    results = [test_find_missing_spans(), test_find_changed_spans(), test_repair_translation()]
+    if all(results):
+        print("\n🎉 所有翻譯修復測試通過！")
+    else:
+        print("\n⚠️ 部分翻譯修復測試失敗")
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文本分段 - 以 (起點, 終點) 位置表示段落、句子與文本塊，不複製字串
+單次掃描原文：段落以空白行分隔，句子以句尾標點分隔（中日文的。！？後不需要空白，英文縮寫的句點不算句尾），
+過長的句子在空白處（沒有空白時直接）切開；再依序把這些片段打包成不超過長度上限的文本塊。
+位置對應原文，翻譯記憶、修復與連結還原都可以沿用同一組位置。
+"""
+
+import re
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+Span = Tuple[int, int]
+
+# 段落分隔：空白行
+_PARAGRAPH_BREAK = re.compile(r'\n[ \t\r\f\v]*\n\s*')
+
+# 句尾：中日文句號、問號、驚嘆號；英文標點後需要空白、中日韓文字或文本結尾（避免切開網址與小數）
+_SENTENCE_END = re.compile(
+    r'[。！？｡]+[」』”’）)\]"\']*'
+    r'|[.!?]+[」』”’)\]"\']*(?=\s|$|[\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af\uf900-\ufaff])')
+
+# 英文縮寫的句點不是句尾：稱謂後面一定接人名；其他縮寫、縮寫字（e.g.、p.m.、U.S.）
+# 與單一字母的縮寫後面接小寫字母或數字時也不是句尾
+_TITLES = frozenset({'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'mt', 'rev', 'capt', 'gen'})
+_ABBREVIATIONS = frozenset({'vs', 'etc', 'inc', 'ltd', 'co', 'corp', 'no', 'vol', 'fig',
+                            'approx', 'dept', 'est', 'min', 'max', 'ref'})
+
+def _stripped(text: str, start: int, end: int) -> Optional[Span]:
+    """去掉範圍前後的空白，範圍只有空白時回傳None"""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return (start, end) if start < end else None
+
+def _is_abbreviation(text: str, start: int, match, end: int) -> bool:
+    """句尾比對到的句點是否屬於縮寫"""
+    if match.group(0) != '.':
+        return False
+    word_start = match.start()
+    while word_start > start and (text[word_start - 1].isascii() and text[word_start - 1].isalpha()
+                                  or text[word_start - 1] == '.'):
+        word_start -= 1
+    word = text[word_start:match.start()].lower()
+    if not word or word.startswith('.'):
+        return False
+    if word in _TITLES:
+        return True
+    if word not in _ABBREVIATIONS and '.' not in word and len(word) > 1:
+        return False
+    following = match.end()
+    while following < end and text[following].isspace():
+        following += 1
+    return following < end and (text[following].islower() or text[following].isdigit())
+
+def iter_paragraph_spans(text: str, start: int = 0, end: Optional[int] = None) -> Iterator[Span]:
+    """依序產生 text[start:end] 中每個段落的位置"""
+    end = len(text) if end is None else end
+    position = start
+    for match in _PARAGRAPH_BREAK.finditer(text, start, end):
+        span = _stripped(text, position, match.start())
+        if span:
+            yield span
+        position = match.end()
+    span = _stripped(text, position, end)
+    if span:
+        yield span
+
+def iter_sentence_spans(text: str, start: int = 0, end: Optional[int] = None) -> Iterator[Span]:
+    """依序產生 text[start:end] 中每個句子的位置（不含前後空白）"""
+    end = len(text) if end is None else end
+    position = start
+    for match in _SENTENCE_END.finditer(text, start, end):
+        if _is_abbreviation(text, start, match, end):
+            continue
+        span = _stripped(text, position, match.end())
+        if span:
+            yield span
+        position = match.end()
+    span = _stripped(text, position, end)
+    if span:
+        yield span
+
+def _split_long(text: str, start: int, end: int, max_size: int) -> Iterator[Span]:
+    """把超過長度上限的句子在最後一個空白處切開，沒有空白時直接切開"""
+    while end - start > max_size:
+        cut = start + max_size
+        space = max(text.rfind(' ', start + 1, cut + 1), text.rfind('\n', start + 1, cut + 1))
+        if space > start:
+            cut = space
+        span = _stripped(text, start, cut)
+        if span:
+            yield span
+        start = cut
+    span = _stripped(text, start, end)
+    if span:
+        yield span
+
+def iter_segment_spans(text: str, max_size: int) -> Iterator[Span]:
+    """產生不超過 max_size 的片段：能放進上限的段落整段產生，否則拆成句子"""
+    for p_start, p_end in iter_paragraph_spans(text):
+        if p_end - p_start <= max_size:
+            yield p_start, p_end
+            continue
+        for s_start, s_end in iter_sentence_spans(text, p_start, p_end):
+            if s_end - s_start <= max_size:
+                yield s_start, s_end
+            else:
+                yield from _split_long(text, s_start, s_end, max_size)
+
+def iter_chunk_spans(text: str, max_size: int) -> Iterator[Span]:
+    """把相鄰片段依序打包成不超過 max_size 的文本塊（包含片段之間原本的空白）"""
+    chunk_start = chunk_end = None
+    for start, end in iter_segment_spans(text, max_size):
+        if chunk_start is not None and end - chunk_start <= max_size:
+            chunk_end = end
+            continue
+        if chunk_start is not None:
+            yield chunk_start, chunk_end
+        chunk_start, chunk_end = start, end
+    if chunk_start is not None:
+        yield chunk_start, chunk_end
+
+class Segmentation:
+    """一段文本的文本塊位置索引，可取得各文本塊、對應回原文位置，並保留原本的分隔空白
+
+    pack=False 時不打包，每個段落（過長時為句子）各自是一塊，例如依段落保存翻譯記憶。
+    """
+
+    def __init__(self, text: str, max_size: int, pack: bool = True):
+        self.text = text
+        spans = iter_chunk_spans(text, max_size) if pack else iter_segment_spans(text, max_size)
+        self.spans: List[Span] = list(spans)
+
+    def __len__(self):
+        return len(self.spans)
+
+    def chunks(self) -> List[str]:
+        """各文本塊的內容"""
+        return [self.text[start:end] for start, end in self.spans]
+
+    def source_offset(self, index: int, offset: int = 0) -> int:
+        """第 index 個文本塊中第 offset 個字元在原文中的位置"""
+        return self.spans[index][0] + offset
+
+    def join(self, parts: Sequence[str]) -> str:
+        """以原本的分隔空白組合各文本塊的翻譯結果（段落之間保留空白行，同一段落中的句子照原樣相接）"""
+        pieces = []
+        for i, part in enumerate(parts):
+            if i:
+                pieces.append(self.text[self.spans[i - 1][1]:self.spans[i][0]])
+            pieces.append(part)
+        return ''.join(pieces)
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+翻譯服務 - 統一的翻譯服務介面、註冊表與路由
+每個翻譯服務宣告自己的單次請求長度上限、每分鐘請求數與並行上限；
+路由會把每個文本塊交給目前最快且健康的服務，失敗時改用下一個，
+不必受限於單一非官方端點的吞吐量。各服務的重試與斷路器見 resilience.py。
+
+內建服務：
+- google: Google翻譯免費版（googletrans）
+- deepl: DeepL API（需要 translation.deepl_api_key）
+- gemini: 以 Gemini 作為翻譯服務（需要 GEMINI_API_KEY）
+- stub: 本地測試用，不需要網路
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+class TranslationBackend:
+    """翻譯服務介面，子類別實作 _translate"""
+    name = ''
+    max_chars = 4500              # 單次請求的字元上限（分塊與微批次的大小）
+    max_concurrency = 4           # 同時請求數上限
+    requests_per_minute = None    # 每分鐘請求數上限，None 表示不限制
+    detects_language = True       # 是否回傳偵測到的來源語言
+    cacheable = True              # 翻譯結果是否可以保存到翻譯記憶與範本記憶
+
+    def __init__(self, config: Optional[dict] = None):
+        self.config = config or {}
+        self._rate_lock = threading.Lock()
+        self._next_request = 0.0
+
+    def is_available(self) -> bool:
+        """是否已設定完成（例如已提供 API Key）"""
+        return True
+
+    def supports(self, src_lang: Optional[str], dest_lang: str) -> bool:
+        """是否支援此語言組合"""
+        return True
+
+    def translate(self, text: str, src_lang: Optional[str], dest_lang: str) -> Tuple[str, Optional[str]]:
+        """翻譯文本，回傳 (翻譯結果, 偵測到的來源語言)"""
+        self._wait_for_rate_limit()
+        return self._translate(text, src_lang, dest_lang)
+
+    def _translate(self, text, src_lang, dest_lang):
+        raise NotImplementedError
+
+    def _wait_for_rate_limit(self):
+        """依每分鐘請求數上限平均分配請求時間"""
+        if not self.requests_per_minute:
+            return
+        interval = 60.0 / self.requests_per_minute
+        with self._rate_lock:
+            now = time.monotonic()
+            wait = self._next_request - now
+            self._next_request = max(now, self._next_request) + interval
+        if wait > 0:
+            time.sleep(wait)
+
+class GoogleFreeBackend(TranslationBackend):
+    name = 'google'
+    max_chars = 4500
+    max_concurrency = 8
+
+    def _translate(self, text, src_lang, dest_lang):
+        from translation_client import get_translation_client_pool
+        result = get_translation_client_pool(max_clients=self.max_concurrency).translate(
+            text, src=src_lang or 'auto', dest=dest_lang)
+        return result.text, result.src
+
+# DeepL 支援的來源語言（以 googletrans 語言代碼的主要部分表示）
+DEEPL_SOURCE_LANGUAGES = {
+    'bg', 'cs', 'da', 'de', 'el', 'en', 'es', 'et', 'fi', 'fr', 'hu', 'id', 'it', 'ja',
+    'ko', 'lt', 'lv', 'nb', 'nl', 'pl', 'pt', 'ro', 'ru', 'sk', 'sl', 'sv', 'tr', 'uk', 'zh'
+}
+DEEPL_TARGET_LANGUAGES = {'zh-tw': 'ZH-HANT', 'zh-cn': 'ZH-HANS'}
+
+class DeepLBackend(TranslationBackend):
+    name = 'deepl'
+    max_chars = 30000
+    max_concurrency = 4
+
+    def is_available(self):
+        return bool(self.config.get('deepl_api_key'))
+
+    def supports(self, src_lang, dest_lang):
+        if dest_lang.lower() not in DEEPL_TARGET_LANGUAGES:
+            return False
+        return src_lang is None or src_lang.split('-')[0].lower() in DEEPL_SOURCE_LANGUAGES
+
+    def _translate(self, text, src_lang, dest_lang):
+        import requests
+
+        api_key = self.config['deepl_api_key']
+        # 免費版的 API Key 以 :fx 結尾，使用不同的端點
+        host = 'api-free.deepl.com' if api_key.endswith(':fx') else 'api.deepl.com'
+        data = {
+            'text': text,
+            'target_lang': DEEPL_TARGET_LANGUAGES[dest_lang.lower()],
+            'preserve_formatting': '1'
+        }
+        if src_lang:
+            data['source_lang'] = src_lang.split('-')[0].upper()
+
+        response = requests.post(f'https://{host}/v2/translate', data=data, timeout=30,
+                                 headers={'Authorization': f'DeepL-Auth-Key {api_key}'})
+        response.raise_for_status()
+        translation = response.json()['translations'][0]
+        return translation['text'], translation.get('detected_source_language', '').lower() or src_lang
+
+# Gemini 翻譯的目標語言描述
+GEMINI_TARGET_LANGUAGES = {'zh-tw': '台灣慣用的繁體中文', 'zh-cn': '簡體中文'}
+
+class GeminiBackend(TranslationBackend):
+    name = 'gemini'
+    max_chars = 8000
+    max_concurrency = 2
+    requests_per_minute = 15       # Gemini 免費方案的每分鐘請求數
+    detects_language = False
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        from translation_proofreader import get_gemini_api_key
+        self.api_key = get_gemini_api_key()
+
+    def is_available(self):
+        return bool(self.api_key)
+
+    def supports(self, src_lang, dest_lang):
+        return dest_lang.lower() in GEMINI_TARGET_LANGUAGES
+
+    def _translate(self, text, src_lang, dest_lang):
+        import requests
+
+        prompt = (f"請把以下文本翻譯成{GEMINI_TARGET_LANGUAGES[dest_lang.lower()]}。"
+                  "保留 [LINK_0]、[IMAGE_0]、[VAR_0]、[SEG_0] 這類方括號標記原樣不變，"
+                  "只輸出翻譯結果，不要加入任何說明。\n\n" + text)
+        url = ("https://generativelanguage.googleapis.com/v1beta/models/"
+               f"gemini-1.5-flash-latest:generateContent?key={self.api_key}")
+        data = {
+            "contents": [{"parts": [{"text": prompt}]}],
+            "generationConfig": {"temperature": 0.1}
+        }
+        response = requests.post(url, json=data, timeout=60)
+        response.raise_for_status()
+        parts = response.json()['candidates'][0]['content']['parts']
+        return ''.join(part.get('text', '') for part in parts).strip(), src_lang
+
+class LocalStubBackend(TranslationBackend):
+    """本地測試用：在文本前加上目標語言標記，不需要網路"""
+    name = 'stub'
+    max_chars = 100000
+    max_concurrency = 16
+    cacheable = False
+
+    def _translate(self, text, src_lang, dest_lang):
+        return f'〔{dest_lang}〕{text}', src_lang or 'en'
+
+_BACKEND_TYPES = {
+    'google': GoogleFreeBackend,
+    'deepl': DeepLBackend,
+    'gemini': GeminiBackend,
+    'stub': LocalStubBackend
+}
+
+def register_backend(name: str, backend_type):
+    """註冊自訂的翻譯服務類別"""
+    _BACKEND_TYPES[name] = backend_type
+
+def create_backends(names: List[str], config: Optional[dict] = None,
+                    concurrency_limits: Optional[Dict[str, int]] = None) -> List[TranslationBackend]:
+    """依名稱建立翻譯服務，略過未註冊或未設定完成的服務
+
+    Args:
+        names: 翻譯服務名稱（依優先順序）
+        config: 程式配置（API Key 等）
+        concurrency_limits: 覆寫各服務的並行上限 {服務名稱: 上限}
+    """
+    backends = []
+    for name in names:
+        backend_type = _BACKEND_TYPES.get(name)
+        if backend_type is None:
+            print(f"⚠️ 未知的翻譯服務: {name}")
+            continue
+        backend = backend_type(config)
+        if not backend.is_available():
+            print(f"⚠️ 翻譯服務 {name} 尚未設定，略過")
+            continue
+        if concurrency_limits and name in concurrency_limits:
+            backend.max_concurrency = concurrency_limits[name]
+        backends.append(backend)
+    return backends
+
+class _BackendHealth:
+    __slots__ = ('requests', 'failures', 'consecutive_failures', 'seconds_per_kchar')
+
+    def __init__(self):
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.seconds_per_kchar = None
+
+class BackendRouter:
+    def __init__(self, backends: List[TranslationBackend], executor=None, hedger=None,
+                 max_retries=2, retry_delay=0.5, smoothing=0.2):
+        """
+        Args:
+            backends: 可用的翻譯服務（依優先順序，速度相同時優先使用前面的）
+            executor: TranslationExecutor，用於各服務的並行上限
+            hedger: Hedger，請求過久未回應時對同一或備用服務送出對沖請求
+            max_retries: 暫時性錯誤時同一服務最多重試幾次
+            retry_delay: 重試退避的最短等待秒數
+            smoothing: 速度指數移動平均的權重
+        """
+        if not backends:
+            raise ValueError("沒有可用的翻譯服務")
+        from resilience import get_policy
+
+        self.backends = backends
+        self.executor = executor
+        self.hedger = hedger
+        self.smoothing = smoothing
+        self._health = {backend.name: _BackendHealth() for backend in backends}
+        # 各服務的斷路器與其他使用同一端點的程式共用（例如 gemini 校對）
+        self._policies = {
+            backend.name: get_policy(backend.name, max_retries=max_retries, base_delay=retry_delay)
+            for backend in backends}
+        self._lock = threading.Lock()
+        if executor is not None:
+            for backend in backends:
+                executor.register_backend(backend.name, backend.max_concurrency)
+
+    @property
+    def max_chars(self) -> int:
+        """所有服務都能接受的單次請求長度"""
+        return min(backend.max_chars for backend in self.backends)
+
+    @property
+    def cacheable_names(self) -> List[str]:
+        """翻譯結果可以保存到記憶中的服務名稱（依優先順序）"""
+        return [backend.name for backend in self.backends if backend.cacheable]
+
+    def candidates(self, text: str, src_lang: Optional[str], dest_lang: str) -> List[TranslationBackend]:
+        """依速度排列可處理此文本的健康服務；全部暫停時仍回傳支援的服務"""
+        supported = [b for b in self.backends
+                     if b.supports(src_lang, dest_lang) and (src_lang or b.detects_language)]
+        if not supported:
+            supported = [b for b in self.backends if b.supports(src_lang, dest_lang)] or self.backends
+
+        with self._lock:
+            healthy = [b for b in supported if self._policies[b.name].breaker.state != 'open']
+            fitting = [b for b in healthy or supported if len(text) <= b.max_chars] or healthy or supported
+            order = {b.name: i for i, b in enumerate(self.backends)}
+            # 最近失敗過的服務排在後面；尚未測得速度的服務先各試一次
+            return sorted(fitting, key=lambda b: (self._health[b.name].consecutive_failures,
+                                                  self._health[b.name].seconds_per_kchar or 0.0,
+                                                  order[b.name]))
+
+    def translate(self, text: str, src_lang: Optional[str], dest_lang: str = 'zh-tw'):
+        """交給最快的健康服務翻譯，失敗時依序改用其他服務
+
+        Returns:
+            (翻譯結果, 偵測到的來源語言, 實際完成翻譯的服務名稱)
+        """
+        candidates = self.candidates(text, src_lang, dest_lang)
+        last_error = None
+        for i, backend in enumerate(candidates):
+            try:
+                if self.hedger is None:
+                    return self._call(backend, text, src_lang, dest_lang)
+                # 對沖請求優先送往下一個服務，只有一個服務時送往同一服務
+                secondary = candidates[i + 1] if i + 1 < len(candidates) else backend
+                return self.hedger.run(
+                    backend.name,
+                    lambda: self._call(backend, text, src_lang, dest_lang),
+                    lambda: self._call(secondary, text, src_lang, dest_lang),
+                    size=len(text))
+            except Exception as e:
+                last_error = e
+        raise last_error
+
+    def _call(self, backend: TranslationBackend, text: str, src_lang: Optional[str], dest_lang: str):
+        """在服務的並行上限內送出請求（暫時性錯誤退避重試），並記錄速度與失敗"""
+        def attempt():
+            if self.executor is None:
+                return backend.translate(text, src_lang, dest_lang)
+            # 退避等待時不佔用並行名額
+            with self.executor.backend_slot(backend.name, len(text)):
+                return backend.translate(text, src_lang, dest_lang)
+
+        start = time.monotonic()
+        try:
+            translated, detected_src = self._policies[backend.name].call(attempt)
+        except Exception as e:
+            print(f"⚠️ 翻譯服務 {backend.name} 失敗: {e}")
+            self._record_failure(backend.name)
+            raise
+        self._record_success(backend.name, time.monotonic() - start, len(text))
+        return translated, detected_src, backend.name
+
+    def _record_success(self, name: str, elapsed: float, length: int):
+        with self._lock:
+            health = self._health[name]
+            health.requests += 1
+            health.consecutive_failures = 0
+            speed = elapsed / max(1, length) * 1000
+            if health.seconds_per_kchar is None:
+                health.seconds_per_kchar = speed
+            else:
+                health.seconds_per_kchar += self.smoothing * (speed - health.seconds_per_kchar)
+
+    def _record_failure(self, name: str):
+        with self._lock:
+            health = self._health[name]
+            health.requests += 1
+            health.failures += 1
+            health.consecutive_failures += 1
+
+    def stats(self) -> Dict[str, dict]:
+        """取得各服務的請求數、失敗數、速度與健康狀態"""
+        states = {name: policy.breaker.state for name, policy in self._policies.items()}
+        with self._lock:
+            return {
+                name: {
+                    'requests': health.requests,
+                    'failures': health.failures,
+                    'seconds_per_kchar': health.seconds_per_kchar,
+                    'healthy': states[name] != 'open'
+                }
+                for name, health in self._health.items()
+            }
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+翻譯微批次 - 收集多封處理中郵件的文本段落（含主旨），合併成接近翻譯服務長度上限的請求
+以編號標記分隔各段落，翻譯後再依標記拆回，批次與常駐模式可大幅減少請求數
+"""
+
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# 每個段落前加上 [SEG_n] 標記；翻譯記憶合併未命中的段落時使用 [PART_n]，
+# 兩者可以巢狀合併（翻譯記憶的請求再被微批次合併）而不互相干擾
+SEGMENT_MARKER = 'SEG'
+
+@lru_cache(maxsize=None)
+def _marker_pattern(marker: str):
+    # 翻譯服務可能改寫大小寫或加入空白
+    return re.compile(r'\[\s*' + marker + r'\s*_?\s*(\d+)\s*\]', re.IGNORECASE)
+
+class _PendingSegment:
+    __slots__ = ('text', 'src', 'dest', 'future', 'created')
+
+    def __init__(self, text, src, dest):
+        self.text = text
+        self.src = src
+        self.dest = dest
+        self.future = Future()
+        self.created = time.monotonic()
+
+def join_batch(texts: Sequence[str], marker: str = SEGMENT_MARKER) -> str:
+    """在每個段落前加上 [marker_n] 標記後合併成一個請求"""
+    return '\n'.join(f'[{marker}_{i}] {text}' for i, text in enumerate(texts))
+
+def split_batch_translation(translated: str, count: int, marker: str = SEGMENT_MARKER):
+    """依 [marker_n] 標記拆回各段落的翻譯，標記遺失或順序錯亂時回傳None"""
+    matches = list(_marker_pattern(marker).finditer(translated))
+    if [int(m.group(1)) for m in matches] != list(range(count)):
+        return None
+
+    parts = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(translated)
+        parts.append(translated[match.end():end].strip())
+    return parts
+
+class TranslationBatcher:
+    def __init__(self, send: Callable[[str, str, str], Tuple[str, str]], max_chars=4500,
+                 linger_seconds=0.05, max_concurrent_requests=4):
+        """
+        Args:
+            send: 實際呼叫翻譯服務的函式 send(text, src, dest) -> (翻譯結果, 翻譯服務名稱)
+            max_chars: 每個請求的字元上限（Google免費翻譯約5000字元）
+            linger_seconds: 等待更多段落加入的最長時間
+            max_concurrent_requests: 同時送出的批次請求數
+        """
+        self.send = send
+        self.max_chars = max_chars
+        self.linger_seconds = linger_seconds
+        self.requests = 0
+        self.segments = 0
+        self.fallbacks = 0
+        self._stats_lock = threading.Lock()
+        self._pending: List[_PendingSegment] = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrent_requests, thread_name_prefix='translation-batch')
+        self._worker = threading.Thread(target=self._run, name='translation-batcher', daemon=True)
+        self._worker.start()
+
+    def submit(self, text: str, src: str, dest: str = 'zh-tw') -> Future:
+        """加入一個待翻譯段落，回傳可取得 (翻譯結果, 翻譯服務名稱) 的 Future"""
+        segment = _PendingSegment(text, src, dest)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("翻譯微批次已關閉")
+            self._pending.append(segment)
+            self._cond.notify()
+        return segment.future
+
+    def translate(self, text: str, src: str, dest: str = 'zh-tw') -> Tuple[str, str]:
+        """翻譯單一段落（等待所屬批次完成），回傳 (翻譯結果, 翻譯服務名稱)"""
+        return self.submit(text, src, dest).result()
+
+    def _pending_chars(self) -> int:
+        return sum(len(segment.text) for segment in self._pending)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+
+                # 段落未滿且還沒等到上限時間時，繼續等待其他郵件的段落
+                remaining = self._pending[0].created + self.linger_seconds - time.monotonic()
+                if not self._closed and remaining > 0 and self._pending_chars() < self.max_chars:
+                    self._cond.wait(remaining)
+                    continue
+
+                batch = self._take_batch()
+
+            self._executor.submit(self._send_batch, batch)
+
+    def _take_batch(self) -> List[_PendingSegment]:
+        """取出語言相同、總長度不超過上限的段落（呼叫前需持有鎖）"""
+        first = self._pending[0]
+        batch, remaining, size = [], [], 0
+        for segment in self._pending:
+            marker_size = len(f'[{SEGMENT_MARKER}_{len(batch)}]') + 2
+            fits = not batch or size + len(segment.text) + marker_size <= self.max_chars
+            if (segment.src, segment.dest) == (first.src, first.dest) and fits:
+                batch.append(segment)
+                size += len(segment.text) + marker_size
+            else:
+                remaining.append(segment)
+        self._pending = remaining
+        return batch
+
+    def _count(self, requests=0, segments=0, fallbacks=0):
+        with self._stats_lock:
+            self.requests += requests
+            self.segments += segments
+            self.fallbacks += fallbacks
+
+    def _send_batch(self, batch: List[_PendingSegment]):
+        src, dest = batch[0].src, batch[0].dest
+        self._count(segments=len(batch))
+
+        if len(batch) == 1:
+            self._send_single(batch[0])
+            return
+
+        joined = join_batch([segment.text for segment in batch])
+        try:
+            self._count(requests=1)
+            translated, backend = self.send(joined, src, dest)
+            parts = split_batch_translation(translated, len(batch))
+        except Exception as e:
+            for segment in batch:
+                segment.future.set_exception(e)
+            return
+
+        if parts is None:
+            # 標記被翻譯服務破壞，無法可靠拆回，改為逐段翻譯
+            print(f"⚠️ 微批次標記遺失，改為逐段翻譯 {len(batch)} 個段落")
+            self._count(fallbacks=1)
+            for segment in batch:
+                self._send_single(segment)
+            return
+
+        for segment, part in zip(batch, parts):
+            segment.future.set_result((part, backend))
+
+    def _send_single(self, segment: _PendingSegment):
+        try:
+            self._count(requests=1)
+            segment.future.set_result(self.send(segment.text, segment.src, segment.dest))
+        except Exception as e:
+            segment.future.set_exception(e)
+
+    def stats(self) -> Dict[str, int]:
+        """取得批次統計"""
+        return {
+            'segments': self.segments,
+            'requests': self.requests,
+            'fallbacks': self.fallbacks
+        }
+
+    def close(self):
+        """送出剩餘段落並停止背景執行緒"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._worker.join()
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+翻譯用戶端池 - 在各文本塊與各郵件之間重複使用 googletrans 用戶端
+每個用戶端保有自己的keep-alive連線，避免每個文本塊都重新建立連線與TLS交握
+"""
+
+import queue
+import threading
+from contextlib import contextmanager
+
+def _create_google_translator():
+    """建立 googletrans 用戶端（延遲匯入，未使用翻譯時不需載入）"""
+    from googletrans import Translator
+    return Translator()
+
+class TranslationClientPool:
+    def __init__(self, max_clients=6, factory=_create_google_translator):
+        """
+        Args:
+            max_clients: 同時存在的用戶端數上限，超過時呼叫端會等待用戶端歸還
+            factory: 建立用戶端的函式
+        """
+        self.max_clients = max_clients
+        self.factory = factory
+        self._idle = queue.LifoQueue()  # 優先使用最近歸還、連線仍然熱的用戶端
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def client(self):
+        """借出一個用戶端；googletrans用戶端不是執行緒安全的，同一時間只給一個執行緒使用"""
+        translator = self._acquire()
+        try:
+            yield translator
+        except Exception:
+            # 發生錯誤時連線狀態不明，丟棄此用戶端，之後需要時再建立新的
+            self._discard(translator)
+            raise
+        else:
+            self._idle.put(translator)
+
+    def _acquire(self):
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            with self._lock:
+                can_create = self._created < self.max_clients
+                if can_create:
+                    self._created += 1
+
+            if can_create:
+                try:
+                    return self.factory()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+
+            # 等待其他執行緒歸還；用戶端被丟棄時不會歸還，因此定期重新檢查是否可建立新的
+            try:
+                return self._idle.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+    def _discard(self, translator):
+        self._close_client(translator)
+        with self._lock:
+            self._created -= 1
+
+    @staticmethod
+    def _close_client(translator):
+        http_client = getattr(translator, 'client', None)
+        if http_client is not None and hasattr(http_client, 'close'):
+            try:
+                http_client.close()
+            except Exception:
+                pass
+
+    def translate(self, text, src='auto', dest='zh-tw'):
+        """使用池中的用戶端翻譯文本"""
+        with self.client() as translator:
+            return translator.translate(text, src=src, dest=dest)
+
+    def detect(self, text):
+        """使用池中的用戶端偵測語言"""
+        with self.client() as translator:
+            return translator.detect(text)
+
+    def close(self):
+        """關閉所有閒置用戶端的連線"""
+        while True:
+            try:
+                translator = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(translator)
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+def get_translation_client_pool(**kwargs):
+    """取得全程式共用的翻譯用戶端池，參數只在第一次建立時使用"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = TranslationClientPool(**kwargs)
+        return _default_pool
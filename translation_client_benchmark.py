@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+翻譯用戶端效能測試 - 比較每個文本塊都建立新 Translator() 與共用用戶端池的延遲
+"""
+
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from translation_client import TranslationClientPool
+
+SAMPLE_CHUNKS = [
+    "Hello, please check the software update information in the attached file.",
+    "The new version includes important security fixes and performance improvements.",
+    "Our team will be available for questions during the next weekly meeting.",
+    "Please remember to submit your expense reports before the end of the month.",
+    "Thank you for your continued support and we look forward to working with you.",
+    "The quarterly results will be shared with all employees next Tuesday.",
+]
+
+def translate_with_new_client(text):
+    """原本的做法：每個文本塊建立新的 Translator()"""
+    from googletrans import Translator
+    translator = Translator()
+    return translator.translate(text, src='auto', dest='zh-tw').text
+
+def measure(translate, chunks, workers):
+    """以指定並行數翻譯所有文本塊，回傳每塊的延遲（秒）"""
+    def timed(text):
+        start = time.perf_counter()
+        translate(text)
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(timed, chunks))
+
+def report(name, latencies):
+    """輸出延遲統計"""
+    latencies = sorted(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{name}: 平均 {statistics.mean(latencies) * 1000:.0f} ms, "
+          f"中位數 {statistics.median(latencies) * 1000:.0f} ms, "
+          f"p95 {p95 * 1000:.0f} ms")
+    return statistics.mean(latencies)
+
+def test_client_reuse(rounds=3, workers=6):
+    """比較建立新用戶端與共用用戶端池的每塊延遲"""
+    print("🧪 翻譯用戶端重複使用測試")
+    print("=" * 50)
+
+    chunks = SAMPLE_CHUNKS * rounds
+
+    try:
+        before = measure(translate_with_new_client, chunks, workers)
+        pool = TranslationClientPool(max_clients=workers)
+        # 先暖機，讓池中的用戶端建立好連線
+        measure(lambda text: pool.translate(text).text, SAMPLE_CHUNKS, workers)
+        after = measure(lambda text: pool.translate(text).text, chunks, workers)
+        pool.close()
+    except ImportError:
+        print("❌ 需要安裝 googletrans 套件")
+        print("💡 執行: pip install googletrans==4.0.0rc1")
+        return False
+    except Exception as e:
+        print(f"❌ 測試失敗: {e}")
+        return False
+
+    mean_before = report("🐢 每塊建立新用戶端", before)
+    mean_after = report("🚀 共用用戶端池    ", after)
+    if mean_after > 0:
+        print(f"📈 每塊平均延遲改善: {mean_before / mean_after:.1f}x")
+    return True
+
+if __name__ == "__main__":
+    print("🚀 翻譯用戶端效能測試")
+    print("=" * 50)
+
+    if test_client_reuse():
+        print("\n✅ 測試完成！")
+    else:
+        print("\n⚠️ 測試失敗，請檢查網路連線與套件安裝")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+翻譯執行器 - 全程式共用的翻譯工作執行緒池
+所有郵件的文本塊共用同一組執行緒與全域並行上限；提交佇列有長度上限，
+佇列滿時提交端會等待，讓上游的郵件處理不會無限制地堆積翻譯工作。
+各翻譯服務另有各自的自適應並行上限（見 concurrency_limiter.py），
+避免批次處理時對同一服務開啟過多連線而被限流。
+"""
+
+import queue
+import threading
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
+
+from concurrency_limiter import AdaptiveLimiter
+
+# 各翻譯服務預設的並行上限（自適應調整的最大值）
+DEFAULT_BACKEND_LIMITS = {
+    'google': 8,
+    'gemini': 2
+}
+
+class TranslationExecutor:
+    def __init__(self, max_workers=8, max_queue=64, backend_limits: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            max_workers: 全域同時執行的翻譯工作數
+            max_queue: 等待執行的工作數上限，超過時 submit 會等待
+            backend_limits: 各翻譯服務的並行上限最大值 {服務名稱: 上限}
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.backend_limits = dict(DEFAULT_BACKEND_LIMITS, **(backend_limits or {}))
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._peak_queue_depth = 0
+        self._peak_in_flight = 0
+        self._backend_limiters = {
+            name: AdaptiveLimiter(name, max_limit=limit) for name, limit in self.backend_limits.items()}
+        self._shutdown = False
+        self._workers = [
+            threading.Thread(target=self._run, name=f'translation-worker-{i}', daemon=True)
+            for i in range(max_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """提交翻譯工作；佇列已滿時等待到有空位為止
+
+        在工作執行緒內提交的工作直接執行，避免工作互相等待造成死結。
+        """
+        future = Future()
+        if getattr(self._local, 'is_worker', False):
+            self._execute(future, fn, args, kwargs)
+            return future
+
+        if self._shutdown:
+            raise RuntimeError("翻譯執行器已關閉")
+        self._queue.put((future, fn, args, kwargs))
+        with self._lock:
+            self._peak_queue_depth = max(self._peak_queue_depth, self._queue.qsize())
+        return future
+
+    def _run(self):
+        self._local.is_worker = True
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, fn, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            with self._lock:
+                self._in_flight += 1
+                self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+            try:
+                self._execute(future, fn, args, kwargs)
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+
+    @staticmethod
+    def _execute(future, fn, args, kwargs):
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+    def register_backend(self, backend: str, max_limit: int):
+        """為翻譯服務建立並行上限；已設定（例如 backend_limits）的服務保留原設定"""
+        with self._lock:
+            if backend not in self._backend_limiters:
+                self.backend_limits[backend] = max_limit
+                self._backend_limiters[backend] = AdaptiveLimiter(backend, max_limit=max_limit)
+
+    @contextmanager
+    def backend_slot(self, backend: str, size: Optional[int] = None):
+        """取得翻譯服務的並行名額，名額用完時等待；未設定上限的服務不受限制
+
+        size 是請求的字元數，延遲依大小換算後才與基準比較。
+        回傳的名額可呼叫 mark_throttled() 回報非例外形式的限流（例如HTTP 429回應）。
+        """
+        limiter = self._backend_limiters.get(backend)
+        if limiter is None:
+            yield None
+            return
+
+        with limiter.slot(size) as permit:
+            yield permit
+
+    @asynccontextmanager
+    async def async_backend_slot(self, backend: str, size: Optional[int] = None):
+        """backend_slot 的非同步版本（例如非同步流程的 Gemini 校對），與同步請求共用同一個並行上限"""
+        limiter = self._backend_limiters.get(backend)
+        if limiter is None:
+            yield None
+            return
+
+        async with limiter.async_slot(size) as permit:
+            yield permit
+
+    def gauges(self) -> Dict[str, object]:
+        """取得目前的佇列深度、執行中工作數與各翻譯服務的並行上限統計"""
+        backends = {name: limiter.stats() for name, limiter in self._backend_limiters.items()}
+        with self._lock:
+            return {
+                'queue_depth': self._queue.qsize(),
+                'in_flight': self._in_flight,
+                'peak_queue_depth': self._peak_queue_depth,
+                'peak_in_flight': self._peak_in_flight,
+                'max_workers': self.max_workers,
+                'backends': backends
+            }
+
+    def shutdown(self):
+        """等待已提交的工作完成後停止工作執行緒"""
+        self._shutdown = True
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+
+_default_executor = None
+_default_executor_lock = threading.Lock()
+
+def get_translation_executor(**kwargs):
+    """取得全程式共用的翻譯執行器，參數只在第一次建立時使用"""
+    global _default_executor
+    with _default_executor_lock:
+        if _default_executor is None:
+            _default_executor = TranslationExecutor(**kwargs)
+        return _default_executor
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+翻譯記憶 - 保存已翻譯過的文本，重複出現的內容（電子報標頭、法律聲明、取消訂閱區塊等）
+直接從本地取得，不需要再次呼叫翻譯服務
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+def normalize_segment(text: str) -> str:
+    """正規化文本：合併連續空白並去除頭尾空白（翻譯前也會做相同處理）"""
+    return _WHITESPACE_PATTERN.sub(' ', text).strip()
+
+def segment_key(text: str, src_lang: str, dest_lang: str, backend: str) -> str:
+    """以（正規化文本、來源語言、目標語言、翻譯服務）產生快取鍵"""
+    raw = '\x1f'.join([normalize_segment(text), src_lang.lower(), dest_lang.lower(), backend])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+class TranslationMemory:
+    def __init__(self, db_path='translation_memory.db', max_entries=50000,
+                 ttl_seconds=30 * 24 * 3600):
+        """
+        Args:
+            db_path: SQLite資料庫路徑
+            max_entries: 最多保存的翻譯筆數，超過時淘汰最久未使用的
+            ttl_seconds: 翻譯保存期限，過期後重新翻譯（翻譯服務品質會改進）
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS segments (
+                key TEXT PRIMARY KEY,
+                translation TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+        ''')
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_segments_last_accessed ON segments (last_accessed)')
+        self._conn.commit()
+        self._count = self._conn.execute('SELECT COUNT(*) FROM segments').fetchone()[0]
+
+    def get(self, text: str, src_lang: str, dest_lang: str, backend: str) -> Optional[str]:
+        """查詢翻譯記憶，未命中或已過期時回傳None"""
+        found = self.lookup(text, src_lang, dest_lang, [backend])
+        return found[0] if found else None
+
+    def lookup(self, text: str, src_lang: str, dest_lang: str,
+               backends: Sequence[str]) -> Optional[Tuple[str, str]]:
+        """依偏好順序查詢任一翻譯服務保存的翻譯，回傳 (翻譯結果, 翻譯服務)，未命中或已過期時回傳None"""
+        keys = {segment_key(text, src_lang, dest_lang, backend): backend for backend in backends}
+        if not keys:
+            return None
+        now = time.time()
+
+        with self._lock:
+            placeholders = ','.join('?' * len(keys))
+            rows = {key: (translation, created_at) for key, translation, created_at in self._conn.execute(
+                f'SELECT key, translation, created_at FROM segments WHERE key IN ({placeholders})',
+                list(keys))}
+            for key, backend in keys.items():
+                row = rows.get(key)
+                if row is None or now - row[1] > self.ttl_seconds:
+                    continue
+                self._conn.execute('UPDATE segments SET last_accessed = ? WHERE key = ?', (now, key))
+                self._conn.commit()
+                self.hits += 1
+                return row[0], backend
+
+            self.misses += 1
+            return None
+
+    def put(self, text: str, src_lang: str, dest_lang: str, backend: str, translation: str):
+        """儲存翻譯結果"""
+        key = segment_key(text, src_lang, dest_lang, backend)
+        now = time.time()
+
+        with self._lock:
+            exists = self._conn.execute(
+                'SELECT 1 FROM segments WHERE key = ?', (key,)).fetchone() is not None
+            self._conn.execute(
+                'INSERT OR REPLACE INTO segments (key, translation, created_at, last_accessed) '
+                'VALUES (?, ?, ?, ?)',
+                (key, translation, now, now))
+            if not exists:
+                self._count += 1
+            if self._count > self.max_entries:
+                self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        """先刪除過期的翻譯，仍超過上限時淘汰最久未使用的（呼叫前需持有鎖）"""
+        self._conn.execute(
+            'DELETE FROM segments WHERE created_at < ?', (now - self.ttl_seconds,))
+        self._conn.execute(
+            'DELETE FROM segments WHERE key IN ('
+            'SELECT key FROM segments ORDER BY last_accessed ASC LIMIT MAX(0, '
+            '(SELECT COUNT(*) FROM segments) - ?))',
+            (self.max_entries,))
+        self._count = self._conn.execute('SELECT COUNT(*) FROM segments').fetchone()[0]
+
+    def stats(self) -> Dict[str, float]:
+        """取得命中統計"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': self._count,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+    def close(self):
+        """關閉資料庫連線"""
+        with self._lock:
+            self._conn.close()
@@ -11,24 +11,39 @@ import json
 from typing import List, Dict, Optional
 import time
 
+def get_gemini_api_key() -> Optional[str]:
+    """從環境變數或 gemini_apikey.json 取得 Gemini API Key，未設定時回傳None"""
+    import os
+    api_key = os.getenv('GEMINI_API_KEY')
+    
+    # 如果環境變數沒有，嘗試從配置檔案讀取
+    if not api_key:
+        try:
+            with open('gemini_apikey.json', 'r', encoding='utf-8') as f:
+                config = json.load(f)
+                api_key = config.get('api_key')
+        except FileNotFoundError:
+            pass
+    
+    if not api_key or api_key == "your_gemini_api_key_here":
+        return None
+    return api_key
+
 class TranslationProofreader:
-    def __init__(self):
-        """初始化校對器"""
+    def __init__(self, executor=None):
+        """初始化校對器
+        
+        Args:
+            executor: 共用的 TranslationExecutor，Gemini 請求受其服務並行上限控制；
+                      None時（例如單獨執行校對測試）不限制並行數
+        """
+        self.executor = executor
+        # 簡體字與大陸用語（软件、数据、视频…）由 chinese_converter 的詞典轉換，
+        # 這裡只保留繁體字形相同、但台灣慣用其他說法的詞
         self.common_errors = {
             # 台灣用語風格修正
             "消息": "訊息",  # 台灣習慣用「訊息」
-            "信息": "資訊",  # 台灣習慣用「資訊」
             "文件": "檔案",  # 台灣習慣用「檔案」
-            "软件": "軟體",  # 繁體字修正
-            "硬件": "硬體",  # 繁體字修正
-            "网络": "網路",  # 台灣習慣用「網路」
-            "网站": "網站",  # 繁體字修正
-            "计算机": "電腦",  # 台灣習慣用「電腦」
-            "手机": "手機",  # 繁體字修正
-            "程序": "程式",  # 台灣習慣用「程式」
-            "数据": "資料",  # 台灣習慣用「資料」
-            "视频": "影片",  # 台灣習慣用「影片」
-            "音频": "音訊",  # 台灣習慣用「音訊」
         }
         
         self.punctuation_fixes = {
@@ -73,26 +88,36 @@ class TranslationProofreader:
         text = result["proofread"]
         improvements = result["improvements"]
         
-        # 1. 修正常見翻譯錯誤
+        # 1. 簡繁轉換與台灣用語（本地詞典，不需要網路）
+        from chinese_converter import get_chinese_converter
+        text, changes = get_chinese_converter().convert_with_changes(text)
+        phrases = list(dict.fromkeys(change for change in changes if len(change[0]) > 1))
+        for wrong, correct in phrases:
+            improvements.append(f"用詞統一：{wrong} → {correct}")
+        characters = len(changes) - sum(1 for change in changes if len(change[0]) > 1)
+        if characters:
+            improvements.append(f"簡繁轉換：{characters} 個簡體字")
+        
+        # 2. 修正常見翻譯錯誤
         for wrong, correct in self.common_errors.items():
             if wrong in text:
                 text = text.replace(wrong, correct)
                 improvements.append(f"用詞統一：{wrong} → {correct}")
         
-        # 2. 修正標點符號
+        # 3. 修正標點符號
         for wrong, correct in self.punctuation_fixes.items():
             if wrong in text:
                 text = text.replace(wrong, correct)
                 improvements.append(f"標點修正：{wrong} → {correct}")
         
-        # 3. 移除多餘空格
+        # 4. 移除多餘空格
         original_text = text
         text = re.sub(r'\s+', ' ', text.strip())
         text = re.sub(r'\s*([，。！？；：])\s*', r'\1', text)
         if text != original_text:
             improvements.append("移除多餘空格和標點前後空格")
         
-        # 4. 修正常見語法問題
+        # 5. 修正常見語法問題
         grammar_fixes = [
             (r'的的', '的'),
             (r'了了', '了'),
@@ -112,28 +137,68 @@ class TranslationProofreader:
     def _gemini_proofreading(self, result: Dict[str, str]) -> Dict[str, str]:
         """使用 Google Gemini 進行 AI 校對"""
         try:
-            # 嘗試從環境變數或配置檔案取得 API Key
-            import os
-            api_key = os.getenv('GEMINI_API_KEY')
+            request = self._build_gemini_request(result["proofread"])
+            if request is None:
+                return result
+            url, headers, data = request
+            
+            # 與翻譯共用執行器的服務並行上限，批次處理時不會同時開啟過多 Gemini 請求；
+            # 限流（429）或伺服器錯誤時依 Retry-After 或退避時間重試，與 Gemini 翻譯共用斷路器
+            from contextlib import nullcontext
+            from resilience import get_policy, raise_for_retry
             
-            # 如果環境變數沒有，嘗試從配置檔案讀取
-            if not api_key:
-                try:
-                    with open('gemini_apikey.json', 'r', encoding='utf-8') as f:
-                        config = json.load(f)
-                        api_key = config.get('api_key')
-                except FileNotFoundError:
-                    pass
+            def post():
+                slot = (self.executor.backend_slot('gemini', len(result["proofread"]))
+                        if self.executor is not None else nullcontext())
+                with slot:
+                    return raise_for_retry(requests.post(url, headers=headers, json=data, timeout=30))
             
-            if not api_key or api_key == "your_gemini_api_key_here":
-                print("⚠️ 未設定 GEMINI_API_KEY，跳過 AI 校對")
-                print("💡 請設定環境變數或建立 gemini_apikey.json 檔案")
+            response = get_policy('gemini').call(post)
+            self._apply_gemini_response(result, response.status_code,
+                                        response.json() if response.status_code == 200 else None)
+                
+        except Exception as e:
+            print(f"⚠️ AI 校對失敗: {e}")
+        
+        return result
+    
+    async def _gemini_proofreading_async(self, result: Dict[str, str], client) -> Dict[str, str]:
+        """使用 Google Gemini 進行 AI 校對（非同步版本，client 為共用的 httpx.AsyncClient）"""
+        try:
+            request = self._build_gemini_request(result["proofread"])
+            if request is None:
                 return result
+            url, headers, data = request
+            
+            # 與同步版本相同，佔用執行器的 Gemini 並行名額（與翻譯共用自適應並行上限）
+            from contextlib import nullcontext
+            from resilience import get_policy, raise_for_retry
             
-            text = result["proofread"]
+            async def post():
+                slot = (self.executor.async_backend_slot('gemini', len(result["proofread"]))
+                        if self.executor is not None else nullcontext())
+                async with slot:
+                    return raise_for_retry(await client.post(url, headers=headers, json=data, timeout=30))
             
-            # 構建校對提示
-            prompt = f"""
+            response = await get_policy('gemini').call_async(post)
+            self._apply_gemini_response(result, response.status_code,
+                                        response.json() if response.status_code == 200 else None)
+        
+        except Exception as e:
+            print(f"⚠️ AI 校對失敗: {e}")
+        
+        return result
+    
+    def _build_gemini_request(self, text: str) -> Optional[tuple]:
+        """建立 Gemini 校對請求 (url, headers, data)，未設定 API Key 時回傳None"""
+        api_key = get_gemini_api_key()
+        if not api_key:
+            print("⚠️ 未設定 GEMINI_API_KEY，跳過 AI 校對")
+            print("💡 請設定環境變數或建立 gemini_apikey.json 檔案")
+            return None
+        
+        # 構建校對提示
+        prompt = f"""
 請幫我校對以下繁體中文翻譯，改善語法、用詞和流暢度，使用台灣地區的用語習慣：
 
 原文：
@@ -159,48 +224,45 @@ class TranslationProofreader:
 
 請直接提供校對後的完整文本，然後列出主要改進點。
 """
-            
-            # 調用 Gemini API (使用最新格式)
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash-latest:generateContent?key={api_key}"
-            
-            headers = {
-                'Content-Type': 'application/json',
-            }
-            
-            data = {
-                "contents": [{
-                    "parts": [{
-                        "text": prompt
-                    }]
-                }],
-                "generationConfig": {
-                    "temperature": 0.3,
-                    "maxOutputTokens": 1000
-                }
+        
+        # 調用 Gemini API (使用最新格式)
+        url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash-latest:generateContent?key={api_key}"
+        
+        headers = {
+            'Content-Type': 'application/json',
+        }
+        
+        data = {
+            "contents": [{
+                "parts": [{
+                    "text": prompt
+                }]
+            }],
+            "generationConfig": {
+                "temperature": 0.3,
+                "maxOutputTokens": 1000
             }
+        }
+        return url, headers, data
+    
+    def _apply_gemini_response(self, result: Dict[str, str], status_code: int,
+                               response_data: Optional[dict]):
+        """解析 Gemini 回應並更新校對結果"""
+        if status_code != 200:
+            print(f"⚠️ Gemini API 調用失敗: {status_code}")
+            return
+        
+        text = result["proofread"]
+        if 'candidates' in response_data and len(response_data['candidates']) > 0:
+            ai_response = response_data['candidates'][0]['content']['parts'][0]['text']
             
-            response = requests.post(url, headers=headers, json=data, timeout=30)
+            # 解析 AI 回應
+            improved_text, improvements = self._parse_ai_response(ai_response, text)
             
-            if response.status_code == 200:
-                response_data = response.json()
-                if 'candidates' in response_data and len(response_data['candidates']) > 0:
-                    ai_response = response_data['candidates'][0]['content']['parts'][0]['text']
-                    
-                    # 解析 AI 回應
-                    improved_text, improvements = self._parse_ai_response(ai_response, text)
-                    
-                    if improved_text and improved_text != text:
-                        result["proofread"] = improved_text
-                        result["improvements"].extend(improvements)
-                        result["improvements"].append("AI 校對完成")
-                    
-            else:
-                print(f"⚠️ Gemini API 調用失敗: {response.status_code}")
-                
-        except Exception as e:
-            print(f"⚠️ AI 校對失敗: {e}")
-        
-        return result
+            if improved_text and improved_text != text:
+                result["proofread"] = improved_text
+                result["improvements"].extend(improvements)
+                result["improvements"].append("AI 校對完成")
     
     def _parse_ai_response(self, ai_response: str, original_text: str) -> tuple:
         """解析 AI 回應，提取改進後的文本和改進點"""
@@ -284,6 +346,34 @@ class TranslationProofreader:
     
     def enhance_translation_quality(self, original_text: str, translated_text: str) -> Dict[str, str]:
         """綜合提升翻譯品質"""
+        main_content, links_section, result = self._start_enhancement(translated_text)
+        
+        # 2. 嘗試 AI 校對
+        if len(main_content) < 1000:  # 只對較短文本使用 AI 校對
+            ai_result = self.proofread_translation(result["proofread"], method="gemini")
+            result = self._choose_ai_result(result, ai_result)
+        
+        return self._finish_enhancement(result, links_section, translated_text)
+    
+    async def enhance_translation_quality_async(self, original_text: str, translated_text: str,
+                                                client) -> Dict[str, str]:
+        """綜合提升翻譯品質（非同步版本，Gemini 請求使用共用的 httpx.AsyncClient）"""
+        main_content, links_section, result = self._start_enhancement(translated_text)
+        
+        # 2. 嘗試 AI 校對
+        if len(main_content) < 1000:  # 只對較短文本使用 AI 校對
+            ai_result = await self._gemini_proofreading_async({
+                "original": result["proofread"],
+                "proofread": result["proofread"],
+                "improvements": [],
+                "method_used": "gemini"
+            }, client)
+            result = self._choose_ai_result(result, ai_result)
+        
+        return self._finish_enhancement(result, links_section, translated_text)
+    
+    def _start_enhancement(self, translated_text: str) -> tuple:
+        """分離內容與連結並進行基本校對，回傳 (主要內容, 連結區塊, 校對結果)"""
         print("🔍 開始翻譯品質提升...")
         
         # 分離主要內容和連結區塊
@@ -292,14 +382,18 @@ class TranslationProofreader:
         # 1. 基本校對（只處理主要內容）
         result = self.proofread_translation(main_content, method="basic")
         print(f"✅ 基本校對完成，發現 {len(result['improvements'])} 個改進點")
-        
-        # 2. 嘗試 AI 校對
-        if len(main_content) < 1000:  # 只對較短文本使用 AI 校對
-            ai_result = self.proofread_translation(result["proofread"], method="gemini")
-            if len(ai_result["improvements"]) > len(result["improvements"]):
-                result = ai_result
-                print("✅ AI 校對完成")
-        
+        return main_content, links_section, result
+    
+    def _choose_ai_result(self, result: Dict[str, str], ai_result: Dict[str, str]) -> Dict[str, str]:
+        """AI 校對的改進較多時採用 AI 校對結果"""
+        if len(ai_result["improvements"]) > len(result["improvements"]):
+            print("✅ AI 校對完成")
+            return ai_result
+        return result
+    
+    def _finish_enhancement(self, result: Dict[str, str], links_section: str,
+                            translated_text: str) -> Dict[str, str]:
+        """重新組合內容和連結並做最終檢查"""
         # 3. 重新組合內容和連結
         final_text = result["proofread"]
         if links_section:
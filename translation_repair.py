@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+翻譯修復 - 只重新翻譯出現異常字符（�、■ 等）的句子
+先以段落對齊原文與譯文，段落內再對齊句子（句數相同時一對一，否則依字元位置比例），
+找出損壞句子對應的原文範圍，重新翻譯後放回原位置。
+遺失連結佔位符的句子以相同方式從原文一側對齊，只重新翻譯那些句子。
+修復成本取決於損壞的句子數，而不是整個文本塊的長度。
+"""
+
+from typing import Callable, List, Optional, Tuple
+
+from text_segmenter import iter_sentence_spans
+
+Span = Tuple[int, int]
+
+def sentence_spans(text: str, start: int = 0, end: int = None) -> List[Span]:
+    """回傳 text[start:end] 中每個句子的 (起點, 終點)，不含句子前後的空白"""
+    return list(iter_sentence_spans(text, start, end))
+
+def paragraph_spans(text: str) -> List[Span]:
+    """回傳每個非空白段落（以換行分隔）的 (起點, 終點)"""
+    spans = []
+    position = 0
+    for line in text.split('\n'):
+        _append_stripped(text, position, position + len(line), spans)
+        position += len(line) + 1
+    return spans
+
+def _append_stripped(text: str, start: int, end: int, spans: List[Span]):
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    if start < end:
+        spans.append((start, end))
+
+def _align_sentences(source_spans: List[Span], translated_spans: List[Span],
+                     index: int) -> Tuple[int, int]:
+    """找出第 index 個譯文句子對應的原文句子範圍 [first, last]"""
+    if len(source_spans) == len(translated_spans):
+        return index, index
+
+    # 句數不同時依句子在段落中的相對位置對應
+    t_origin, t_length = translated_spans[0][0], translated_spans[-1][1] - translated_spans[0][0]
+    s_origin, s_length = source_spans[0][0], source_spans[-1][1] - source_spans[0][0]
+    start, end = translated_spans[index]
+    low = (start - t_origin) / t_length * s_length + s_origin
+    high = (end - t_origin) / t_length * s_length + s_origin
+
+    overlapping = [i for i, (s_start, s_end) in enumerate(source_spans) if s_start < high and s_end > low]
+    if not overlapping:
+        nearest = min(range(len(source_spans)), key=lambda i: abs(source_spans[i][0] - low))
+        return nearest, nearest
+    return overlapping[0], overlapping[-1]
+
+def _aligned_paragraphs(source: str, translated: str) -> List[Tuple[Span, Span]]:
+    """逐段對齊原文與譯文 [((原文起點, 終點), (譯文起點, 終點))]"""
+    source_paragraphs = paragraph_spans(source)
+    translated_paragraphs = paragraph_spans(translated)
+    if len(source_paragraphs) != len(translated_paragraphs) or not source_paragraphs:
+        # 段落數不同時無法逐段對齊，整個文本視為一個段落
+        source_paragraphs = [(0, len(source))]
+        translated_paragraphs = [(0, len(translated))]
+    return list(zip(source_paragraphs, translated_paragraphs))
+
+def _merge_ranges(ranges: List[Tuple[int, int, int, int]]) -> List[Tuple[int, int, int, int]]:
+    """合併句子範圍 (first_a, last_a, first_b, last_b)：a 側相鄰或 b 側重疊時合併成一個範圍"""
+    merged = []
+    for first_a, last_a, first_b, last_b in ranges:
+        if merged and (merged[-1][1] == first_a - 1 or merged[-1][3] >= first_b):
+            previous = merged[-1]
+            merged[-1] = (previous[0], last_a, min(previous[2], first_b), max(previous[3], last_b))
+        else:
+            merged.append((first_a, last_a, first_b, last_b))
+    return merged
+
+def find_corrupted_spans(source: str, translated: str,
+                         is_corrupted: Callable[[str], bool]) -> List[Tuple[Span, Span]]:
+    """找出損壞的譯文範圍與對應的原文範圍 [((譯文起點, 終點), (原文起點, 終點))]
+
+    同一段落中相鄰的損壞句子（或對應到重疊原文的句子）會合併成一個範圍。
+    """
+    repairs = []
+    for (s_start, s_end), (t_start, t_end) in _aligned_paragraphs(source, translated):
+        if not is_corrupted(translated[t_start:t_end]):
+            continue
+        source_sentences = sentence_spans(source, s_start, s_end) or [(s_start, s_end)]
+        translated_sentences = sentence_spans(translated, t_start, t_end)
+
+        ranges = [(i, i) + _align_sentences(source_sentences, translated_sentences, i)
+                  for i, (start, end) in enumerate(translated_sentences)
+                  if is_corrupted(translated[start:end])]
+        for first_t, last_t, first_s, last_s in _merge_ranges(ranges):
+            repairs.append(((translated_sentences[first_t][0], translated_sentences[last_t][1]),
+                            (source_sentences[first_s][0], source_sentences[last_s][1])))
+    return repairs
+
+def find_missing_spans(source: str, translated: str,
+                       is_missing: Callable[[str, str], bool]) -> List[Tuple[Span, Span]]:
+    """找出譯文遺失原文內容（例如連結佔位符）的範圍 [((譯文起點, 終點), (原文起點, 終點))]
+
+    is_missing(原文片段, 譯文片段) 判斷譯文片段是否遺失了原文片段的內容；
+    先找出遺失內容的段落，再以原文句子對齊譯文句子，只回傳遺失內容的句子。
+    """
+    repairs = []
+    for (s_start, s_end), (t_start, t_end) in _aligned_paragraphs(source, translated):
+        if not is_missing(source[s_start:s_end], translated[t_start:t_end]):
+            continue
+        source_sentences = sentence_spans(source, s_start, s_end)
+        translated_sentences = sentence_spans(translated, t_start, t_end) or [(t_start, t_end)]
+
+        ranges = []
+        for j, (start, end) in enumerate(source_sentences):
+            first_t, last_t = _align_sentences(translated_sentences, source_sentences, j)
+            aligned = translated[translated_sentences[first_t][0]:translated_sentences[last_t][1]]
+            if is_missing(source[start:end], aligned):
+                ranges.append((j, j, first_t, last_t))
+        for first_s, last_s, first_t, last_t in _merge_ranges(ranges):
+            repairs.append(((translated_sentences[first_t][0], translated_sentences[last_t][1]),
+                            (source_sentences[first_s][0], source_sentences[last_s][1])))
+    return repairs
+
+def find_changed_spans(old_source: str, new_source: str,
+                       translated: str) -> Optional[List[Tuple[Span, Span]]]:
+    """比較新舊原文，找出舊譯文中需要重新翻譯的範圍與對應的新原文範圍
+    [((譯文起點, 終點), (新原文起點, 終點))]
+
+    用於套用相近的已翻譯文本：段落數與各段句數必須相同，只有內容不同的句子需要重新翻譯；
+    結構不同時無法逐句對應，回傳None。
+    """
+    old_paragraphs = paragraph_spans(old_source)
+    new_paragraphs = paragraph_spans(new_source)
+    if len(old_paragraphs) != len(new_paragraphs):
+        return None
+    aligned = _aligned_paragraphs(old_source, translated)
+    if len(aligned) != len(old_paragraphs):
+        # 譯文段落數不同時整個文本視為一個段落
+        old_paragraphs = [(0, len(old_source))]
+        new_paragraphs = [(0, len(new_source))]
+
+    repairs = []
+    for (o_start, o_end), (n_start, n_end), (_, (t_start, t_end)) in zip(
+            old_paragraphs, new_paragraphs, aligned):
+        if old_source[o_start:o_end] == new_source[n_start:n_end]:
+            continue
+        old_sentences = sentence_spans(old_source, o_start, o_end)
+        new_sentences = sentence_spans(new_source, n_start, n_end)
+        if len(old_sentences) != len(new_sentences):
+            return None
+        translated_sentences = sentence_spans(translated, t_start, t_end) or [(t_start, t_end)]
+
+        ranges = []
+        for j, ((a, b), (c, d)) in enumerate(zip(old_sentences, new_sentences)):
+            if old_source[a:b] != new_source[c:d]:
+                ranges.append((j, j) + _align_sentences(translated_sentences, old_sentences, j))
+        for first_s, last_s, first_t, last_t in _merge_ranges(ranges):
+            repairs.append(((translated_sentences[first_t][0], translated_sentences[last_t][1]),
+                            (new_sentences[first_s][0], new_sentences[last_s][1])))
+    return repairs
+
+def apply_repairs(translated: str, repairs: List[Tuple[Span, Span]], replacements: List[str]) -> str:
+    """把重新翻譯的結果放回譯文中對應的位置"""
+    parts = []
+    position = 0
+    for ((start, end), _), replacement in sorted(zip(repairs, replacements), key=lambda item: item[0][0][0]):
+        parts.append(translated[position:start])
+        parts.append(replacement)
+        position = end
+    parts.append(translated[position:])
+    return ''.join(parts)
+
+def repair_translation(source: str, translated: str, translate: Callable[[str], str],
+                       is_corrupted: Callable[[str], bool]) -> Tuple[str, List[Tuple[Span, Span]]]:
+    """重新翻譯損壞的句子，回傳 (修復後的譯文, 修復的範圍)
+
+    Args:
+        source: 原文
+        translated: 譯文
+        translate: 翻譯原文片段的函式（通常是備用翻譯路徑）
+        is_corrupted: 判斷譯文是否包含異常字符的函式
+    """
+    repairs = find_corrupted_spans(source, translated, is_corrupted)
+    replacements = [translate(source[s_start:s_end]) for _, (s_start, s_end) in repairs]
+    return apply_repairs(translated, repairs, replacements), repairs
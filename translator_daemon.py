@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+常駐模式 - 只認證一次並保持Gmail服務連線，依各搜尋條件的間隔定時增量處理新郵件
+"""
+
+import signal
+import threading
+import time
+from typing import Dict, Optional
+
+from email_translator import EmailTranslator, build_runtime_config
+
+class TranslatorDaemon:
+    def __init__(self, translator: EmailTranslator, searches: Dict[str, Dict[str, str]],
+                 poll_interval: int = 300, token_refresh_margin: int = 300,
+                 max_workers: int = 4):
+        """
+        Args:
+            translator: 共用的郵件翻譯器（保持Gmail服務、校對器等暖啟動狀態）
+            searches: {搜尋條件名稱: 搜尋條件}，條件中的 poll_interval 可覆寫預設間隔
+            poll_interval: 預設輪詢間隔（秒）
+            token_refresh_margin: token到期前多少秒主動更新
+            max_workers: 每次批次處理的並行郵件數
+        """
+        self.translator = translator
+        self.searches = searches
+        self.poll_interval = poll_interval
+        self.token_refresh_margin = token_refresh_margin
+        self.max_workers = max_workers
+        self.stop_event = threading.Event()
+        self.next_runs = {name: 0.0 for name in searches}
+        self._refresh_thread: Optional[threading.Thread] = None
+
+    def get_interval(self, search_name: str) -> float:
+        """取得搜尋條件的輪詢間隔"""
+        criteria = self.searches[search_name]
+        return float(criteria.get('poll_interval') or self.poll_interval)
+
+    def _refresh_loop(self):
+        """背景執行緒：定期檢查並在token到期前更新"""
+        check_interval = max(30, min(self.token_refresh_margin // 2, 300))
+        while not self.stop_event.wait(check_interval):
+            self.translator.refresh_credentials(self.token_refresh_margin)
+
+    def run_search(self, search_name: str):
+        """增量處理單一搜尋條件的新郵件"""
+        criteria = {key: value for key, value in self.searches[search_name].items()
+                    if key != 'poll_interval'}
+        print(f"\n⏰ [{time.strftime('%H:%M:%S')}] 輪詢搜尋條件: {search_name}")
+        try:
+            self.translator.process_emails_batch(
+                criteria, max_workers=self.max_workers,
+                search_name=search_name, incremental=True)
+        except Exception as e:
+            # 單次輪詢失敗不應讓常駐程式結束
+            print(f"❌ 搜尋條件 {search_name} 處理失敗: {e}")
+
+    def run(self):
+        """啟動常駐模式，直到收到停止訊號"""
+        if not self.searches:
+            print("❌ 沒有可輪詢的搜尋條件")
+            return False
+
+        # 只在啟動時認證一次
+        if not self.translator.ensure_gmail_service():
+            return False
+
+        self._refresh_thread = threading.Thread(
+            target=self._refresh_loop, name='token-refresh', daemon=True)
+        self._refresh_thread.start()
+
+        print(f"🛰️ 常駐模式已啟動，輪詢 {len(self.searches)} 組搜尋條件:")
+        for name in self.searches:
+            print(f"   {name}: 每 {self.get_interval(name):.0f} 秒")
+
+        while not self.stop_event.is_set():
+            now = time.time()
+            for name, next_run in self.next_runs.items():
+                if self.stop_event.is_set():
+                    break
+                if next_run <= now:
+                    self.run_search(name)
+                    self.next_runs[name] = time.time() + self.get_interval(name)
+
+            # 睡到最近一個搜尋條件的下次執行時間，收到停止訊號時立即醒來
+            wait_seconds = max(0.0, min(self.next_runs.values()) - time.time())
+            self.stop_event.wait(wait_seconds)
+
+        print("👋 常駐模式已停止")
+        return True
+
+    def stop(self, *_):
+        """停止常駐模式（可作為訊號處理函式）"""
+        print("\n🛑 收到停止訊號，完成目前工作後結束...")
+        self.stop_event.set()
+
+def main():
+    """常駐模式主程式"""
+    from config_manager import ConfigManager
+
+    config_manager = ConfigManager()
+    config = build_runtime_config(config_manager)
+    if config is None:
+        return
+
+    # 輪詢所有已儲存的搜尋條件，沒有時使用預設條件
+    searches = dict(config_manager.get_saved_searches())
+    if not searches:
+        default_criteria = config_manager.get_default_search_criteria()
+        if any(default_criteria.values()):
+            searches['default'] = default_criteria
+
+    daemon_config = config_manager.get_daemon_config()
+    daemon = TranslatorDaemon(
+        EmailTranslator(config), searches,
+        poll_interval=daemon_config.get('poll_interval', 300),
+        token_refresh_margin=daemon_config.get('token_refresh_margin', 300),
+        max_workers=daemon_config.get('max_workers', 4))
+
+    signal.signal(signal.SIGINT, daemon.stop)
+    signal.signal(signal.SIGTERM, daemon.stop)
+    daemon.run()
+
+if __name__ == "__main__":
+    main()